@@ -3,7 +3,24 @@ Django admin configuration for Domain Finder.
 """
 from django.contrib import admin
 from django import forms
-from .models import HomePage, BlogCategory, Author, BlogPost, ContactSubmission, ContactInfo, ContactService, Domain, DomainStatus, Currency, ExpectationItem
+from django.db import transaction
+from django.utils import timezone
+from .models import HomePage, BlogCategory, Author, BlogPost, ContactSubmission, ArchivedContactSubmission, ContactInfo, ContactService, Domain, DomainStatus, Currency, ExpectationItem, ImageAsset, OutboxEmail
+from .exports import EXPORT_MODELS, export_response
+from .image_derivatives import process_in_background
+from .outbox import enqueue_contact_notification
+
+
+def export_as_csv(modeladmin, request, queryset):
+    """Stream the selected rows as a CSV download."""
+    return export_response(request, EXPORT_MODELS[modeladmin.model], 'csv', queryset)
+export_as_csv.short_description = 'Export selected as CSV'
+
+
+def export_as_jsonl(modeladmin, request, queryset):
+    """Stream the selected rows as a JSON Lines download."""
+    return export_response(request, EXPORT_MODELS[modeladmin.model], 'jsonl', queryset)
+export_as_jsonl.short_description = 'Export selected as JSON Lines'
 
 
 @admin.register(HomePage)
@@ -122,6 +139,7 @@ class BlogPostAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     list_editable = ['is_featured', 'is_published']
     ordering = ['-created_at']
+    actions = [export_as_csv, export_as_jsonl]
     
     fieldsets = (
         ('Content', {
@@ -138,17 +156,49 @@ class BlogPostAdmin(admin.ModelAdmin):
 
 @admin.register(ContactSubmission)
 class ContactSubmissionAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'submitted_at', 'is_responded']
-    list_filter = ['is_responded', 'submitted_at']
+    list_display = ['name', 'email', 'submitted_at', 'captcha_status', 'duplicate_count', 'is_responded']
+    list_filter = ['is_responded', 'captcha_status', 'submitted_at']
     search_fields = ['name', 'email']
-    readonly_fields = ['name', 'email', 'message', 'submitted_at']
+    readonly_fields = [
+        'name', 'email', 'message', 'submitted_at', 'captcha_status', 'captcha_score',
+        'duplicate_count', 'near_duplicate_of',
+    ]
     list_editable = ['is_responded']
     ordering = ['-submitted_at']
+    # Skip the unfiltered COUNT(*) next to filtered result counts
+    show_full_result_count = False
+    actions = [export_as_csv, export_as_jsonl, 'approve_and_notify']
+    
+    def approve_and_notify(self, request, queryset):
+        """Approve submissions held for review and queue their notifications."""
+        with transaction.atomic():
+            held = list(queryset.select_for_update().filter(captcha_status=ContactSubmission.CAPTCHA_REVIEW))
+            for submission in held:
+                submission.captcha_status = ContactSubmission.CAPTCHA_APPROVED
+                submission.save(update_fields=['captcha_status'])
+                enqueue_contact_notification(submission)
+        self.message_user(request, f'{len(held)} submission(s) approved and queued for notification.')
+    approve_and_notify.short_description = 'Approve held submissions and notify'
     
     def has_add_permission(self, request):
         # Don't allow adding submissions through admin
         return False
 
+@admin.register(ArchivedContactSubmission)
+class ArchivedContactSubmissionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'email', 'submitted_at', 'is_responded', 'archived_at']
+    list_filter = ['is_responded', 'submitted_at']
+    search_fields = ['email']
+    ordering = ['-submitted_at']
+    show_full_result_count = False
+    
+    def has_add_permission(self, request):
+        # Rows only arrive through the archive_submissions command
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 @admin.register(ContactInfo)
 class ContactInfoAdmin(admin.ModelAdmin):
     list_display = ['__str__', 'is_active', 'show_services', 'show_what_to_expect', 'updated_at']
@@ -289,6 +339,7 @@ class DomainAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     list_editable = ['is_available', 'is_featured_on_homepage']
     ordering = ['-is_featured_on_homepage', '-created_at']
+    actions = [export_as_csv, export_as_jsonl]
     
     fieldsets = (
         ('Domain Information', {
@@ -327,4 +378,38 @@ class ExpectationItemAdmin(admin.ModelAdmin):
             'fields': ('order', 'is_active'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+    list_display = ['source', 'status', 'width', 'height', 'attempts', 'updated_at']
+    list_filter = ['status', 'updated_at']
+    search_fields = ['source', 'digest']
+    readonly_fields = ['digest', 'width', 'height', 'variants', 'attempts', 'error', 'created_at', 'updated_at']
+    actions = ['reprocess']
+
+    def reprocess(self, request, queryset):
+        """Derive the selected images again in the background."""
+        sources = list(queryset.values_list('source', flat=True))
+        queryset.update(status=ImageAsset.STATUS_PENDING, attempts=0)
+        transaction.on_commit(lambda: process_in_background(sources))
+        self.message_user(request, f'{len(sources)} image(s) queued for processing.')
+    reprocess.short_description = 'Reprocess selected images'
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to', 'last_error']
+    readonly_fields = ['submission', 'attempts', 'last_error', 'created_at', 'sent_at']
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        """Make the selected unsent emails due again with a fresh set of attempts."""
+        updated = queryset.exclude(status=OutboxEmail.STATUS_SENT).update(
+            status=OutboxEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} email(s) queued for sending.')
+    retry_now.short_description = 'Retry selected emails now'
@@ -6,4 +6,8 @@ from django.apps import AppConfig
 class DomainFinderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'domain_finder'
-    verbose_name = 'Domain Finder'
\ No newline at end of file
+    verbose_name = 'Domain Finder'
+
+    def ready(self):
+        # Register signal handlers that maintain derived catalog data
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Keyset-paginated blog listing.
+
+Published posts are listed newest first on (created_at, id), backed by
+partial indexes on BlogPost, and paged with an opaque cursor in the same
+format as the domain listing (see pagination.encode_token). Listing rows
+defer the Markdown source, its stored rendering and the search vector, and fetch author and
+category in the same query, so a page costs one query of ``limit + 1`` rows
+whatever the size of the archive.
+"""
+from django.db.models import Q
+
+from .models import BlogPost
+from .pagination import (
+    MAX_PAGE_SIZE, InvalidCursor, decode_token, encode_token, parse_cursor_datetime, parse_cursor_int,
+)
+
+
+BLOG_PAGE_SIZE = 6
+
+# Columns only the detail page needs, and the search index, which is about
+# as large as the content and only read inside SQL
+DEFERRED_FIELDS = ('content', 'content_html', 'toc_html', 'search_vector')
+
+
+def published_posts(category_slug=None):
+    """Published posts for listing pages, optionally limited to one category."""
+    posts = BlogPost.objects.filter(is_published=True)
+    if category_slug:
+        posts = posts.filter(category__slug=category_slug)
+    return posts.select_related('author', 'category').defer(*DEFERRED_FIELDS)
+
+
+def featured_post(category_slug=None):
+    """The newest featured post, shown above the listing grid."""
+    return published_posts(category_slug).filter(is_featured=True).order_by('-created_at', '-id').first()
+
+
+def _encode_blog_cursor(category_slug, post, exclude_pk):
+    return encode_token(['blog', category_slug or '', post.created_at.isoformat(), post.pk, exclude_pk])
+
+
+def _decode_blog_cursor(category_slug, token):
+    payload = decode_token(token)
+    if (
+        not isinstance(payload, list)
+        or len(payload) != 5
+        or payload[0] != 'blog'
+        or payload[1] != (category_slug or '')
+    ):
+        raise InvalidCursor("Cursor does not match the blog listing")
+    try:
+        exclude_pk = None if payload[4] is None else parse_cursor_int(payload[4])
+        return parse_cursor_datetime(payload[2]), parse_cursor_int(payload[3]), exclude_pk
+    except ValueError as e:
+        raise InvalidCursor(str(e))
+
+
+def paginate_posts(category_slug=None, cursor=None, limit=BLOG_PAGE_SIZE, exclude_pk=None):
+    """
+    Return ``(posts, next_cursor)`` for one page of the blog listing.
+
+    ``exclude_pk`` leaves out the featured post shown above the grid; it is
+    carried in the cursor so later pages keep excluding it.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    posts = published_posts(category_slug).order_by('-created_at', '-id')
+    if cursor:
+        created_at, last_id, exclude_pk = _decode_blog_cursor(category_slug, cursor)
+        posts = posts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id))
+    if exclude_pk is not None:
+        posts = posts.exclude(pk=exclude_pk)
+
+    posts = list(posts[:limit + 1])
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = _encode_blog_cursor(category_slug, posts[-1], exclude_pk)
+    return posts, next_cursor
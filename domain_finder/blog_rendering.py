@@ -0,0 +1,87 @@
+"""
+Markdown rendering for blog posts.
+
+Posts are rendered when they are saved and the HTML, table of contents, word
+count and reading time are stored on the row, so the detail view only emits
+stored HTML. A stored rendering is current while both the hash of the content
+and RENDERER_VERSION match; bump the version whenever the extensions or their
+configuration change and run ``render_blog_posts`` to re-render every post.
+"""
+import hashlib
+import math
+import threading
+
+import markdown
+from django.utils.html import strip_tags
+
+
+# Bump when MARKDOWN_EXTENSIONS or EXTENSION_CONFIGS change
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'toc']
+EXTENSION_CONFIGS = {
+    'toc': {'toc_depth': '2-3'},
+}
+
+WORDS_PER_MINUTE = 200
+
+# BlogPost columns written by render_markdown
+RENDERED_FIELDS = (
+    'content_html',
+    'toc_html',
+    'word_count',
+    'reading_minutes',
+    'content_hash',
+    'renderer_version',
+)
+
+_local = threading.local()
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _markdown():
+    # Building a Markdown instance loads every extension (and Pygments for
+    # codehilite); reuse one per thread and reset it between documents
+    md = getattr(_local, 'markdown', None)
+    if md is None:
+        md = _local.markdown = markdown.Markdown(
+            extensions=MARKDOWN_EXTENSIONS,
+            extension_configs=EXTENSION_CONFIGS,
+        )
+    return md.reset()
+
+
+def render_markdown(content):
+    """
+    Render ``content`` and return the fields stored on BlogPost.
+
+    Only depends on the content, so it can run in worker processes.
+    """
+    md = _markdown()
+    html = md.convert(content)
+    word_count = len(strip_tags(html).split())
+    return {
+        'content_html': html,
+        'toc_html': md.toc if md.toc_tokens else '',
+        'word_count': word_count,
+        'reading_minutes': max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+        'content_hash': content_hash(content),
+        'renderer_version': RENDERER_VERSION,
+    }
+
+
+def is_current(post):
+    """Whether the stored rendering of ``post`` matches its content and the renderer."""
+    return post.renderer_version == RENDERER_VERSION and post.content_hash == content_hash(post.content)
+
+
+def render_post(post):
+    """Refresh the stored rendering of ``post`` in place if it is out of date."""
+    if is_current(post):
+        return False
+    for field, value in render_markdown(post.content).items():
+        setattr(post, field, value)
+    return True
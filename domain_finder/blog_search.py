@@ -0,0 +1,134 @@
+"""
+Full-text search over published blog posts.
+
+Posts are matched against ``BlogPost.search_vector``, a weighted tsvector over
+title (A), excerpt (B) and content (C) kept up to date by a database trigger
+and backed by a GIN index, and ranked with ts_rank. Ranking and pagination
+only read the vector; ``ts_headline`` snippets are computed afterwards for
+the posts on the returned page alone. Pages are cached for a short time so
+repeated popular queries stay off the database.
+"""
+import hashlib
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .blog_listing import BLOG_PAGE_SIZE, published_posts
+from .models import BlogPost
+from .pagination import MAX_PAGE_SIZE, InvalidCursor, decode_token, encode_token
+from .search import MIN_QUERY_LENGTH, SEARCH_CONFIG, normalize_query
+
+
+BLOG_SEARCH_CACHE_TIMEOUT = 60
+
+# Private-use characters mark highlighted words until the snippet is escaped
+_START_SEL = '\ue000'
+_STOP_SEL = '\ue001'
+
+HEADLINE_OPTIONS = {
+    'max_words': 35,
+    'min_words': 15,
+    'max_fragments': 2,
+    'fragment_delimiter': ' … ',
+}
+
+
+def _search_query(query):
+    return SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def _decode_search_cursor(query, token):
+    payload = decode_token(token)
+    if (
+        not isinstance(payload, list)
+        or len(payload) != 4
+        or payload[0] != 'blog-search'
+        or payload[1] != query
+        or not isinstance(payload[2], (int, float))
+        or isinstance(payload[3], bool)
+        or not isinstance(payload[3], int)
+    ):
+        raise InvalidCursor("Cursor does not match the search query")
+    return float(payload[2]), payload[3]
+
+
+def _snippet_html(headline):
+    """Escape a headline and turn the selection markers into <mark> tags."""
+    return mark_safe(escape(headline).replace(_START_SEL, '<mark>').replace(_STOP_SEL, '</mark>'))
+
+
+def _headlines(query, post_ids):
+    """``{post id: snippet html}`` for the given posts only."""
+    headlines = BlogPost.objects.filter(pk__in=post_ids).annotate(
+        headline=SearchHeadline(
+            'content',
+            _search_query(query),
+            config=SEARCH_CONFIG,
+            start_sel=_START_SEL,
+            stop_sel=_STOP_SEL,
+            **HEADLINE_OPTIONS,
+        )
+    ).values_list('pk', 'headline')
+    return {pk: _snippet_html(headline) for pk, headline in headlines}
+
+
+def _search_page(query, cursor, limit):
+    search_query = _search_query(query)
+    posts = (
+        published_posts()
+        .filter(search_vector=search_query)
+        # Cast the real-valued rank to double precision so it survives the
+        # round trip through a cursor exactly
+        .annotate(rank=Cast(SearchRank(F('search_vector'), search_query), FloatField()))
+        .order_by('-rank', '-id')
+    )
+    if cursor:
+        rank, last_id = _decode_search_cursor(query, cursor)
+        posts = posts.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=last_id))
+
+    posts = list(posts[:limit + 1])
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_token(['blog-search', query, posts[-1].rank, posts[-1].pk])
+
+    snippets = _headlines(query, [post.pk for post in posts]) if posts else {}
+    results = [{
+        'id': post.pk,
+        'title': post.title,
+        'excerpt': post.excerpt,
+        'snippet': snippets.get(post.pk, ''),
+        'url': post.get_absolute_url(),
+        'image_url': post.image_url,
+        'category': post.category.name,
+        'author': post.author.name,
+        'read_time': post.display_read_time,
+        'date': post.formatted_date,
+    } for post in posts]
+    return results, next_cursor
+
+
+def search_posts(query, cursor=None, limit=BLOG_PAGE_SIZE):
+    """
+    Return ``(results, next_cursor)`` for one page of ranked search results.
+
+    Results are dicts of display fields with a highlighted ``snippet``.
+    Queries shorter than MIN_QUERY_LENGTH return no results.
+    """
+    query = normalize_query(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return [], None
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    # Invalid cursors raise before anything is cached
+    key_source = f"{query}\n{cursor or ''}\n{limit}"
+    cache_key = 'blog-search:' + hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+    page = cache.get(cache_key)
+    if page is None:
+        page = _search_page(query, cursor, limit)
+        cache.set(cache_key, page, BLOG_SEARCH_CACHE_TIMEOUT)
+    return page
@@ -0,0 +1,383 @@
+"""
+Resilient reCAPTCHA verification.
+
+django_recaptcha opens a fresh HTTPS connection for every verification and
+waits up to ten seconds for it. Here verification requests reuse a
+keep-alive connection per thread with a strict socket timeout, and a
+circuit breaker stops calling the verifier after repeated failures or slow
+answers. While the verifier is unavailable (error, timeout or open breaker)
+RECAPTCHA_FALLBACK_POLICY decides what happens to the submission:
+
+* ``review``: accept it, but hold it for review without notifying anyone
+* ``accept``: accept it and flag it as unverified
+* ``reject``: reject it, as django_recaptcha does
+
+Every verification records its outcome and latency in per-process metrics
+(``metrics.snapshot()``) and the log. RECAPTCHA_VERIFY_URL can point at a
+local stub verifier for testing.
+
+Async views use ``averify``, which shares the breaker and metrics but talks
+to the verifier over asyncio streams, one connection per verification.
+"""
+import asyncio
+import http.client
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django_recaptcha.fields import ReCaptchaField
+from django_recaptcha.widgets import ReCaptchaV3
+
+
+logger = logging.getLogger(__name__)
+
+# Verification statuses
+VERIFIED = 'verified'
+REJECTED = 'rejected'
+UNAVAILABLE = 'unavailable'
+
+# Fallback policies
+POLICY_REVIEW = 'review'
+POLICY_ACCEPT = 'accept'
+POLICY_REJECT = 'reject'
+FALLBACK_POLICIES = (POLICY_REVIEW, POLICY_ACCEPT, POLICY_REJECT)
+
+Verification = namedtuple('Verification', ['status', 'outcome', 'score', 'latency'])
+
+
+# -- circuit breaker ---------------------------------------------------------
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` failures in a row. Once
+    ``reset_timeout`` seconds have passed, a single trial call is let
+    through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Whether a call may go through now."""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+# -- metrics -----------------------------------------------------------------
+
+class VerificationMetrics:
+    """Per-process outcome counts and a latency histogram (seconds)."""
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.outcomes = Counter()
+            self.latency_buckets = [0] * (len(self.BUCKETS) + 1)
+            self.latency_total = 0.0
+            self.calls = 0
+
+    def record(self, outcome, latency=None):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            if latency is not None:
+                self.calls += 1
+                self.latency_total += latency
+                self.latency_buckets[bisect_left(self.BUCKETS, latency)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"le_{bound}" for bound in self.BUCKETS] + ['le_inf']
+            return {
+                'outcomes': dict(self.outcomes),
+                'calls': self.calls,
+                'mean_latency': self.latency_total / self.calls if self.calls else None,
+                'latency_buckets': dict(zip(labels, self.latency_buckets)),
+            }
+
+
+metrics = VerificationMetrics()
+
+breaker = CircuitBreaker(
+    failure_threshold=settings.RECAPTCHA_BREAKER_THRESHOLD,
+    reset_timeout=settings.RECAPTCHA_BREAKER_RESET,
+)
+
+
+# -- transport ---------------------------------------------------------------
+
+class VerifierUnavailable(Exception):
+    """Raised when the verifier cannot be reached or answers with garbage."""
+
+    def __init__(self, message, outcome='error'):
+        super().__init__(message)
+        self.outcome = outcome
+
+
+_local = threading.local()
+
+
+def _connection(url):
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        connection = _local.connection = connection_class(
+            url.hostname, url.port, timeout=settings.RECAPTCHA_VERIFY_TIMEOUT
+        )
+    return connection
+
+
+def _drop_connection():
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        connection.close()
+        _local.connection = None
+
+
+def _post(params):
+    """POST ``params`` to the verifier over this thread's keep-alive connection."""
+    url = urlsplit(settings.RECAPTCHA_VERIFY_URL)
+    path = url.path + (f"?{url.query}" if url.query else '')
+    body = urlencode(params).encode('utf-8')
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'User-Agent': 'reCAPTCHA Django'}
+    for attempt in range(2):
+        connection = _connection(url)
+        reused = connection.sock is not None
+        try:
+            connection.request('POST', path, body, headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (ConnectionResetError, BrokenPipeError, http.client.BadStatusLine):
+            _drop_connection()
+            # The server closed an idle keep-alive connection; retry once on
+            # a new one. Timeouts are never retried.
+            if reused and attempt == 0:
+                continue
+            raise
+        except (OSError, http.client.HTTPException):
+            _drop_connection()
+            raise
+        if response.will_close:
+            _drop_connection()
+        if response.status != 200:
+            raise VerifierUnavailable(f"Verifier answered HTTP {response.status}")
+        return data
+
+
+def _verify_params(token, remote_ip):
+    return {'secret': settings.RECAPTCHA_PRIVATE_KEY, 'response': token, 'remoteip': remote_ip or ''}
+
+
+def _siteverify(token, remote_ip):
+    try:
+        data = _post(_verify_params(token, remote_ip))
+        return json.loads(data.decode('utf-8'))
+    except TimeoutError as e:
+        raise VerifierUnavailable(f"Timed out: {e}", 'timeout')
+    except (OSError, http.client.HTTPException, ValueError) as e:
+        raise VerifierUnavailable(f"{type(e).__name__}: {e}")
+
+
+async def _apost(params):
+    """POST ``params`` to the verifier over a new asyncio connection."""
+    url = urlsplit(settings.RECAPTCHA_VERIFY_URL)
+    path = url.path + (f"?{url.query}" if url.query else '')
+    body = urlencode(params).encode('utf-8')
+    reader, writer = await asyncio.open_connection(
+        url.hostname, url.port or (443 if url.scheme == 'https' else 80), ssl=url.scheme == 'https' or None
+    )
+    try:
+        # HTTP/1.0 keeps the response unchunked and delimited by the close
+        writer.write(
+            f"POST {path} HTTP/1.0\r\n"
+            f"Host: {url.netloc}\r\n"
+            "Content-Type: application/x-www-form-urlencoded\r\n"
+            "User-Agent: reCAPTCHA Django\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, data = response.partition(b'\r\n\r\n')
+    status = head.split(b' ', 2)[1:2]
+    if status != [b'200']:
+        raise VerifierUnavailable(f"Verifier answered HTTP {b''.join(status).decode('latin-1') or '?'}")
+    return data
+
+
+async def _asiteverify(token, remote_ip):
+    try:
+        data = await asyncio.wait_for(_apost(_verify_params(token, remote_ip)), settings.RECAPTCHA_VERIFY_TIMEOUT)
+        return json.loads(data.decode('utf-8'))
+    except TimeoutError as e:
+        raise VerifierUnavailable(f"Timed out: {e}", 'timeout')
+    except (OSError, ValueError) as e:
+        raise VerifierUnavailable(f"{type(e).__name__}: {e}")
+
+
+# -- verification ------------------------------------------------------------
+
+def _rejection(result, expected_action, required_score):
+    """Why ``result`` fails verification, or None."""
+    if not result.get('success'):
+        return 'invalid'
+    if expected_action and result.get('action') != expected_action:
+        return 'action_mismatch'
+    if required_score and float(result.get('score', 0)) < required_score:
+        return 'low_score'
+    return None
+
+
+def _skipped():
+    metrics.record('breaker_open')
+    logger.warning("reCAPTCHA verifier skipped: circuit breaker open")
+    return Verification(UNAVAILABLE, 'breaker_open', None, None)
+
+
+def verify(token, remote_ip=None, expected_action=None, required_score=None):
+    """Verify ``token`` and return a Verification; never raises for outages."""
+    if not breaker.allow():
+        return _skipped()
+    started = time.monotonic()
+    try:
+        result = _siteverify(token, remote_ip)
+    except VerifierUnavailable as e:
+        return _conclude(None, e, started, expected_action, required_score)
+    return _conclude(result, None, started, expected_action, required_score)
+
+
+async def averify(token, remote_ip=None, expected_action=None, required_score=None):
+    """Async version of verify."""
+    if not breaker.allow():
+        return _skipped()
+    started = time.monotonic()
+    try:
+        result = await _asiteverify(token, remote_ip)
+    except VerifierUnavailable as e:
+        return _conclude(None, e, started, expected_action, required_score)
+    return _conclude(result, None, started, expected_action, required_score)
+
+
+def _conclude(result, error, started, expected_action, required_score):
+    """Record the outcome of a verifier call and turn it into a Verification."""
+    latency = time.monotonic() - started
+    if error is not None:
+        breaker.record_failure()
+        metrics.record(error.outcome, latency)
+        logger.warning("reCAPTCHA verifier unavailable after %.0f ms: %s", latency * 1000, error)
+        return Verification(UNAVAILABLE, error.outcome, None, latency)
+
+    # A slow answer still counts, but repeated slowness opens the breaker
+    if latency > settings.RECAPTCHA_SLOW_SECONDS:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+    score = result.get('score')
+    rejection = _rejection(result, expected_action, required_score)
+    outcome = rejection or 'success'
+    metrics.record(outcome, latency)
+    logger.info("reCAPTCHA %s in %.0f ms (score %s)", outcome, latency * 1000, score)
+    if rejection:
+        logger.warning("ReCAPTCHA validation failed due to: %s %s", rejection, result.get('error-codes', []))
+        return Verification(REJECTED, outcome, score, latency)
+    return Verification(VERIFIED, outcome, score, latency)
+
+
+class ResilientReCaptchaField(ReCaptchaField):
+    """
+    ReCaptchaField verifying through ``verify``, or ahead of validation
+    through ``apreverify`` in async views.
+
+    After validation ``verification`` holds the result, and ``needs_review``
+    or ``unverified`` say how a submission accepted under the fallback
+    policy must be treated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.verification = None
+
+    def _verify_kwargs(self):
+        required_score = getattr(self.widget, 'required_score', None) or settings.RECAPTCHA_SCORE_THRESHOLD
+        return {
+            'expected_action': self.widget.action if isinstance(self.widget, ReCaptchaV3) else None,
+            'required_score': float(required_score) if required_score else None,
+        }
+
+    async def apreverify(self, value, remote_ip):
+        """Verify ``value`` ahead of validation, which then uses the result."""
+        # Cleaned as validation will see it, so any token it would verify is
+        # verified here instead of blocking the event loop
+        value = self.to_python(value)
+        if value not in self.empty_values:
+            self.verification = await averify(value, remote_ip=remote_ip, **self._verify_kwargs())
+
+    def validate(self, value):
+        # CharField validation only; the network check is ours
+        super(ReCaptchaField, self).validate(value)
+
+        if self.verification is None:
+            self.verification = verify(value, remote_ip=self.get_remote_ip(), **self._verify_kwargs())
+        if self.verification.status == REJECTED:
+            raise ValidationError(self.error_messages['captcha_invalid'], code='captcha_invalid')
+        if self.verification.status == UNAVAILABLE and settings.RECAPTCHA_FALLBACK_POLICY == POLICY_REJECT:
+            raise ValidationError(self.error_messages['captcha_error'], code='captcha_error')
+
+    @property
+    def needs_review(self):
+        return (
+            self.verification is not None
+            and self.verification.status == UNAVAILABLE
+            and settings.RECAPTCHA_FALLBACK_POLICY == POLICY_REVIEW
+        )
+
+    @property
+    def unverified(self):
+        return self.verification is not None and self.verification.status == UNAVAILABLE
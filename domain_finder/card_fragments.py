@@ -0,0 +1,41 @@
+"""
+Per-domain fragment cache for rendered domain cards.
+
+Each card is rendered once from ``includes/domain_card.html`` and cached
+under a key that carries the card's ``updated_at``. Every write to a domain,
+its currency or its status rebuilds the card and moves that timestamp, so
+stale fragments are never read again and simply expire. A page of cards is
+one ``get_many`` plus a join; only misses are rendered.
+"""
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+
+CARD_TEMPLATE = 'includes/domain_card.html'
+
+# Bump when the card template changes so old fragments are ignored
+FRAGMENT_VERSION = 1
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def fragment_key(row):
+    """Cache key of a card row, versioned on the card's ``updated_at``."""
+    return f"domain-card:{FRAGMENT_VERSION}:{row['id']}:{row['card_updated_at']:%Y%m%d%H%M%S%f}"
+
+
+def render_domain_cards(rows):
+    """Return the concatenated HTML of the cards for ``rows``, in order."""
+    keys = [fragment_key(row) for row in rows]
+    fragments = cache.get_many(keys)
+
+    missing = {}
+    for key, row in zip(keys, rows):
+        if key not in fragments:
+            missing[key] = render_to_string(CARD_TEMPLATE, {'domain': row})
+    if missing:
+        cache.set_many(missing, FRAGMENT_TIMEOUT)
+        fragments.update(missing)
+
+    return mark_safe(''.join(fragments[key] for key in keys))
@@ -0,0 +1,251 @@
+"""
+Catalog statistics service.
+
+Keeps the single CatalogStatistics row in step with the Domain table. Counts
+and price sums, minimums and maximums are adjusted by deltas when a domain
+is saved or deleted; the bounds of a currency are re-read only when its
+cheapest or dearest domain goes. Medians cannot be maintained that way, so a
+change only marks its currency's median stale. get_catalog_statistics()
+recomputes stale medians at most every MEDIAN_REFRESH_INTERVAL seconds per
+process, and ``rebuild_catalog_stats --medians`` does it on a schedule.
+Readers get everything with one primary-key lookup regardless of catalog
+size.
+"""
+import time
+from collections import Counter, namedtuple
+from decimal import Decimal
+
+from django.db import connections, models, transaction
+
+from .models import CatalogStatistics, Domain
+
+
+STATS_PK = 1
+
+# Currency key used for domains without a currency (priced in dollars by
+# Domain.formatted_price).
+NO_CURRENCY = ''
+NO_CURRENCY_SYMBOL = '$'
+
+# Seconds between lazy refreshes of stale medians in one process
+MEDIAN_REFRESH_INTERVAL = 60
+
+_medians_checked_at = None
+
+
+# The parts of a domain that the statistics depend on
+DomainSnapshot = namedtuple('DomainSnapshot', ['is_available', 'currency_code', 'status_slug', 'tld', 'price'])
+
+
+class Median(models.Aggregate):
+    """PostgreSQL continuous median (percentile_cont)."""
+    function = 'percentile_cont'
+    template = '%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = models.FloatField()
+
+
+def domain_tld(name):
+    """Return the top-level domain of a domain name (e.g. 'com', 'uk')."""
+    return name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+
+
+def snapshot_domain(pk):
+    """Read the statistics-relevant state of a stored domain, or None."""
+    row = (
+        Domain.objects.filter(pk=pk)
+        .values('is_available', 'currency__code', 'status__slug', 'name', 'price')
+        .first()
+    )
+    if row is None:
+        return None
+    return DomainSnapshot(
+        is_available=row['is_available'],
+        currency_code=row['currency__code'] or NO_CURRENCY,
+        status_slug=row['status__slug'],
+        tld=domain_tld(row['name']),
+        price=row['price'],
+    )
+
+
+def _currency_domains(code):
+    if code == NO_CURRENCY:
+        return Domain.objects.filter(currency__isnull=True)
+    return Domain.objects.filter(currency__code=code)
+
+
+def _currency_price_stats(queryset):
+    """Group available domains by currency and compute price aggregates."""
+    rows = (
+        queryset.filter(is_available=True)
+        .values('currency__code', 'currency__symbol')
+        .annotate(
+            count=models.Count('id'),
+            sum=models.Sum('price'),
+            min=models.Min('price'),
+            max=models.Max('price'),
+            median=Median('price'),
+        )
+        .order_by()
+    )
+    stats = {}
+    for row in rows:
+        stats[row['currency__code'] or NO_CURRENCY] = {
+            'symbol': row['currency__symbol'] or NO_CURRENCY_SYMBOL,
+            'count': row['count'],
+            'sum': str(row['sum']),
+            'min': str(row['min']),
+            'max': str(row['max']),
+            'median': f"{row['median']:.2f}",
+        }
+    return stats
+
+
+def rebuild_catalog_statistics():
+    """Recompute every aggregate from scratch and store it."""
+    available = Domain.objects.filter(is_available=True)
+    tld_counts = Counter(domain_tld(name) for name in available.values_list('name', flat=True).iterator())
+    status_counts = {
+        row['status__slug']: row['count']
+        for row in available.values('status__slug').annotate(count=models.Count('id')).order_by()
+    }
+
+    stats, _ = CatalogStatistics.objects.update_or_create(
+        pk=STATS_PK,
+        defaults={
+            'total_count': Domain.objects.count(),
+            'available_count': available.count(),
+            'currency_stats': _currency_price_stats(Domain.objects.all()),
+            'status_counts': status_counts,
+            'tld_counts': dict(tld_counts),
+        },
+    )
+    return stats
+
+
+def refresh_stale_medians():
+    """
+    Recompute the medians marked stale since they were last computed.
+
+    Returns the refreshed currency stats, or None when there was nothing to
+    do or another process holds the row.
+    """
+    with transaction.atomic(using='default'):
+        stats = (
+            CatalogStatistics.objects.using('default')
+            .select_for_update(skip_locked=True).filter(pk=STATS_PK).first()
+        )
+        if stats is None:
+            return None
+        stale = [code for code, entry in stats.currency_stats.items() if entry.get('median_stale')]
+        if not stale:
+            return None
+        for code in stale:
+            median = _currency_domains(code).using('default').filter(is_available=True).aggregate(
+                median=Median('price')
+            )['median']
+            entry = stats.currency_stats[code]
+            if median is not None:
+                entry['median'] = f"{median:.2f}"
+            del entry['median_stale']
+        # Not a catalog change, so updated_at (the catalog version) stays
+        CatalogStatistics.objects.using('default').filter(pk=STATS_PK).update(currency_stats=stats.currency_stats)
+    return stats.currency_stats
+
+
+def _medians_due(stats):
+    global _medians_checked_at
+    if not any(entry.get('median_stale') for entry in stats.currency_stats.values()):
+        return False
+    # A caller's transaction may be a read-only snapshot
+    if connections['default'].in_atomic_block:
+        return False
+    now = time.monotonic()
+    if _medians_checked_at is not None and now - _medians_checked_at < MEDIAN_REFRESH_INTERVAL:
+        return False
+    _medians_checked_at = now
+    return True
+
+
+def get_catalog_statistics():
+    """Return the stored statistics, building them on first use and refreshing stale medians when due."""
+    stats = CatalogStatistics.objects.filter(pk=STATS_PK).first()
+    if stats is None:
+        stats = rebuild_catalog_statistics()
+    elif _medians_due(stats):
+        currency_stats = refresh_stale_medians()
+        if currency_stats is not None:
+            stats.currency_stats = currency_stats
+    return stats
+
+
+def _adjust(counts, key, delta):
+    counts[key] = counts.get(key, 0) + delta
+    if counts[key] <= 0:
+        del counts[key]
+
+
+def _adjust_price(currency_stats, code, price, delta):
+    """
+    Add (``delta`` 1) or remove (-1) one available domain's price.
+
+    Returns False when the currency's stats must be read from the database
+    instead: bounds when its cheapest or dearest domain was removed, all of
+    them when there is no entry to adjust.
+    """
+    entry = currency_stats.get(code)
+    if entry is None or 'sum' not in entry:
+        return False
+    entry['count'] += delta
+    if entry['count'] <= 0:
+        del currency_stats[code]
+        return True
+    entry['sum'] = str(Decimal(entry['sum']) + delta * price)
+    entry['median_stale'] = True
+    price_min, price_max = Decimal(entry['min']), Decimal(entry['max'])
+    if delta > 0:
+        entry['min'] = str(min(price_min, price))
+        entry['max'] = str(max(price_max, price))
+        return True
+    return price_min < price < price_max
+
+
+def apply_domain_change(old, new):
+    """
+    Apply one domain change to the stored statistics.
+
+    ``old`` and ``new`` are DomainSnapshots from before and after the write;
+    ``old`` is None for a create and ``new`` is None for a delete.
+    """
+    with transaction.atomic():
+        stats = CatalogStatistics.objects.select_for_update().filter(pk=STATS_PK).first()
+        if stats is None:
+            rebuild_catalog_statistics()
+            return
+
+        stats.total_count += (new is not None) - (old is not None)
+
+        unknown = set()
+        for snapshot, delta in ((old, -1), (new, 1)):
+            if snapshot is None or not snapshot.is_available:
+                continue
+            stats.available_count += delta
+            _adjust(stats.status_counts, snapshot.status_slug, delta)
+            _adjust(stats.tld_counts, snapshot.tld, delta)
+            if not _adjust_price(stats.currency_stats, snapshot.currency_code, snapshot.price, delta):
+                unknown.add(snapshot.currency_code)
+
+        for code in unknown:
+            entry = stats.currency_stats.get(code)
+            if entry is None or 'sum' not in entry:
+                # First available domain in the currency, or stats stored
+                # before sums were kept
+                stats.currency_stats.pop(code, None)
+                stats.currency_stats.update(_currency_price_stats(_currency_domains(code)))
+            else:
+                bounds = _currency_domains(code).filter(is_available=True).aggregate(
+                    min=models.Min('price'), max=models.Max('price')
+                )
+                entry['min'] = str(bounds['min'])
+                entry['max'] = str(bounds['max'])
+
+        stats.save()
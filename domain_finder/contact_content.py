@@ -0,0 +1,36 @@
+"""
+Process-level snapshot of the contact details shown across the site.
+
+The active ContactInfo, its active services and the active ExpectationItems
+are read once and kept in memory. The snapshot is tied to the ``site``
+content version of page_cache, which is bumped whenever any of these models
+is saved or deleted, so every process reloads it within
+VERSION_CHECK_INTERVAL seconds of a change, and the process that made the
+change reloads it at once.
+"""
+from collections import namedtuple
+
+from .models import ContactInfo, ExpectationItem
+from .page_cache import SITE, current_versions
+
+
+ContactContent = namedtuple('ContactContent', ['contact_info', 'services', 'expectation_items'])
+
+# (site version, ContactContent), replaced as a whole
+_current = [None]
+
+
+def _load():
+    contact_info = ContactInfo.objects.filter(is_active=True).first()
+    services = list(contact_info.services.filter(is_active=True)) if contact_info else []
+    expectation_items = list(ExpectationItem.objects.filter(is_active=True).order_by('order', 'title'))
+    return ContactContent(contact_info, services, expectation_items)
+
+
+def get_contact_content():
+    """The current ContactContent; treat the instances in it as read-only."""
+    version = current_versions().get(SITE, 0)
+    current = _current[0]
+    if current is None or current[0] != version:
+        current = _current[0] = (version, _load())
+    return current[1]
@@ -1,13 +1,18 @@
 """
 Context processors for Domain Finder.
 """
-from .models import ContactInfo
+from django.utils.functional import SimpleLazyObject
+
+from .contact_content import get_contact_content
 
 
 def contact_info(request):
     """
     Make contact information available in all templates.
+
+    Lazy and served from the in-memory snapshot, so templates that never
+    use it cost nothing and the rest cost no query.
     """
     return {
-        'contact_info': ContactInfo.get_active_contact_info()
+        'contact_info': SimpleLazyObject(lambda: get_contact_content().contact_info)
     }
\ No newline at end of file
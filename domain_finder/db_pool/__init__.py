@@ -0,0 +1,7 @@
+"""
+Pooled PostgreSQL database backend.
+
+Use ``'ENGINE': 'domain_finder.db_pool'`` with an optional ``POOL`` dict of
+ConnectionPool arguments in the database settings. Each process keeps its
+own pool per database alias; ``pool_stats()`` reports on them.
+"""
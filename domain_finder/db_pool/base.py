@@ -0,0 +1,75 @@
+"""
+PostgreSQL backend that borrows connections from a per-process pool.
+
+Django still "closes" its connection at the end of every request
+(CONN_MAX_AGE = 0), which here returns it to the pool, so a request only
+holds a connection while it runs, under WSGI and ASGI alike. Pool limits
+come from the ``POOL`` entry of the database settings.
+"""
+import threading
+
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.utils.asyncio import async_unsafe
+
+from .pool import ConnectionPool
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    """The pool of ``alias``, replaced when it now points at another database."""
+    target = tuple(conn_params.get(name) for name in ('dbname', 'user', 'host', 'port'))
+    with _pools_lock:
+        pool, pool_target = _pools.get(alias, (None, None))
+        if pool is None or pool_target != target:
+            if pool is not None:
+                pool.close()
+            pool = ConnectionPool(**settings_dict.get('POOL', {}))
+            _pools[alias] = (pool, target)
+        return pool
+
+
+def close_pools():
+    """Close every idle pooled connection of this process."""
+    with _pools_lock:
+        pools = [pool for pool, _ in _pools.values()]
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """``{alias: stats}`` for the pools of this process."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {alias: dict(pool.stats(), database=target[0]) for alias, (pool, target) in pools}
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database in use
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, self.settings_dict, conn_params)
+        connection = self.pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        # Set by the parent for connections it opens, but needed for reused ones too
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Closed inside an atomic block Django keeps the connection object
+                # until the block exits, so it must not be handed to anyone else
+                self.pool.putconn(self.connection, discard=self.in_atomic_block)
@@ -0,0 +1,261 @@
+"""
+A thread-safe pool of psycopg2 connections.
+
+Connections are opened on demand up to ``max_size``; a borrower that finds
+the pool exhausted waits up to ``timeout`` seconds for one to be returned
+and then fails with PoolTimeout. On checkout a connection is pinged first
+if it has been idle for longer than ``check_interval`` or has unexpected
+data waiting on its socket (a terminated backend says so before hanging
+up). One older than its lifetime (``max_lifetime``, minus up to 10% jitter
+so connections opened together are not all replaced together) is closed
+and replaced. Idle connections beyond ``min_size`` are closed once idle for
+``max_idle``.
+
+Connections that are garbage collected while checked out (a thread that
+died without returning its connection) free their slot, and a forked
+process starts with an empty pool rather than sharing its parent's sockets.
+"""
+import os
+import random
+import select
+import threading
+import time
+import weakref
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became available within the pool's timeout."""
+
+
+class _Stats:
+    def __init__(self):
+        self.connects = 0
+        self.connect_errors = 0
+        self.connect_time = 0.0
+        self.connect_time_max = 0.0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        self.failed_checks = 0
+        self.recycled = 0
+        self.idle_closed = 0
+
+
+class ConnectionPool:
+    """Pool of connections made by the ``connect`` callable passed to getconn()."""
+
+    # Longest single wait, so slots freed by garbage collection are noticed
+    WAIT_SLICE = 0.5
+
+    def __init__(self, min_size=0, max_size=10, timeout=10.0, max_lifetime=1800.0,
+                 max_idle=300.0, check_interval=30.0):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        # (connection, expires_at, returned_at), most recently returned last
+        self._idle = deque()
+        # connection -> expires_at
+        self._checked_out = weakref.WeakKeyDictionary()
+        self._connecting = 0
+        self._waiting = 0
+        self._stats = _Stats()
+
+    def _size(self):
+        return len(self._idle) + len(self._checked_out) + self._connecting
+
+    def _expires_at(self, now):
+        if not self.max_lifetime:
+            return None
+        return now + self.max_lifetime * (1 - random.random() * 0.1)
+
+    def getconn(self, connect):
+        """Borrow a connection, opening one with ``connect()`` if none is idle."""
+        deadline = time.monotonic() + self.timeout
+        waited = None
+        queued = False
+        while True:
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+                # Newcomers queue behind waiting borrowers instead of taking
+                # the connection they were woken for
+                while (not self._idle and self._size() >= self.max_size) or (self._waiting and not queued):
+                    queued = True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats.timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {self.timeout}s "
+                            f"({self.max_size} in use)"
+                        )
+                    if waited is None:
+                        waited = time.monotonic()
+                        self._stats.waits += 1
+                    self._waiting += 1
+                    try:
+                        self._available.wait(min(remaining, self.WAIT_SLICE))
+                    finally:
+                        self._waiting -= 1
+                if waited is not None:
+                    wait_time = time.monotonic() - waited
+                    self._stats.wait_time += wait_time
+                    self._stats.wait_time_max = max(self._stats.wait_time_max, wait_time)
+                    waited = None
+                if self._idle:
+                    connection, expires_at, returned_at = self._idle.pop()
+                    self._checked_out[connection] = expires_at
+                else:
+                    connection = None
+                    self._connecting += 1
+
+            if connection is None:
+                return self._open(connect)
+            if self._usable(connection, expires_at, returned_at):
+                with self._lock:
+                    self._stats.checkouts += 1
+                return connection
+            self._discard(connection)
+
+    def _open(self, connect):
+        started = time.monotonic()
+        try:
+            connection = connect()
+        except BaseException:
+            with self._lock:
+                self._connecting -= 1
+                self._stats.connect_errors += 1
+                self._available.notify()
+            raise
+        now = time.monotonic()
+        with self._lock:
+            self._connecting -= 1
+            self._checked_out[connection] = self._expires_at(now)
+            self._stats.connects += 1
+            self._stats.checkouts += 1
+            self._stats.connect_time += now - started
+            self._stats.connect_time_max = max(self._stats.connect_time_max, now - started)
+        return connection
+
+    def _usable(self, connection, expires_at, returned_at):
+        now = time.monotonic()
+        if connection.closed:
+            self._count('failed_checks')
+            return False
+        if expires_at is not None and now >= expires_at:
+            self._count('recycled')
+            return False
+        # An idle connection has nothing to read unless the server sent
+        # something unasked, typically a termination notice
+        if now - returned_at >= self.check_interval or select.select([connection], [], [], 0)[0]:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except psycopg2.Error:
+                self._count('failed_checks')
+                return False
+        return True
+
+    def putconn(self, connection, discard=False):
+        """Return a borrowed connection; ``discard`` closes it instead."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Borrowed before a fork: the socket belongs to the parent
+                return
+            expires_at = self._checked_out.pop(connection, None)
+
+        status = extensions.TRANSACTION_STATUS_UNKNOWN if connection.closed else connection.info.transaction_status
+        if not discard and status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+            try:
+                connection.rollback()
+                status = extensions.TRANSACTION_STATUS_IDLE
+            except psycopg2.Error:
+                status = extensions.TRANSACTION_STATUS_UNKNOWN
+        if discard or status != extensions.TRANSACTION_STATUS_IDLE:
+            self._close(connection)
+            return
+
+        now = time.monotonic()
+        if expires_at is not None and now >= expires_at:
+            self._count('recycled')
+            self._close(connection)
+            return
+        with self._lock:
+            self._idle.append((connection, expires_at, now))
+            stale = self._prune(now)
+            self._available.notify()
+        for connection in stale:
+            self._close(connection)
+
+    def _prune(self, now):
+        """Take connections idle for longer than max_idle out of the pool, keeping min_size."""
+        stale = []
+        while (self.max_idle and len(self._idle) > self.min_size
+               and now - self._idle[0][2] >= self.max_idle):
+            stale.append(self._idle.popleft()[0])
+            self._stats.idle_closed += 1
+        return stale
+
+    def _discard(self, connection):
+        with self._lock:
+            self._checked_out.pop(connection, None)
+            self._available.notify()
+        self._close(connection)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        with self._lock:
+            self._available.notify()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self._stats, name, getattr(self._stats, name) + 1)
+
+    def close(self):
+        """Close the idle connections; borrowed ones are closed as they come back."""
+        with self._lock:
+            idle = [connection for connection, _, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self):
+        with self._lock:
+            stats = self._stats
+            return {
+                'size': self._size(),
+                'max_size': self.max_size,
+                'idle': len(self._idle),
+                'checked_out': len(self._checked_out),
+                'connecting': self._connecting,
+                'waiting': self._waiting,
+                'checkouts': stats.checkouts,
+                'connects': stats.connects,
+                'connect_errors': stats.connect_errors,
+                'connect_ms_mean': round(stats.connect_time / stats.connects * 1000, 2) if stats.connects else None,
+                'connect_ms_max': round(stats.connect_time_max * 1000, 2),
+                'waits': stats.waits,
+                'wait_ms_mean': round(stats.wait_time / stats.waits * 1000, 2) if stats.waits else None,
+                'wait_ms_max': round(stats.wait_time_max * 1000, 2),
+                'timeouts': stats.timeouts,
+                'failed_checks': stats.failed_checks,
+                'recycled': stats.recycled,
+                'idle_closed': stats.idle_closed,
+            }
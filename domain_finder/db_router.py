@@ -0,0 +1,240 @@
+"""
+Read replicas for public read-only pages.
+
+Views marked ``@replica_reads`` run their GET and HEAD reads against one of
+the DATABASE_REPLICAS (see DB_REPLICA_HOSTS); everything else (writes, the
+admin, the contact form, management commands) uses ``default``, the
+primary. One replica is picked per request, so a page reads a single
+consistent snapshot.
+
+Replicas are skipped while their replication lag exceeds REPLICA_MAX_LAG
+seconds or they cannot be reached. Lag is measured against the primary's
+current WAL position, so a replica that stopped receiving WAL is not
+mistaken for one that is up to date. Each process measures the lag of a
+replica at most every REPLICA_LAG_CHECK_INTERVAL seconds; with no usable
+replica, reads go to the primary.
+
+Read-your-writes: when a successful POST (or other unsafe request) asked
+the router for the write database, PrimaryPinMiddleware sets a cookie that
+pins the client to the primary for REPLICA_PIN_SECONDS. Django also asks
+when validating unique constraints, so a rejected form can pin too, which
+only costs that client its replica reads for a while. Keep the window
+longer than max_staleness(), the most a replica in use can be behind.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# Seconds behind the primary, given the primary's current WAL position: 0
+# once the replica has replayed up to it (an idle primary writes nothing to
+# replay), else the age of the last transaction replayed, which keeps growing
+# while a disconnected replica falls behind. NULL when it cannot be told.
+_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_replay_lsn() >= %s::pg_lsn THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8
+    END
+"""
+
+# Replica alias for the reads of the current request, None for the primary
+_replica = contextvars.ContextVar('read_replica', default=None)
+
+# Set by PrimaryPinMiddleware to a dict the router flags writes in; shared
+# with the threads sync_to_async copies the context into
+_request_writes = contextvars.ContextVar('request_writes', default=None)
+
+# alias -> (checked_at, lag in seconds or None if unusable)
+_lags = {}
+_lags_lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """Send reads inside ``@replica_reads`` views to their replica, and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def max_staleness():
+    """Seconds a replica chosen for reads can be behind the primary."""
+    return settings.REPLICA_MAX_LAG + settings.REPLICA_LAG_CHECK_INTERVAL
+
+
+def _measure_lag(alias):
+    # What the primary has written before asking counts as pending, so a
+    # replica whose WAL receiver has stopped is not taken for caught up
+    try:
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT pg_current_wal_lsn()')
+            primary_lsn = cursor.fetchone()[0]
+    except DatabaseError as e:
+        logger.warning("Cannot measure read replica %s without the primary: %s", alias, e)
+        return None
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(_LAG_SQL, [primary_lsn])
+            return cursor.fetchone()[0]
+    except DatabaseError as e:
+        logger.warning("Read replica %s unavailable: %s", alias, e)
+        connection.close()
+        return None
+
+
+def replica_lag(alias):
+    """The last measured lag of ``alias`` in seconds, or None if unusable; re-measured when due."""
+    checked_at, lag = _lags.get(alias, (None, None))
+    if checked_at is not None and time.monotonic() - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return lag
+    # One thread re-measures while the others go on with the previous value
+    if not _lags_lock.acquire(blocking=checked_at is None):
+        return lag
+    try:
+        checked_at, lag = _lags.get(alias, (None, None))
+        if checked_at is None or time.monotonic() - checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+            lag = _measure_lag(alias)
+            _lags[alias] = (time.monotonic(), lag)
+            if lag is not None and lag > settings.REPLICA_MAX_LAG:
+                logger.warning("Skipping read replica %s: %.1fs behind", alias, lag)
+        return lag
+    finally:
+        _lags_lock.release()
+
+
+def choose_replica():
+    """A replica within REPLICA_MAX_LAG, or None to read from the primary."""
+    usable = []
+    for alias in settings.DATABASE_REPLICAS:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+            usable.append(alias)
+    return random.choice(usable) if usable else None
+
+
+def is_pinned(request):
+    """Whether the client wrote recently and must read from the primary."""
+    return settings.REPLICA_PIN_COOKIE in request.COOKIES
+
+
+def _wants_replica(request):
+    return bool(settings.DATABASE_REPLICAS) and request.method in ('GET', 'HEAD') and not is_pinned(request)
+
+
+def replica_status():
+    """``{alias: {'lag': seconds or None, 'checked_ago': seconds or None}}`` as this process sees it."""
+    now = time.monotonic()
+    status = {}
+    for alias in settings.DATABASE_REPLICAS:
+        checked_at, lag = _lags.get(alias, (None, None))
+        status[alias] = {
+            'lag': lag,
+            'checked_ago': round(now - checked_at, 1) if checked_at is not None else None,
+        }
+    return status
+
+
+def replica_reads(view):
+    """
+    Run the reads of a read-only view on a replica when one is usable.
+
+    Sets ``request.read_replica`` to the chosen alias (None for the primary).
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            # Measuring lag queries the replica
+            alias = await sync_to_async(choose_replica)() if _wants_replica(request) else None
+            request.read_replica = alias
+            token = _replica.set(alias)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = choose_replica() if _wants_replica(request) else None
+        request.read_replica = alias
+        token = _replica.set(alias)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return wrapper
+
+
+def _pin(request, response, writes):
+    if writes['wrote'] and request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            settings.REPLICA_PIN_COOKIE, '1',
+            max_age=settings.REPLICA_PIN_SECONDS,
+            secure=request.is_secure(),
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+
+class PrimaryPinMiddleware:
+    """
+    Pin clients to the primary for REPLICA_PIN_SECONDS after a successful
+    request that wrote, so their next pages show what they just wrote.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        writes = {'wrote': False}
+        token = _request_writes.set(writes)
+        try:
+            return _pin(request, self.get_response(request), writes)
+        finally:
+            _request_writes.reset(token)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        writes = {'wrote': False}
+        token = _request_writes.set(writes)
+        try:
+            return _pin(request, await self.get_response(request), writes)
+        finally:
+            _request_writes.reset(token)
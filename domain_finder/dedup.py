@@ -0,0 +1,132 @@
+"""
+Duplicate detection for contact submissions.
+
+A submission is answered from an earlier one, without a new row or
+notification, when
+
+* it carries the Idempotency-Key of a request already processed (contact.js
+  sends one per distinct submission and reuses it on retries);
+* the same email sent the same normalized message within DUPLICATE_WINDOW
+  (``content_hash``, indexed together with ``submitted_at``).
+
+Repeats bump the original's ``duplicate_count``. Saving re-checks under a
+transaction-scoped advisory lock on the content hash, so identical requests
+racing each other cannot both be inserted.
+
+Near-duplicates are never dropped: inquiries about different domains often
+share all but a word. A message whose word-pair shingle simhash is within
+NEAR_DUPLICATE_DISTANCE bits of a submission from the last
+NEAR_DUPLICATE_WINDOW is saved with ``near_duplicate_of`` pointing at it.
+"""
+import hashlib
+import re
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import ContactSubmission
+
+
+DUPLICATE_WINDOW = timedelta(hours=24)
+NEAR_DUPLICATE_WINDOW = timedelta(hours=1)
+# Contact messages are short: one changed word moves word-pair simhashes by
+# 5-15 bits, so distinct inquiries that differ only in the domain name can
+# be 10 apart. Only near-verbatim resends are flagged.
+NEAR_DUPLICATE_DISTANCE = 4
+
+SHINGLE_SIZE = 2
+# Shorter messages are too similar by chance to be collapsed
+MIN_SHINGLES = 8
+
+IDEMPOTENCY_KEY_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+Fingerprint = namedtuple('Fingerprint', ['idempotency_key', 'content_hash', 'simhash'])
+
+
+def normalize(text):
+    """Lowercase with whitespace collapsed."""
+    return ' '.join(text.lower().split())
+
+
+def content_hash(email, message):
+    return hashlib.sha256(f"{normalize(email)}\n{normalize(message)}".encode('utf-8')).hexdigest()
+
+
+def simhash(message):
+    """64-bit simhash of the word shingles of ``message`` (signed), or None if it is too short."""
+    words = re.findall(r'\w+', message.lower())
+    shingles = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    value = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    # Stored in a signed bigint column
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def fingerprint(idempotency_key, data):
+    """Fingerprint of a contact request from its Idempotency-Key header and JSON data."""
+    if not idempotency_key or not IDEMPOTENCY_KEY_RE.match(idempotency_key):
+        idempotency_key = None
+    email = data.get('email') if isinstance(data, dict) else None
+    message = data.get('message') if isinstance(data, dict) else None
+    email = email if isinstance(email, str) else ''
+    message = message if isinstance(message, str) else ''
+    return Fingerprint(idempotency_key, content_hash(email, message), simhash(message))
+
+
+def lock(fp):
+    """Serialize requests with the same content until the transaction ends."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [int(fp.content_hash[:15], 16)])
+
+
+def _candidates(fp):
+    """``(queryset, is_replay)`` pairs to look for an original in, in order."""
+    if fp.idempotency_key:
+        yield ContactSubmission.objects.filter(idempotency_key=fp.idempotency_key), True
+    yield ContactSubmission.objects.filter(
+        content_hash=fp.content_hash, submitted_at__gte=timezone.now() - DUPLICATE_WINDOW
+    ).order_by('submitted_at'), False
+
+
+def answer_duplicate(fp):
+    """Collapse a repeated submission into its original; returns the original or None."""
+    for queryset, is_replay in _candidates(fp):
+        original = queryset.first()
+        if original:
+            # A replayed request is the same submission, not another copy of it
+            if not is_replay:
+                ContactSubmission.objects.filter(pk=original.pk).update(duplicate_count=F('duplicate_count') + 1)
+            return original
+    return None
+
+
+def near_duplicate(fp):
+    """The earliest recent submission with a near-identical message, or None."""
+    if fp.simhash is None:
+        return None
+    return ContactSubmission.objects.filter(
+        submitted_at__gte=timezone.now() - NEAR_DUPLICATE_WINDOW, simhash__isnull=False
+    ).alias(
+        distance=RawSQL('bit_count((simhash # %s)::bit(64))', [fp.simhash])
+    ).filter(distance__lte=NEAR_DUPLICATE_DISTANCE).order_by('submitted_at').only('pk', 'email').first()
+
+
+async def aanswer_duplicate(fp):
+    """Async version of answer_duplicate."""
+    for queryset, is_replay in _candidates(fp):
+        original = await queryset.afirst()
+        if original:
+            if not is_replay:
+                await ContactSubmission.objects.filter(pk=original.pk).aupdate(duplicate_count=F('duplicate_count') + 1)
+            return original
+    return None
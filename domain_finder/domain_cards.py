@@ -0,0 +1,132 @@
+"""
+Maintenance of the DomainCard read model.
+
+Cards hold the resolved display fields of each domain (price with currency
+symbol, status badge, features array, button text and URL). They are rebuilt
+on every Domain, Currency and DomainStatus write so listing views can read
+them in one query.
+"""
+from django.db import models
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Domain, DomainCard
+
+
+# Card columns exposed to listing views and the Load More JSON
+CARD_FIELDS = (
+    'formatted_price',
+    'currency_symbol',
+    'display_status',
+    'status_badge_class',
+    'features_list',
+    'view_button_text',
+    'button_url',
+    'has_external_listing',
+    'should_show_contact_button',
+)
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def build_card_fields(domain, contact_url):
+    """
+    Resolve the card fields of a domain.
+
+    Mirrors the display properties on Domain, but only reads plain fields and
+    the currency/status relations.
+    """
+    currency, status = domain.currency, domain.status
+    currency_symbol = currency.symbol if currency else '$'
+
+    if domain.direct_to_contact:
+        view_button_text = "Contact for Details"
+    elif domain.listing_url and domain.website_name:
+        view_button_text = f"View on {domain.website_name}"
+    elif domain.listing_url:
+        view_button_text = "View Listing"
+    else:
+        view_button_text = "Contact for Details"
+
+    should_show_contact_button = domain.direct_to_contact or not domain.listing_url
+
+    return {
+        'formatted_price': f"{currency_symbol}{domain.price:,.0f}",
+        'currency_symbol': currency_symbol,
+        'display_status': status.name if status else 'Regular',
+        'status_badge_class': status.badge_class if status else 'bg-gray-100 text-gray-800',
+        'features_list': [feature.strip() for feature in domain.features.split('\n') if feature.strip()],
+        'view_button_text': view_button_text,
+        'button_url': contact_url if should_show_contact_button else domain.listing_url,
+        'has_external_listing': bool(domain.listing_url) and not domain.direct_to_contact,
+        'should_show_contact_button': should_show_contact_button,
+    }
+
+
+def card_values():
+    """
+    Keyword arguments for ``values()`` that pull card columns through a Domain queryset.
+
+    ``card_updated_at`` changes whenever the card is rebuilt and versions the
+    rendered card fragments (see card_fragments).
+    """
+    values = {field: models.F(f'card__{field}') for field in CARD_FIELDS}
+    values['card_updated_at'] = models.F('card__updated_at')
+    return values
+
+
+def rebuild_domain_card(domain):
+    """Rebuild the card of a single domain."""
+    DomainCard.objects.update_or_create(
+        domain=domain,
+        defaults=build_card_fields(domain, reverse('domain_finder:contact')),
+    )
+
+
+def rebuild_domain_cards(queryset=None, batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Rebuild cards for every domain in ``queryset`` (all domains by default).
+
+    Streams domains with a server-side cursor and upserts cards in batches.
+    Returns the number of cards written.
+    """
+    if queryset is None:
+        queryset = Domain.objects.all()
+    contact_url = reverse('domain_finder:contact')
+
+    written = 0
+    batch = []
+    for domain in queryset.select_related('currency', 'status').iterator(chunk_size=batch_size):
+        batch.append(domain)
+        if len(batch) >= batch_size:
+            written += upsert_domain_cards(batch, contact_url)
+            batch = []
+    if batch:
+        written += upsert_domain_cards(batch, contact_url)
+    return written
+
+
+def upsert_domain_cards(domains, contact_url=None):
+    """
+    Write the cards of saved ``domains`` in one query.
+
+    The domains' currency and status must already be loaded. Returns the
+    number of cards written.
+    """
+    contact_url = contact_url or reverse('domain_finder:contact')
+    DomainCard.objects.bulk_create(
+        [DomainCard(domain_id=domain.pk, **build_card_fields(domain, contact_url)) for domain in domains],
+        update_conflicts=True,
+        unique_fields=['domain'],
+        update_fields=list(CARD_FIELDS) + ['updated_at'],
+    )
+    return len(domains)
+
+
+def refresh_status_cards(status):
+    """Push a status's name and badge class into the cards that use it."""
+    DomainCard.objects.filter(domain__status=status).update(
+        display_status=status.name,
+        status_badge_class=status.badge_class,
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,289 @@
+"""
+Streaming bulk import of marketplace domain exports.
+
+Rows are read one at a time from CSV or JSON Lines files (GoDaddy, Sedo and
+similar exports mapped to Domain field names), normalized, and hashed. Each
+batch costs one query to fetch the stored hashes of its names; unchanged rows
+stop there. New or changed rows are written with one
+``INSERT ... ON CONFLICT (name) DO UPDATE``, and their DomainCard rows are
+built from the same in-memory values and upserted alongside. Memory use is
+bounded by the batch size.
+
+Bulk writes bypass model signals, so the catalog statistics and the catalog
+snapshot are refreshed once at the end.
+"""
+import csv
+import gzip
+import hashlib
+import json
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.urls import reverse
+
+from . import page_cache, snapshot
+from .catalog_stats import rebuild_catalog_statistics
+from .domain_cards import upsert_domain_cards
+from .models import Currency, Domain, DomainStatus
+
+
+IMPORT_BATCH_SIZE = 2000
+
+# Domain columns set from the source row; everything else (featured flag,
+# created_at, ...) is left as it is on existing domains
+IMPORT_FIELDS = (
+    'name',
+    'price',
+    'currency',
+    'status',
+    'description',
+    'features',
+    'listing_url',
+    'website_name',
+    'is_available',
+    'direct_to_contact',
+)
+
+MAX_PRICE = Decimal('99999999.99')
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f', ''}
+
+ImportResult = namedtuple('ImportResult', ['created', 'updated', 'unchanged', 'invalid', 'errors'])
+
+
+class ImportRowError(ValueError):
+    """Raised for a source row that cannot be turned into a domain."""
+
+
+# -- reading -----------------------------------------------------------------
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8-sig', newline='')
+
+
+def detect_format(path):
+    """Guess the source format from the file name."""
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(path, source_format=None):
+    """Yield ``(line_number, row dict)`` from a CSV or JSON Lines file."""
+    source_format = source_format or detect_format(path)
+    with _open_text(path) as f:
+        if source_format == 'jsonl':
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield line_number, None
+                    continue
+                yield line_number, row if isinstance(row, dict) else None
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {key.strip().lower(): value for key, value in row.items() if key}
+
+
+# -- normalizing -------------------------------------------------------------
+
+def _text(row, field, default=''):
+    value = row.get(field)
+    if value is None:
+        return default
+    return str(value).strip()
+
+
+def _boolean(row, field, default):
+    value = row.get(field)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ImportRowError(f"Invalid {field}: {value!r}")
+
+
+def _price(row):
+    value = row.get('price')
+    if isinstance(value, (int, float)):
+        value = str(value)
+    value = (value or '').strip().lstrip('$£€').replace(',', '')
+    try:
+        price = Decimal(value).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ImportRowError(f"Invalid price: {row.get('price')!r}")
+    # A quiet NaN survives quantize() but cannot be compared
+    if not price.is_finite():
+        raise ImportRowError(f"Invalid price: {row.get('price')!r}")
+    if price < 0 or price > MAX_PRICE:
+        raise ImportRowError(f"Price out of range: {price}")
+    return price
+
+
+def _features(row):
+    value = row.get('features')
+    if isinstance(value, list):
+        value = '\n'.join(str(feature) for feature in value)
+    # CSV exports cannot hold newlines comfortably; accept "|" as a separator
+    lines = (value or '').replace('|', '\n').split('\n')
+    return '\n'.join(line.strip() for line in lines if line.strip())
+
+
+class RowNormalizer:
+    """Turns source rows into Domain field values using in-memory lookup maps."""
+
+    def __init__(self, default_status=None, default_currency=None, website_name=None):
+        self.currencies = {currency.code.upper(): currency for currency in Currency.objects.all()}
+        self.statuses = {status.slug: status for status in DomainStatus.objects.all()}
+        self.default_status = default_status
+        self.default_currency = default_currency
+        self.website_name = website_name
+
+        if default_status and default_status not in self.statuses:
+            raise ImportRowError(f"Unknown default status: {default_status}")
+        if default_currency and default_currency.upper() not in self.currencies:
+            raise ImportRowError(f"Unknown default currency: {default_currency}")
+
+    def normalize(self, row):
+        """Return the Domain field values of ``row`` with lookups as codes/slugs."""
+        if row is None:
+            raise ImportRowError("Unreadable row")
+        name = _text(row, 'name')
+        if not name or len(name) > 100 or ' ' in name:
+            raise ImportRowError(f"Invalid name: {row.get('name')!r}")
+
+        currency = (_text(row, 'currency') or self.default_currency or '').upper()
+        if currency and currency not in self.currencies:
+            raise ImportRowError(f"Unknown currency: {currency}")
+        status = _text(row, 'status').lower() or self.default_status
+        if status not in self.statuses:
+            raise ImportRowError(f"Unknown status: {status}")
+
+        listing_url = _text(row, 'listing_url')
+        if len(listing_url) > 500:
+            raise ImportRowError("Listing URL is too long")
+
+        return {
+            'name': name,
+            'price': _price(row),
+            'currency': currency,
+            'status': status,
+            'description': _text(row, 'description'),
+            'features': _features(row),
+            'listing_url': listing_url,
+            'website_name': (_text(row, 'website_name') or self.website_name or 'GoDaddy')[:50],
+            'is_available': _boolean(row, 'is_available', True),
+            'direct_to_contact': _boolean(row, 'direct_to_contact', False),
+        }
+
+    def build(self, values, row_hash):
+        """Unsaved Domain instance for normalized ``values``."""
+        return Domain(
+            name=values['name'],
+            price=values['price'],
+            currency=self.currencies.get(values['currency']),
+            status=self.statuses[values['status']],
+            description=values['description'],
+            features=values['features'],
+            listing_url=values['listing_url'],
+            website_name=values['website_name'],
+            is_available=values['is_available'],
+            direct_to_contact=values['direct_to_contact'],
+            import_hash=row_hash,
+        )
+
+
+def hash_values(values):
+    """Stable content hash of normalized field values."""
+    payload = json.dumps([str(values[field]) for field in IMPORT_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# -- writing -----------------------------------------------------------------
+
+def _write_batch(batch, normalizer, dry_run, contact_url):
+    """
+    Upsert the new or changed rows of one batch and their cards.
+
+    ``batch`` maps names to ``(values, row_hash)``. Returns
+    ``(created, updated, unchanged)``.
+    """
+    stored = dict(Domain.objects.filter(name__in=list(batch)).values_list('name', 'import_hash'))
+    changed = [
+        normalizer.build(values, row_hash)
+        for name, (values, row_hash) in batch.items()
+        if stored.get(name) != row_hash
+    ]
+    created = sum(1 for domain in changed if domain.name not in stored)
+
+    if changed and not dry_run:
+        with transaction.atomic():
+            Domain.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=[field for field in IMPORT_FIELDS if field != 'name'] + ['import_hash', 'updated_at'],
+            )
+            # Upserted rows do not get their primary keys back
+            ids = dict(Domain.objects.filter(name__in=[domain.name for domain in changed]).values_list('name', 'pk'))
+            for domain in changed:
+                domain.pk = ids[domain.name]
+            upsert_domain_cards(changed, contact_url)
+    return created, len(changed) - created, len(batch) - len(changed)
+
+
+def import_domains(rows, normalizer, batch_size=IMPORT_BATCH_SIZE, dry_run=False, max_errors=100):
+    """
+    Import ``(line_number, row)`` pairs (see read_rows).
+
+    Later rows for the same name win within a batch. Returns an ImportResult;
+    ``errors`` holds up to ``max_errors`` (line number, message) pairs.
+    """
+    contact_url = reverse('domain_finder:contact')
+    created = updated = unchanged = invalid = 0
+    errors = []
+    batch = {}
+
+    def flush():
+        nonlocal created, updated, unchanged
+        batch_created, batch_updated, batch_unchanged = _write_batch(batch, normalizer, dry_run, contact_url)
+        created += batch_created
+        updated += batch_updated
+        unchanged += batch_unchanged
+        batch.clear()
+
+    for line_number, row in rows:
+        try:
+            values = normalizer.normalize(row)
+        except ImportRowError as e:
+            invalid += 1
+            if len(errors) < max_errors:
+                errors.append((line_number, str(e)))
+            continue
+        batch.pop(values['name'], None)
+        batch[values['name']] = (values, hash_values(values))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if (created or updated) and not dry_run:
+        refresh_catalog()
+    return ImportResult(created, updated, unchanged, invalid, errors)
+
+
+def refresh_catalog():
+    """Bring the statistics and snapshot up to date after bulk writes."""
+    rebuild_catalog_statistics()
+    snapshot.rebuild_if_stale()
+    page_cache.bump_versions(page_cache.CATALOG)
@@ -0,0 +1,186 @@
+"""
+Streaming CSV and JSON Lines exports.
+
+Rows are read with ``values_list().iterator()``, which uses a server-side
+cursor on PostgreSQL, and encoded one at a time, so memory use does not grow
+with the table. Output is produced as a generator of byte chunks that can be
+written to a file or handed to a StreamingHttpResponse, optionally gzipped on
+the fly.
+
+Domain exports use the column names read by import_domains, so an export can
+be imported again.
+
+Columns filled in by site visitors are written to CSV with a leading ``'``
+when they start like a spreadsheet formula, so opening the export cannot run
+one.
+"""
+import csv
+import zlib
+from collections import namedtuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import BlogPost, ContactSubmission, Domain
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Encoded output is buffered up to this many bytes before a chunk is yielded
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+# Cell prefixes spreadsheets read as the start of a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# (column name, ORM lookup) pairs per exportable model, and the names of the
+# columns holding untrusted text
+ExportSpec = namedtuple('ExportSpec', ['model', 'columns', 'order_by', 'untrusted'], defaults=[()])
+
+EXPORTS = {
+    'domains': ExportSpec(Domain, (
+        ('name', 'name'),
+        ('price', 'price'),
+        ('currency', 'currency__code'),
+        ('status', 'status__slug'),
+        ('description', 'description'),
+        ('features', 'features'),
+        ('listing_url', 'listing_url'),
+        ('website_name', 'website_name'),
+        ('is_available', 'is_available'),
+        ('direct_to_contact', 'direct_to_contact'),
+        ('is_featured_on_homepage', 'is_featured_on_homepage'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ), 'id'),
+    'contact_submissions': ExportSpec(ContactSubmission, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('email', 'email'),
+        ('message', 'message'),
+        ('submitted_at', 'submitted_at'),
+        ('is_responded', 'is_responded'),
+    ), 'id', ('name', 'email', 'message')),
+    'blog_posts': ExportSpec(BlogPost, (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('slug', 'slug'),
+        ('author', 'author__name'),
+        ('category', 'category__name'),
+        ('excerpt', 'excerpt'),
+        ('content', 'content'),
+        ('image_url', 'image_url'),
+        ('read_time', 'read_time'),
+        ('is_featured', 'is_featured'),
+        ('is_published', 'is_published'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ), 'id'),
+}
+
+EXPORT_MODELS = {spec.model: name for name, spec in EXPORTS.items()}
+
+
+class _LineBuffer:
+    """File-like target for csv.writer that hands back each written line."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(name, queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the export tuples of ``queryset`` (all rows by default)."""
+    spec = EXPORTS[name]
+    if queryset is None:
+        queryset = spec.model.objects.all()
+    lookups = [lookup for column, lookup in spec.columns]
+    return queryset.order_by(spec.order_by).values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def _escape_formula(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_lines(columns, rows, untrusted=()):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(columns)
+    escaped = [index for index, column in enumerate(columns) if column in untrusted]
+    for row in rows:
+        if escaped:
+            row = list(row)
+            for index in escaped:
+                row[index] = _escape_formula(row[index])
+        yield writer.writerow(row)
+
+
+def _jsonl_lines(columns, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+def _buffered(lines):
+    buffer = []
+    size = 0
+    for line in lines:
+        encoded = line.encode('utf-8')
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= OUTPUT_BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(name, export_format='csv', queryset=None, gzip=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the encoded export of ``queryset`` as byte chunks."""
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    spec = EXPORTS[name]
+    columns = [column for column, lookup in spec.columns]
+    rows = export_rows(name, queryset, chunk_size)
+    lines = _csv_lines(columns, rows, spec.untrusted) if export_format == 'csv' else _jsonl_lines(columns, rows)
+    chunks = _buffered(lines)
+    return _gzipped(chunks) if gzip else chunks
+
+
+def export_filename(name, export_format, gzip=False):
+    extension = FORMATS[export_format][1] + ('.gz' if gzip else '')
+    return f"{name}-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+
+
+def export_response(request, name, export_format='csv', queryset=None):
+    """
+    StreamingHttpResponse downloading the export as an attachment.
+
+    The body is gzipped with ``Content-Encoding: gzip`` when the client
+    accepts it; browsers decompress it while saving.
+    """
+    gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    response = StreamingHttpResponse(
+        export_chunks(name, export_format, queryset, gzip=gzip),
+        content_type=f"{FORMATS[export_format][0]}; charset=utf-8",
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(name, export_format)}"'
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    response['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,424 @@
+"""
+In-memory facet index for the domains catalog.
+
+Each worker keeps a FacetIndex of the available domains. Every domain gets a
+slot number; each facet value (status, currency, price band, TLD, name length
+band, feature tag) maps to a bitset of slots held in a Python int, so the
+count for a value under any combination of filters is an AND plus a popcount.
+Arbitrary price ranges use a sorted price array and binary search.
+
+The index is refreshed incrementally: the worker that saves a domain applies
+the change directly, and other workers notice the catalog statistics version
+moving and pull only the recently updated rows.
+"""
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from django.db.models.functions import Length
+from django.db.models.lookups import GreaterThanOrEqual, LessThanOrEqual
+
+from .catalog_stats import NO_CURRENCY, domain_tld
+from .models import Currency, Domain, DomainStatus
+
+
+# (key, label, lower bound inclusive, upper bound exclusive)
+PRICE_BANDS = (
+    ('under-1k', 'Under 1,000', None, Decimal('1000')),
+    ('1k-5k', '1,000 - 5,000', Decimal('1000'), Decimal('5000')),
+    ('5k-10k', '5,000 - 10,000', Decimal('5000'), Decimal('10000')),
+    ('10k-50k', '10,000 - 50,000', Decimal('10000'), Decimal('50000')),
+    ('50k-plus', '50,000+', Decimal('50000'), None),
+)
+
+# (key, label, shortest, longest) on the full domain name length
+LENGTH_BANDS = (
+    ('short', 'Up to 8 characters', 1, 8),
+    ('medium', '9 - 12 characters', 9, 12),
+    ('long', '13 - 16 characters', 13, 16),
+    ('very-long', '17+ characters', 17, None),
+)
+
+FACETS = (
+    ('status', 'Status'),
+    ('currency', 'Currency'),
+    ('price', 'Price'),
+    ('tld', 'Extension'),
+    ('length', 'Name Length'),
+    ('feature', 'Features'),
+)
+
+# Query string parameters understood by parse_facet_filters
+FACET_PARAMS = tuple(facet for facet, _ in FACETS) + ('price_min', 'price_max')
+
+# Only the most common tags are listed for open-ended facets
+MAX_OPEN_FACET_VALUES = 20
+
+# Rows updated this long before the last seen change are re-read on sync, to
+# cover transactions that committed out of order.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+_ROW_FIELDS = ('id', 'is_available', 'name', 'price', 'features', 'status__slug', 'currency__code', 'updated_at')
+
+
+def price_band(price):
+    for key, label, low, high in PRICE_BANDS:
+        if (low is None or price >= low) and (high is None or price < high):
+            return key
+
+
+def length_band(name):
+    length = len(name)
+    for key, label, shortest, longest in LENGTH_BANDS:
+        if length >= shortest and (longest is None or length <= longest):
+            return key
+
+
+def feature_tags(features):
+    """Return {tag: label} for the newline-separated features text."""
+    tags = {}
+    for feature in (features or '').split('\n'):
+        feature = feature.strip()
+        if feature:
+            tags.setdefault(feature.lower(), feature)
+    return tags
+
+
+def _popcount(bits):
+    return bin(bits).count('1')
+
+
+def _bits_from_slots(slots):
+    """Build a bitset from an iterable of slot numbers in linear time."""
+    slots = list(slots)
+    if not slots:
+        return 0
+    bitmap = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        bitmap[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bitmap, 'little')
+
+
+class FacetIndex:
+    """Bitset facet index over the available domains of one worker."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.slots = {}           # domain id -> slot
+        self.docs = {}            # slot -> (price, {facet: set(values)})
+        self.free_slots = []
+        self.all_bits = 0
+        self.bitsets = {facet: defaultdict(int) for facet, _ in FACETS}
+        self.prices = []          # sorted [(price, slot)]
+        self.feature_labels = {}
+        self.tld_labels = {}
+        self.status_labels = []   # [(slug, name)] in display order
+        self.currency_labels = []  # [(code, label)] in display order
+        self.version = None
+        self.watermark = None
+
+    # -- maintenance -------------------------------------------------------
+
+    def _load_labels(self):
+        self.status_labels = list(DomainStatus.objects.values_list('slug', 'name'))
+        self.currency_labels = [
+            (code, f"{code} ({symbol})") for code, symbol in Currency.objects.values_list('code', 'symbol')
+        ]
+        self.currency_labels.append((NO_CURRENCY, 'Unspecified'))
+
+    def _values_of(self, row):
+        tags = feature_tags(row['features'])
+        self.feature_labels.update(tags)
+        return {
+            'status': {row['status__slug']},
+            'currency': {row['currency__code'] or NO_CURRENCY},
+            'price': {price_band(row['price'])},
+            'tld': {domain_tld(row['name'])},
+            'length': {length_band(row['name'])},
+            'feature': set(tags),
+        }
+
+    def _remove(self, domain_id):
+        slot = self.slots.pop(domain_id, None)
+        if slot is None:
+            return
+        price, values = self.docs.pop(slot)
+        bit = 1 << slot
+        for facet, facet_values in values.items():
+            for value in facet_values:
+                remaining = self.bitsets[facet][value] & ~bit
+                if remaining:
+                    self.bitsets[facet][value] = remaining
+                else:
+                    del self.bitsets[facet][value]
+        self.all_bits &= ~bit
+        del self.prices[bisect_left(self.prices, (price, slot))]
+        self.free_slots.append(slot)
+
+    def _add(self, row):
+        self._remove(row['id'])
+        if not row['is_available']:
+            return
+        slot = self.free_slots.pop() if self.free_slots else len(self.slots) + len(self.free_slots)
+        values = self._values_of(row)
+        self.slots[row['id']] = slot
+        self.docs[slot] = (row['price'], values)
+        bit = 1 << slot
+        for facet, facet_values in values.items():
+            for value in facet_values:
+                self.bitsets[facet][value] |= bit
+        self.all_bits |= bit
+        insort(self.prices, (row['price'], slot))
+        self.tld_labels.setdefault(domain_tld(row['name']), '.' + domain_tld(row['name']))
+
+    def _advance_watermark(self, updated_at):
+        if self.watermark is None or updated_at > self.watermark:
+            self.watermark = updated_at
+
+    def rebuild(self, version=None):
+        """Load every available domain from scratch."""
+        with self._lock:
+            self._reset()
+            self._load_labels()
+            rows = Domain.objects.filter(is_available=True).values(*_ROW_FIELDS).order_by('id')
+            for slot, row in enumerate(rows.iterator(chunk_size=2000)):
+                values = self._values_of(row)
+                self.slots[row['id']] = slot
+                self.docs[slot] = (row['price'], values)
+                self.tld_labels.setdefault(domain_tld(row['name']), '.' + domain_tld(row['name']))
+                self._advance_watermark(row['updated_at'])
+
+            # Build each bitset in one pass rather than growing ints per row
+            slots_by_value = {facet: defaultdict(list) for facet, _ in FACETS}
+            for slot, (price, values) in self.docs.items():
+                for facet, facet_values in values.items():
+                    for value in facet_values:
+                        slots_by_value[facet][value].append(slot)
+            for facet, by_value in slots_by_value.items():
+                for value, slots in by_value.items():
+                    self.bitsets[facet][value] = _bits_from_slots(slots)
+            self.all_bits = _bits_from_slots(self.docs)
+            self.prices = sorted((price, slot) for slot, (price, values) in self.docs.items())
+            self.version = version
+
+    def apply_domain(self, domain_id):
+        """
+        Re-read one domain after a save or delete in this worker.
+
+        The version is left alone: other workers may have changed the catalog
+        too, and the next sync() picks those up.
+        """
+        with self._lock:
+            if self.version is None:
+                return
+            row = Domain.objects.filter(pk=domain_id).values(*_ROW_FIELDS).first()
+            if row is None:
+                self._remove(domain_id)
+            else:
+                self._add(row)
+                self._advance_watermark(row['updated_at'])
+
+    def sync(self, stats):
+        """
+        Bring the index up to date with ``stats`` (a CatalogStatistics row).
+
+        Pulls only domains updated since the last seen change; falls back to a
+        full rebuild when that cannot account for every available domain
+        (e.g. after deletes made by another worker).
+        """
+        with self._lock:
+            if self.version == stats.updated_at:
+                return
+            if self.version is None or self.watermark is None:
+                self.rebuild(stats.updated_at)
+                return
+
+            # Bitsets are keyed by status slug and currency code, so a renamed
+            # key invalidates them
+            known_keys = (self.status_labels, [code for code, label in self.currency_labels])
+            self._load_labels()
+            if known_keys != (self.status_labels, [code for code, label in self.currency_labels]):
+                self.rebuild(stats.updated_at)
+                return
+
+            changed = Domain.objects.filter(updated_at__gte=self.watermark - SYNC_OVERLAP).values(*_ROW_FIELDS)
+            for row in changed:
+                self._add(row)
+                self._advance_watermark(row['updated_at'])
+
+            if len(self.slots) != stats.available_count:
+                self.rebuild(stats.updated_at)
+            else:
+                self.version = stats.updated_at
+
+    # -- queries -----------------------------------------------------------
+
+    def _price_range_bits(self, price_min, price_max):
+        low = 0 if price_min is None else bisect_left(self.prices, (price_min, -1))
+        high = len(self.prices) if price_max is None else bisect_right(self.prices, (price_max, float('inf')))
+        return _bits_from_slots(slot for price, slot in self.prices[low:high])
+
+    def _facet_masks(self, selected):
+        masks = {}
+        for facet, _ in FACETS:
+            values = selected.get(facet)
+            if values:
+                mask = 0
+                for value in values:
+                    mask |= self.bitsets[facet].get(value, 0)
+                masks[facet] = mask
+        return masks
+
+    def _ordered_values(self, facet, counts):
+        if facet == 'status':
+            return self.status_labels
+        if facet == 'currency':
+            return self.currency_labels
+        if facet == 'price':
+            return [(key, label) for key, label, low, high in PRICE_BANDS]
+        if facet == 'length':
+            return [(key, label) for key, label, shortest, longest in LENGTH_BANDS]
+        labels = self.tld_labels if facet == 'tld' else self.feature_labels
+        ranked = sorted(counts, key=lambda value: (-counts[value], value))[:MAX_OPEN_FACET_VALUES]
+        return [(value, labels.get(value, value)) for value in ranked]
+
+    def facet_counts(self, selected=None, price_min=None, price_max=None):
+        """
+        Return ``(total, facets)`` for the given filters.
+
+        ``selected`` maps facet keys to sets of values; values within a facet
+        are OR-ed, facets are AND-ed. Each facet's counts apply every filter
+        except its own, so users see what selecting another value would give.
+        """
+        selected = selected or {}
+        with self._lock:
+            base = self.all_bits
+            if price_min is not None or price_max is not None:
+                base &= self._price_range_bits(price_min, price_max)
+            masks = self._facet_masks(selected)
+
+            matching = base
+            for mask in masks.values():
+                matching &= mask
+
+            facets = []
+            for facet, facet_label in FACETS:
+                others = base
+                for other, mask in masks.items():
+                    if other != facet:
+                        others &= mask
+                counts = {
+                    value: _popcount(bits & others)
+                    for value, bits in self.bitsets[facet].items()
+                }
+                chosen = selected.get(facet, set())
+                values = [
+                    {
+                        'value': value,
+                        'label': label,
+                        'count': counts.get(value, 0),
+                        'selected': value in chosen,
+                    }
+                    for value, label in self._ordered_values(facet, counts)
+                    if counts.get(value, 0) or value in chosen
+                ]
+                facets.append({'key': facet, 'label': facet_label, 'values': values})
+            return _popcount(matching), facets
+
+
+_facet_index = FacetIndex()
+
+
+def get_facet_index(stats):
+    """Return this worker's facet index, synced to ``stats``."""
+    _facet_index.sync(stats)
+    return _facet_index
+
+
+def apply_domain_change(domain_id):
+    """Incrementally update this worker's index after a domain write."""
+    _facet_index.apply_domain(domain_id)
+
+
+# -- request filters ---------------------------------------------------------
+
+def _parse_price(value):
+    if value in (None, ''):
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError("Invalid price")
+    # NaN and Infinity parse but cannot be compared with prices
+    if not price.is_finite():
+        raise ValueError("Invalid price")
+    return price
+
+
+def parse_facet_filters(params):
+    """
+    Read facet filters from a QueryDict.
+
+    Returns ``(selected, price_min, price_max)``; facet keys may repeat, e.g.
+    ``?status=premium&status=new&tld=com``.
+    """
+    selected = {}
+    for facet, _ in FACETS:
+        values = {value.strip().lower() if facet == 'feature' else value.strip() for value in params.getlist(facet)}
+        values.discard('')
+        if values:
+            selected[facet] = values
+    return selected, _parse_price(params.get('price_min')), _parse_price(params.get('price_max'))
+
+
+def filters_q(selected, price_min=None, price_max=None):
+    """Translate facet filters into a Q object for the listing query."""
+    condition = Q()
+    if 'status' in selected:
+        condition &= Q(status__slug__in=selected['status'])
+    if 'currency' in selected:
+        codes = selected['currency']
+        currency_q = Q(currency__code__in=codes - {NO_CURRENCY})
+        if NO_CURRENCY in codes:
+            currency_q |= Q(currency__isnull=True)
+        condition &= currency_q
+    if 'price' in selected:
+        price_q = Q(pk__in=[])
+        for key, label, low, high in PRICE_BANDS:
+            if key in selected['price']:
+                band_q = Q()
+                if low is not None:
+                    band_q &= Q(price__gte=low)
+                if high is not None:
+                    band_q &= Q(price__lt=high)
+                price_q |= band_q
+        condition &= price_q
+    if 'tld' in selected:
+        tld_q = Q(pk__in=[])
+        for tld in selected['tld']:
+            tld_q |= Q(name__iendswith=f'.{tld}')
+        condition &= tld_q
+    if 'length' in selected:
+        length_q = Q(pk__in=[])
+        for key, label, shortest, longest in LENGTH_BANDS:
+            if key in selected['length']:
+                band_q = Q(GreaterThanOrEqual(Length('name'), shortest))
+                if longest is not None:
+                    band_q &= Q(LessThanOrEqual(Length('name'), longest))
+                length_q |= band_q
+        condition &= length_q
+    for tag in selected.get('feature', ()):
+        # Features are stored one per line; match a whole line, ignoring case
+        condition &= Q(features__iregex=rf'(^|\n)\s*{re.escape(tag)}\s*(\n|$)')
+    if price_min is not None:
+        condition &= Q(price__gte=price_min)
+    if price_max is not None:
+        condition &= Q(price__lte=price_max)
+    return condition
@@ -2,15 +2,15 @@
 Django forms for the Domain Finder application.
 """
 from django import forms
-from django_recaptcha.fields import ReCaptchaField
 from django_recaptcha.widgets import ReCaptchaV3
+from .captcha import ResilientReCaptchaField
 from .models import ContactSubmission
 
 class ContactForm(forms.ModelForm):
     """Contact form with reCAPTCHA v3 validation."""
     
     # Add reCAPTCHA v3 field (invisible)
-    captcha = ReCaptchaField(
+    captcha = ResilientReCaptchaField(
         widget=ReCaptchaV3(action='submit'),
         label=""  # No label needed for v3 as it's invisible
     )
@@ -47,4 +47,18 @@ class ContactForm(forms.ModelForm):
         message = self.cleaned_data.get('message')
         if len(message) < 10:
             raise forms.ValidationError("Message must be at least 10 characters long.")
-        return message
\ No newline at end of file
+        return message
+    
+    def save(self, commit=True):
+        """Record how the submission passed the reCAPTCHA check."""
+        submission = super().save(commit=False)
+        captcha = self.fields['captcha']
+        if captcha.needs_review:
+            submission.captcha_status = ContactSubmission.CAPTCHA_REVIEW
+        elif captcha.unverified:
+            submission.captcha_status = ContactSubmission.CAPTCHA_UNVERIFIED
+        if captcha.verification is not None and captcha.verification.score is not None:
+            submission.captcha_score = float(captcha.verification.score)
+        if commit:
+            submission.save()
+        return submission
\ No newline at end of file
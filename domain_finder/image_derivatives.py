@@ -0,0 +1,335 @@
+"""
+Responsive image derivatives.
+
+Every image the site shows (the homepage hero upload, blog post images and
+author avatars, which are mostly remote URLs) gets an ImageAsset row.
+Processing reads the original once, so remote images are fetched a single
+time, and writes resized AVIF, WebP and JPEG variants at DERIVATIVE_WIDTHS
+into media storage under the SHA-256 of the original bytes. The same picture
+referenced from several places is encoded once, and since a variant URL never
+changes content it can be cached by browsers forever.
+
+Sources are registered and processed in a background thread after the saving
+transaction commits; ``process_images`` handles everything else (existing
+rows, retries, pruning). Templates use ``{% responsive_image %}``, which
+falls back to the original URL until the variants are ready.
+"""
+import hashlib
+import io
+import logging
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils.html import format_html, format_html_join
+from PIL import Image, ImageOps, features
+
+from . import page_cache
+from .models import Author, BlogPost, HomePage, ImageAsset
+
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (96, 192, 400, 640, 960, 1280)
+
+# Width of the JPEG used as ``src`` by browsers that ignore srcset
+FALLBACK_WIDTH = 960
+
+DERIVATIVES_DIR = 'derivatives'
+
+# Hex digits of the digest naming a derivative directory (128 bits)
+DIRECTORY_DIGEST_LENGTH = 32
+
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+FETCH_TIMEOUT = 10
+MAX_ATTEMPTS = 3
+
+# Ready variants only change when an asset is refreshed; missing ones are
+# re-checked soon so pages pick up newly processed images
+VARIANTS_CACHE_TIMEOUT = 60 * 60 * 24
+MISSING_CACHE_TIMEOUT = 60
+
+DEFAULT_HERO_IMAGE = (
+    "https://images.unsplash.com/photo-1684610529682-553625a1ffed?crop=entropy&cs=tinysrgb&fit=max&fm=jpg"
+    "&ixid=M3w3Nzg4Nzd8MHwxfHNlYXJjaHwxfHx8fDE3NTgxNDM3NDJ8MA&ixlib=rb-4.1.0&q=80&w=1080"
+    "&utm_source=figma&utm_medium=referral"
+)
+
+OutputFormat = namedtuple('OutputFormat', ['name', 'pil_format', 'mime_type', 'extension', 'options'])
+
+# Best first; AVIF needs a Pillow built with libavif
+OUTPUT_FORMATS = [
+    output for output in (
+        OutputFormat('avif', 'AVIF', 'image/avif', 'avif', {'quality': 55}),
+        OutputFormat('webp', 'WEBP', 'image/webp', 'webp', {'quality': 80}),
+        OutputFormat('jpeg', 'JPEG', 'image/jpeg', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    )
+    if output.name == 'jpeg' or features.check(output.name)
+]
+
+DerivedImage = namedtuple('DerivedImage', ['digest', 'width', 'height', 'variants'])
+
+
+class ImageDerivativeError(Exception):
+    """Raised when an image cannot be read or decoded."""
+
+
+def is_remote(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def source_url(source):
+    """URL of the original image."""
+    return source if is_remote(source) else default_storage.url(source)
+
+
+def image_sources():
+    """Every image source currently referenced by the site."""
+    sources = {DEFAULT_HERO_IMAGE}
+    sources.update(HomePage.objects.exclude(hero_image='').exclude(hero_image=None).values_list('hero_image', flat=True))
+    sources.update(BlogPost.objects.exclude(image_url='').values_list('image_url', flat=True))
+    sources.update(Author.objects.exclude(avatar='').values_list('avatar', flat=True))
+    return {source.strip() for source in sources if source.strip()}
+
+
+def register_sources(sources):
+    """Create pending ImageAsset rows for sources not seen before."""
+    ImageAsset.objects.bulk_create([ImageAsset(source=source) for source in sources], ignore_conflicts=True)
+
+
+# -- deriving ----------------------------------------------------------------
+
+def read_source(source):
+    """Return the bytes of the original image."""
+    try:
+        if is_remote(source):
+            request = urllib.request.Request(source, headers={'User-Agent': 'DomainFinder image fetcher'})
+            with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                data = response.read(MAX_SOURCE_BYTES + 1)
+        else:
+            with default_storage.open(source, 'rb') as f:
+                data = f.read(MAX_SOURCE_BYTES + 1)
+    except (OSError, ValueError) as e:
+        # URLError and socket timeouts are OSErrors
+        raise ImageDerivativeError(f"Could not read {source}: {e}")
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ImageDerivativeError(f"Image is larger than {MAX_SOURCE_BYTES} bytes")
+    return data
+
+
+def target_widths(width):
+    """Derivative widths for an original ``width`` pixels wide; never upscales."""
+    widths = [target for target in DERIVATIVE_WIDTHS if target < width]
+    if width <= DERIVATIVE_WIDTHS[-1]:
+        widths.append(width)
+    return widths
+
+
+def derivative_name(digest, width, output):
+    return f"{DERIVATIVES_DIR}/{digest[:2]}/{digest[:DIRECTORY_DIGEST_LENGTH]}/{width}w.{output.extension}"
+
+
+def _oriented_size(image):
+    width, height = image.size
+    # EXIF orientations 5-8 are rotated by 90 degrees
+    if image.getexif().get(0x0112) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def _encode(image, output):
+    buffer = io.BytesIO()
+    image.save(buffer, output.pil_format, **output.options)
+    return ContentFile(buffer.getvalue())
+
+
+def derive(source):
+    """
+    Make sure the variants of ``source`` exist in storage.
+
+    Files are named after the digest of the original, so variants already
+    written for the same bytes are reused without decoding anything. Does not
+    touch the database, so it can run in worker threads.
+    """
+    data = read_source(source)
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        image = Image.open(io.BytesIO(data))
+        width, height = _oriented_size(image)
+        names = {
+            output.name: {target: derivative_name(digest, target, output) for target in target_widths(width)}
+            for output in OUTPUT_FORMATS
+        }
+        missing = {
+            (output.name, target) for output in OUTPUT_FORMATS
+            for target, name in names[output.name].items() if not default_storage.exists(name)
+        }
+        if missing:
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+            for target in sorted({target for name, target in missing}, reverse=True):
+                resized = image.resize(
+                    (target, max(1, round(height * target / width))),
+                    Image.Resampling.LANCZOS,
+                    reducing_gap=3.0,
+                )
+                for output in OUTPUT_FORMATS:
+                    if (output.name, target) not in missing:
+                        continue
+                    encoded = resized
+                    if output.name == 'jpeg' and has_alpha:
+                        encoded = Image.new('RGB', resized.size, 'white')
+                        encoded.paste(resized, mask=resized.getchannel('A'))
+                    default_storage.save(names[output.name][target], _encode(encoded, output))
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageDerivativeError(f"Could not process {source}: {e}")
+
+    variants = {
+        output: {str(target): name for target, name in widths.items()}
+        for output, widths in names.items()
+    }
+    return DerivedImage(digest, width, height, variants)
+
+
+def _cache_key(source):
+    return 'image-asset:' + hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def process_assets(assets, workers=4):
+    """
+    Derive the variants of ``assets`` in a thread pool (fetching and Pillow
+    both release the GIL) and record the outcome on each row.
+
+    Returns ``(ready, failed)`` counts.
+    """
+    ready = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(derive, asset.source): asset for asset in assets}
+        for future in as_completed(futures):
+            asset = futures[future]
+            asset.attempts += 1
+            try:
+                derived = future.result()
+            except ImageDerivativeError as e:
+                asset.status = ImageAsset.STATUS_FAILED
+                asset.error = str(e)
+                failed += 1
+            else:
+                asset.digest, asset.width, asset.height, asset.variants = derived
+                asset.status = ImageAsset.STATUS_READY
+                asset.error = ''
+                ready += 1
+            asset.save(update_fields=['digest', 'width', 'height', 'variants', 'status', 'attempts', 'error', 'updated_at'])
+            cache.delete(_cache_key(asset.source))
+    if ready:
+        page_cache.bump_versions(page_cache.IMAGES)
+    return ready, failed
+
+
+def _process_sources(sources):
+    try:
+        register_sources(sources)
+        process_assets(ImageAsset.objects.filter(source__in=sources, status=ImageAsset.STATUS_PENDING))
+    except Exception:
+        logger.exception("Image derivative processing failed")
+    finally:
+        # Runs in its own thread, which has its own connection
+        connection.close()
+
+
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-derivatives')
+
+
+def process_in_background(sources):
+    """on_commit hook: register ``sources`` and derive them off the request thread."""
+    sources = {source.strip() for source in sources if source and source.strip()}
+    if sources:
+        _background.submit(_process_sources, sources)
+
+
+def prune_assets():
+    """
+    Delete assets no longer referenced by the site and derivative files no
+    ready asset points to. Returns ``(assets, directories)`` removed.
+    """
+    removed_assets, _ = ImageAsset.objects.exclude(source__in=image_sources()).delete()
+    digests = {
+        digest[:DIRECTORY_DIGEST_LENGTH]
+        for digest in ImageAsset.objects.exclude(digest='').values_list('digest', flat=True)
+    }
+    removed_directories = 0
+    if default_storage.exists(DERIVATIVES_DIR):
+        for prefix in default_storage.listdir(DERIVATIVES_DIR)[0]:
+            for digest in default_storage.listdir(f"{DERIVATIVES_DIR}/{prefix}")[0]:
+                if digest in digests:
+                    continue
+                directory = f"{DERIVATIVES_DIR}/{prefix}/{digest}"
+                files = default_storage.listdir(directory)[1]
+                for name in files:
+                    default_storage.delete(f"{directory}/{name}")
+                removed_directories += bool(files)
+    return removed_assets, removed_directories
+
+
+# -- rendering ---------------------------------------------------------------
+
+def image_variants(source):
+    """``{width, height, variants}`` of the ready asset for ``source``, or None."""
+    key = _cache_key(source)
+    data = cache.get(key)
+    if data is None:
+        data = ImageAsset.objects.filter(
+            source=source, status=ImageAsset.STATUS_READY
+        ).values('width', 'height', 'variants').first() or {}
+        cache.set(key, data, VARIANTS_CACHE_TIMEOUT if data else MISSING_CACHE_TIMEOUT)
+    return data or None
+
+
+def _srcset(widths):
+    return ', '.join(
+        f"{default_storage.url(name)} {width}w"
+        for width, name in sorted(widths.items(), key=lambda item: int(item[0]))
+    )
+
+
+def picture_html(source, alt='', sizes='100vw', attrs=None):
+    """
+    ``<picture>`` with AVIF/WebP/JPEG srcsets for ``source``, or a plain
+    ``<img>`` of the original while its variants are not ready.
+    """
+    attrs = {'loading': 'lazy', 'decoding': 'async', **(attrs or {})}
+    data = image_variants(source)
+    if not data or not data['variants'].get('jpeg'):
+        return format_html(
+            '<img src="{}" alt="{}"{} />',
+            source_url(source), alt, format_html_join('', ' {}="{}"', attrs.items()),
+        )
+
+    variants = data['variants']
+    jpeg = variants['jpeg']
+    fallback = max((int(width) for width in jpeg if int(width) <= FALLBACK_WIDTH), default=min(int(width) for width in jpeg))
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (output.mime_type, _srcset(variants[output.name]), sizes)
+            for output in OUTPUT_FORMATS
+            if output.name != 'jpeg' and variants.get(output.name)
+        ),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}"{} /></picture>',
+        sources,
+        default_storage.url(jpeg[str(fallback)]),
+        _srcset(jpeg),
+        sizes,
+        data['width'],
+        data['height'],
+        alt,
+        format_html_join('', ' {}="{}"', attrs.items()),
+    )
@@ -0,0 +1,65 @@
+"""
+Django management command to move old contact submissions to the archive.
+"""
+from django.core.management.base import BaseCommand
+from domain_finder.retention import (
+    RESPONDED_RETENTION_DAYS, RETENTION_BATCH_SIZE, RETENTION_DAYS, archive_submissions, expired_count, purge_archive
+)
+
+class Command(BaseCommand):
+    help = 'Move responded and old contact submissions to the archive table in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=RETENTION_DAYS,
+            help='Archive every submission older than this many days'
+        )
+        parser.add_argument(
+            '--responded-days',
+            type=int,
+            default=RESPONDED_RETENTION_DAYS,
+            help='Archive responded submissions older than this many days'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RETENTION_BATCH_SIZE,
+            help='Rows moved or deleted per transaction'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches'
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=None,
+            help='Also delete archived submissions older than this many days'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many submissions would be archived'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = expired_count(options['days'], options['responded_days'])
+            self.stdout.write(f'{count} submissions would be archived')
+            return
+
+        moved = archive_submissions(
+            days=options['days'],
+            responded_days=options['responded_days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} submissions'))
+
+        if options['purge_days'] is not None:
+            purged = purge_archive(options['purge_days'], batch_size=options['batch_size'], pause=options['pause'])
+            self.stdout.write(self.style.SUCCESS(f'Purged {purged} archived submissions'))
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""
+Django management command to rebuild the DomainCard read model.
+"""
+from django.core.management.base import BaseCommand
+from domain_finder.domain_cards import BACKFILL_BATCH_SIZE, rebuild_domain_cards
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized DomainCard row for every domain'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BACKFILL_BATCH_SIZE,
+            help='Number of cards upserted per query'
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_domain_cards(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} domain cards'))
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Django management command to load-test the load-more and contact endpoints of a running server.
+
+Compare the sync and async deployments by running the same benchmark against
+each, e.g. with a verifier that takes half a second to answer:
+
+    # Server under test (one of):
+    gunicorn -w 4 domain_finder_project.wsgi
+    ASYNC_VIEWS=True gunicorn -w 4 -k uvicorn.workers.UvicornWorker domain_finder_project.asgi
+
+    # Both with RECAPTCHA_VERIFY_URL=http://127.0.0.1:8765/ and RATE_LIMIT_CONTACT_IP
+    # raised far enough for the run, then:
+    python manage.py benchmark_endpoints contact --concurrency 200 --verifier-delay 0.5
+"""
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from collections import Counter
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = 'Send concurrent requests to load_more_domains or contact_ajax on a running server and report latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'endpoint',
+            choices=['load-more', 'contact'],
+            help='Endpoint to benchmark'
+        )
+        parser.add_argument(
+            '--url',
+            default='http://127.0.0.1:8000',
+            help='Base URL of the server under test'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Total number of requests'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Requests in flight at once'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Seconds before a request counts as failed'
+        )
+        parser.add_argument(
+            '--verifier-delay',
+            type=float,
+            default=None,
+            help='Also serve a stub reCAPTCHA verifier answering after this many seconds'
+        )
+        parser.add_argument(
+            '--verifier-port',
+            type=int,
+            default=8765,
+            help='Port of the stub verifier'
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http':
+            raise CommandError('Only plain http servers can be benchmarked')
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = options['timeout']
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        verifier = None
+        if options['verifier_delay'] is not None:
+            verifier = await self.serve_verifier(options['verifier_port'], options['verifier_delay'])
+
+        try:
+            if options['endpoint'] == 'contact':
+                make_request = await self.contact_requests()
+            else:
+                make_request = self.load_more_request
+
+            latencies = []
+            statuses = Counter()
+            queue = asyncio.Queue()
+            for number in range(options['requests']):
+                queue.put_nowait(number)
+
+            async def worker():
+                while not queue.empty():
+                    number = queue.get_nowait()
+                    started = time.monotonic()
+                    try:
+                        status, _, _ = await asyncio.wait_for(
+                            self.fetch(*make_request(number)), self.timeout
+                        )
+                    except (OSError, asyncio.TimeoutError, ValueError) as e:
+                        status = type(e).__name__
+                    statuses[status] += 1
+                    latencies.append(time.monotonic() - started)
+
+            started = time.monotonic()
+            await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+            elapsed = time.monotonic() - started
+        finally:
+            if verifier:
+                verifier.close()
+
+        self.report(latencies, statuses, elapsed)
+
+    async def fetch(self, method, path, headers=None, body=b''):
+        """One HTTP/1.0 request on a new connection; returns (status, headers, body)."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            lines = [f"{method} {path} HTTP/1.0", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+            lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, content = response.partition(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        response_headers = [line.split(':', 1) for line in header_lines if ':' in line]
+        return int(status_line.split(' ', 2)[1]), response_headers, content
+
+    def load_more_request(self, number):
+        sorts = ['featured', 'newest', 'price_asc', 'price_desc', 'name_length']
+        return 'GET', f"/domains/load-more/?sort={sorts[number % len(sorts)]}&limit=12"
+
+    async def contact_requests(self):
+        """A request factory for contact posts, with a CSRF token from the contact page."""
+        status, headers, _ = await self.fetch('GET', '/contact/')
+        cookie = SimpleCookie()
+        for name, value in headers:
+            if name.lower() == 'set-cookie':
+                cookie.load(value.strip())
+        if status != 200 or 'csrftoken' not in cookie:
+            raise CommandError(f'Could not get a CSRF token from /contact/ (HTTP {status})')
+        token = cookie['csrftoken'].value
+        run = uuid.uuid4().hex[:8]
+
+        def make_request(number):
+            # Distinct content so duplicate detection does not collapse them
+            body = json.dumps({
+                'name': 'Benchmark',
+                'email': f'benchmark-{run}-{number}@example.com',
+                'message': f'Benchmark message {run} number {number}, please ignore.',
+                'captcha': f'benchmark-{number}',
+            }).encode('utf-8')
+            return 'POST', '/ajax/contact/', {
+                'Content-Type': 'application/json',
+                'Cookie': f'csrftoken={token}',
+                'X-CSRFToken': token,
+                'Referer': f'http://{self.host}:{self.port}/contact/',
+            }, body
+        return make_request
+
+    async def serve_verifier(self, port, delay):
+        """Start a stub siteverify endpoint that always succeeds after ``delay`` seconds."""
+        answer = json.dumps({'success': True, 'action': 'submit', 'score': 0.9}).encode('utf-8')
+
+        async def handle(reader, writer):
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in head.decode('latin-1').split('\r\n'):
+                    if line.lower().startswith('content-length:'):
+                        length = int(line.split(':', 1)[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(delay)
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    + f'Content-Length: {len(answer)}\r\nConnection: close\r\n\r\n'.encode('latin-1')
+                    + answer
+                )
+                await writer.drain()
+            except (OSError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', port, backlog=1024)
+        self.stdout.write(f'Stub verifier on http://127.0.0.1:{port}/ ({delay}s per verification)')
+        return server
+
+    def report(self, latencies, statuses, elapsed):
+        latencies.sort()
+
+        def percentile(share):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * share))] * 1000
+
+        self.stdout.write(
+            f'{len(latencies)} requests in {elapsed:.2f}s: {len(latencies) / elapsed:.1f} req/s'
+        )
+        self.stdout.write(
+            f'Latency ms: mean {statistics.mean(latencies) * 1000:.1f}, p50 {percentile(0.5):.1f}, '
+            f'p95 {percentile(0.95):.1f}, p99 {percentile(0.99):.1f}, max {latencies[-1] * 1000:.1f}'
+        )
+        self.stdout.write('Responses: ' + ', '.join(f'{status}: {count}' for status, count in sorted(
+            statuses.items(), key=lambda item: str(item[0])
+        )))
\ No newline at end of file
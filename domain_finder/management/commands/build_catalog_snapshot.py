@@ -0,0 +1,12 @@
+"""
+Django management command to compile the shared catalog snapshot.
+"""
+from django.core.management.base import BaseCommand
+from domain_finder.snapshot import build_snapshot, snapshot_path
+
+class Command(BaseCommand):
+    help = 'Compile the available catalog into the memory-mapped snapshot file'
+
+    def handle(self, *args, **options):
+        count = build_snapshot()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} domains to {snapshot_path()}'))
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Django management command to exercise the database connection pool against a live database.
+
+Worker threads act like requests: each borrows a connection, runs a query
+and hands it back by closing it, as Django does at the end of a request.
+With --terminate the pooled backends are killed halfway through, so the
+second half shows whether the health checks replace them without errors.
+"""
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+from domain_finder.db_pool.base import pool_stats
+
+class Command(BaseCommand):
+    help = 'Run concurrent queries through the pooled database backend and report pool statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database alias to test'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=20,
+            help='Concurrent workers'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=100,
+            help='Queries per worker, each on a freshly borrowed connection'
+        )
+        parser.add_argument(
+            '--hold',
+            type=float,
+            default=0.005,
+            help='Seconds each query keeps its connection busy (pg_sleep)'
+        )
+        parser.add_argument(
+            '--terminate',
+            action='store_true',
+            help='Terminate the pooled backends halfway through'
+        )
+        parser.add_argument(
+            '--reconnect',
+            action='store_true',
+            help='Close idle pooled connections after every query, like running without a pool'
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if connections[alias].settings_dict['ENGINE'] != 'domain_finder.db_pool':
+            raise CommandError(f"Database '{alias}' does not use the domain_finder.db_pool backend")
+
+        half = options['requests'] // 2
+        backends = self.run_phase('First half', alias, options, half)
+        if options['terminate']:
+            terminated = self.terminate_backends(alias, backends)
+            self.stdout.write(f'Terminated {terminated} pooled backends')
+        self.run_phase('Second half', alias, options, options['requests'] - half)
+
+        for name, value in pool_stats()[alias].items():
+            self.stdout.write(f'  {name}: {value}')
+
+    def run_phase(self, label, alias, options, count):
+        latencies = []
+        outcomes = Counter()
+        backends = set()
+        lock = threading.Lock()
+
+        def worker():
+            connection = connections[alias]
+            try:
+                for _ in range(count):
+                    started = time.monotonic()
+                    try:
+                        with connection.cursor() as cursor:
+                            cursor.execute('SELECT pg_backend_pid() FROM pg_sleep(%s)', [options['hold']])
+                            backend = cursor.fetchone()[0]
+                        with lock:
+                            backends.add(backend)
+                        outcome = 'ok'
+                    except DatabaseError as e:
+                        outcome = type(e).__name__
+                    finally:
+                        # The end of a request
+                        connection.close()
+                        if options['reconnect']:
+                            connection.pool.close()
+                    with lock:
+                        latencies.append(time.monotonic() - started)
+                        outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+        self.stdout.write(
+            f"{label}: {len(latencies)} queries in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s), "
+            f"latency ms p50 {statistics.median(latencies) * 1000:.1f}, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}; "
+            + ', '.join(f'{outcome}: {number}' for outcome, number in sorted(outcomes.items()))
+        )
+        return backends
+
+    def terminate_backends(self, alias, backends):
+        """Kill the server side of the pooled connections, over a connection of its own."""
+        connection = connections[alias]
+        raw = connection.Database.connect(**connection.get_connection_params())
+        try:
+            with raw.cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM unnest(%s) AS pid WHERE pg_terminate_backend(pid)', [list(backends)])
+                return cursor.fetchone()[0]
+        finally:
+            raw.close()
\ No newline at end of file
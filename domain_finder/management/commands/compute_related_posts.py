@@ -0,0 +1,22 @@
+"""
+Django management command to precompute related blog posts.
+"""
+from django.core.management.base import BaseCommand
+from domain_finder.related_posts import refresh_related_posts
+
+class Command(BaseCommand):
+    help = 'Recompute TF-IDF related posts for blog posts whose text (or neighbours) changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every post (run periodically to absorb document frequency drift)'
+        )
+
+    def handle(self, *args, **options):
+        result = refresh_related_posts(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Related posts: {result.recomputed} of {result.posts} posts recomputed, '
+            f'{result.removed} unpublished posts dropped'
+        ))
\ No newline at end of file
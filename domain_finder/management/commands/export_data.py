@@ -0,0 +1,49 @@
+"""
+Django management command to stream domains, contact submissions or blog posts to CSV or JSON Lines.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+from domain_finder.exports import EXPORT_CHUNK_SIZE, EXPORTS, FORMATS, export_chunks
+
+class Command(BaseCommand):
+    help = 'Export domains, contact submissions or blog posts as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS), help='What to export')
+        parser.add_argument(
+            '--format',
+            choices=sorted(FORMATS),
+            default='csv',
+            help='Output format (default: csv)'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Output file (default: stdout); a .gz suffix implies --gzip'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Gzip the output'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Rows fetched from the server-side cursor per round trip'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        gzip = options['gzip'] or bool(output and output.endswith('.gz'))
+        chunks = export_chunks(options['name'], options['format'], gzip=gzip, chunk_size=options['chunk_size'])
+
+        if output:
+            with open(output, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'Exported {options["name"]} to {output}'))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
\ No newline at end of file
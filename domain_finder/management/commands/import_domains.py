@@ -0,0 +1,68 @@
+"""
+Django management command to bulk import domains from marketplace exports.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from domain_finder.domain_import import IMPORT_BATCH_SIZE, ImportRowError, RowNormalizer, import_domains, read_rows
+
+class Command(BaseCommand):
+    help = 'Import or update domains from CSV or JSON Lines files (optionally gzipped)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV, JSONL or .gz files to import')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='Source format (detected from the file name by default)'
+        )
+        parser.add_argument(
+            '--default-status',
+            help='DomainStatus slug for rows without a status'
+        )
+        parser.add_argument(
+            '--default-currency',
+            help='Currency code for rows without a currency'
+        )
+        parser.add_argument(
+            '--website-name',
+            help='Marketplace name for rows without a website_name (e.g. Sedo)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Number of rows compared and upserted per query'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing anything'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            normalizer = RowNormalizer(
+                default_status=options['default_status'],
+                default_currency=options['default_currency'],
+                website_name=options['website_name'],
+            )
+        except ImportRowError as e:
+            raise CommandError(str(e))
+
+        for path in options['paths']:
+            try:
+                result = import_domains(
+                    read_rows(path, options['format']),
+                    normalizer,
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+            except OSError as e:
+                raise CommandError(f'Cannot read {path}: {e}')
+
+            for line_number, message in result.errors:
+                self.stderr.write(f'{path}:{line_number}: {message}')
+            prefix = 'Would import' if options['dry_run'] else 'Imported'
+            self.stdout.write(self.style.SUCCESS(
+                f'{prefix} {path}: {result.created} created, {result.updated} updated, '
+                f'{result.unchanged} unchanged, {result.invalid} invalid'
+            ))
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Django management command to derive responsive image variants.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from domain_finder.image_derivatives import MAX_ATTEMPTS, image_sources, process_assets, prune_assets, register_sources
+from domain_finder.models import ImageAsset
+
+class Command(BaseCommand):
+    help = 'Register every image the site shows and derive resized AVIF/WebP/JPEG variants of pending ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help=f'Also retry failed images (up to {MAX_ATTEMPTS} attempts)'
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Fetch and derive every image again, e.g. after changing the widths or formats'
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete assets and derivative files no longer referenced by the site'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of images fetched and encoded concurrently'
+        )
+
+    def handle(self, *args, **options):
+        register_sources(image_sources())
+
+        assets = ImageAsset.objects.all()
+        if not options['refresh']:
+            condition = Q(status=ImageAsset.STATUS_PENDING)
+            if options['retry_failed']:
+                condition |= Q(status=ImageAsset.STATUS_FAILED, attempts__lt=MAX_ATTEMPTS)
+            assets = assets.filter(condition)
+        ready, failed = process_assets(list(assets), workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(f'Images: {ready} processed, {failed} failed'))
+
+        if options['prune']:
+            removed_assets, removed_directories = prune_assets()
+            self.stdout.write(self.style.SUCCESS(
+                f'Pruned {removed_assets} unused assets and {removed_directories} derivative directories'
+            ))
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Django management command to rebuild the materialized catalog statistics.
+
+With --medians only the medians left stale by domain changes are
+recomputed, which is cheap enough to run from cron every few minutes.
+"""
+from django.core.management.base import BaseCommand
+from domain_finder.catalog_stats import rebuild_catalog_statistics, refresh_stale_medians
+
+class Command(BaseCommand):
+    help = 'Recompute CatalogStatistics from the Domain table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--medians',
+            action='store_true',
+            help='Only recompute stale per-currency median prices'
+        )
+
+    def handle(self, *args, **options):
+        if options['medians']:
+            refreshed = refresh_stale_medians() is not None
+            self.stdout.write(self.style.SUCCESS('Stale medians refreshed' if refreshed else 'No stale medians'))
+            return
+        stats = rebuild_catalog_statistics()
+        self.stdout.write(self.style.SUCCESS(
+            f'Catalog statistics rebuilt: {stats.total_count} domains, '
+            f'{stats.available_count} available'
+        ))
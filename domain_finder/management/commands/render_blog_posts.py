@@ -0,0 +1,61 @@
+"""
+Django management command to re-render the stored Markdown of blog posts.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from domain_finder.blog_rendering import RENDERED_FIELDS, RENDERER_VERSION, content_hash, render_markdown
+from domain_finder.models import BlogPost
+from domain_finder.page_cache import BLOG, bump_versions
+
+class Command(BaseCommand):
+    help = 'Re-render blog posts whose stored HTML is missing or out of date (e.g. after a renderer change)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-render every post, even if its stored HTML is current'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of worker processes (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of posts updated per query'
+        )
+
+    def handle(self, *args, **options):
+        stale_ids = [
+            pk
+            for pk, content, stored_hash, version in BlogPost.objects.values_list(
+                'pk', 'content', 'content_hash', 'renderer_version'
+            ).iterator()
+            if options['all'] or version != RENDERER_VERSION or stored_hash != content_hash(content)
+        ]
+        if not stale_ids:
+            self.stdout.write(self.style.SUCCESS('All blog posts are up to date'))
+            return
+
+        # Worker processes only render; they must not inherit open connections
+        connections.close_all()
+        batch_size = options['batch_size']
+        rendered = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for start in range(0, len(stale_ids), batch_size):
+                posts = list(BlogPost.objects.filter(pk__in=stale_ids[start:start + batch_size]).only('pk', 'content'))
+                for post, fields in zip(posts, executor.map(render_markdown, [post.content for post in posts], chunksize=8)):
+                    for field, value in fields.items():
+                        setattr(post, field, value)
+                # bulk_update skips save() and leaves updated_at alone
+                BlogPost.objects.bulk_update(posts, RENDERED_FIELDS)
+                rendered += len(posts)
+
+        bump_versions(BLOG)
+        self.stdout.write(self.style.SUCCESS(f'Re-rendered {rendered} blog posts'))
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Django management command to send queued outbox emails.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from domain_finder.outbox import OUTBOX_BATCH_SIZE, purge_sent, queue_depth, send_batch
+
+class Command(BaseCommand):
+    help = 'Send due emails from the outbox, once or continuously with --loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting once it is drained'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls of an empty outbox (with --loop)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help='Messages claimed and sent over one SMTP connection'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print the queue depth and exit'
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=None,
+            help='Delete messages sent more than this many days ago'
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_depth()
+            return
+        if options['purge_days'] is not None:
+            deleted = purge_sent(options['purge_days'])
+            self.stdout.write(self.style.SUCCESS(f'Purged {deleted} sent messages'))
+
+        try:
+            while True:
+                result = send_batch(options['batch_size'])
+                if result.claimed:
+                    self.stdout.write(
+                        f'Outbox batch: {result.sent} sent, {result.retried} to retry, {result.failed} failed'
+                    )
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.write_depth()
+
+    def write_depth(self):
+        depth = queue_depth()
+        age = ''
+        if depth.oldest_pending:
+            age = f', oldest pending {int((timezone.now() - depth.oldest_pending).total_seconds())}s old'
+        self.stdout.write(self.style.SUCCESS(
+            f'Outbox: {depth.pending} pending ({depth.due} due), {depth.failed} failed{age}'
+        ))
\ No newline at end of file
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:50
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0036_contactinfo_show_what_to_expect_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='domain',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-is_featured_on_homepage', '-created_at', '-id'], name='domain_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='domain',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-created_at', '-id'], name='domain_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='domain',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['price', 'id'], name='domain_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='domain',
+            index=models.Index(django.db.models.functions.text.Length('name'), models.F('id'), condition=models.Q(('is_available', True)), name='domain_name_length_idx'),
+        ),
+    ]
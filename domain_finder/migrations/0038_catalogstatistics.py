@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0037_domain_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_count', models.PositiveIntegerField(default=0, help_text='All domains in the catalog')),
+                ('available_count', models.PositiveIntegerField(default=0, help_text='Domains currently available for sale')),
+                ('currency_stats', models.JSONField(default=dict, help_text='Per-currency price stats for available domains: {code: {symbol, count, min, max, median}}')),
+                ('status_counts', models.JSONField(default=dict, help_text='Available domains per status slug')),
+                ('tld_counts', models.JSONField(default=dict, help_text='Available domains per TLD')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Catalog Statistics',
+                'verbose_name_plural': 'Catalog Statistics',
+            },
+        ),
+        migrations.AlterField(
+            model_name='homepage',
+            name='domains_analyzed',
+            field=models.CharField(default='500+', help_text="Fallback shown while the catalog is empty; otherwise the live domain count is used (e.g., '500+', '1000+')", max_length=20),
+        ),
+    ]
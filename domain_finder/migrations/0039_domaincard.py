@@ -0,0 +1,84 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.urls import reverse
+
+
+BATCH_SIZE = 1000
+
+
+def card_fields(domain, contact_url):
+    """The card fields of a domain, as domain_cards resolved them when this migration was written."""
+    currency, status = domain.currency, domain.status
+    currency_symbol = currency.symbol if currency else '$'
+
+    if domain.direct_to_contact:
+        view_button_text = "Contact for Details"
+    elif domain.listing_url and domain.website_name:
+        view_button_text = f"View on {domain.website_name}"
+    elif domain.listing_url:
+        view_button_text = "View Listing"
+    else:
+        view_button_text = "Contact for Details"
+
+    should_show_contact_button = domain.direct_to_contact or not domain.listing_url
+
+    return {
+        'formatted_price': f"{currency_symbol}{domain.price:,.0f}",
+        'currency_symbol': currency_symbol,
+        'display_status': status.name if status else 'Regular',
+        'status_badge_class': status.badge_class if status else 'bg-gray-100 text-gray-800',
+        'features_list': [feature.strip() for feature in domain.features.split('\n') if feature.strip()],
+        'view_button_text': view_button_text,
+        'button_url': contact_url if should_show_contact_button else domain.listing_url,
+        'has_external_listing': bool(domain.listing_url) and not domain.direct_to_contact,
+        'should_show_contact_button': should_show_contact_button,
+    }
+
+
+def populate_domain_cards(apps, schema_editor):
+    """Build a card for every existing domain, a batch at a time."""
+    Domain = apps.get_model('domain_finder', 'Domain')
+    DomainCard = apps.get_model('domain_finder', 'DomainCard')
+    contact_url = reverse('domain_finder:contact')
+
+    batch = []
+    for domain in Domain.objects.select_related('currency', 'status').iterator(chunk_size=BATCH_SIZE):
+        batch.append(DomainCard(domain=domain, **card_fields(domain, contact_url)))
+        if len(batch) >= BATCH_SIZE:
+            DomainCard.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DomainCard.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0038_catalogstatistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainCard',
+            fields=[
+                ('domain', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='domain_finder.domain')),
+                ('formatted_price', models.CharField(max_length=50)),
+                ('currency_symbol', models.CharField(max_length=5)),
+                ('display_status', models.CharField(max_length=20)),
+                ('status_badge_class', models.CharField(max_length=100)),
+                ('features_list', models.JSONField(default=list)),
+                ('view_button_text', models.CharField(max_length=100)),
+                ('button_url', models.CharField(max_length=500)),
+                ('has_external_listing', models.BooleanField(default=False)),
+                ('should_show_contact_button', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Domain Card',
+                'verbose_name_plural': 'Domain Cards',
+            },
+        ),
+        migrations.RunPython(populate_domain_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:54
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# Keeps Domain.search_vector in step with the searchable columns. Dots and
+# hyphens in the name are split so "TechStartup.com" matches "techstartup".
+SEARCH_VECTOR_TRIGGER = """
+CREATE OR REPLACE FUNCTION domain_finder_domain_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', regexp_replace(coalesce(NEW.name, ''), '[.\\-]', ' ', 'g')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.features, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER domain_finder_domain_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, features, search_vector
+    ON domain_finder_domain
+    FOR EACH ROW EXECUTE FUNCTION domain_finder_domain_search_vector_update();
+
+-- Populate existing rows (the trigger recomputes the vector)
+UPDATE domain_finder_domain SET search_vector = NULL;
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS domain_finder_domain_search_vector_trigger ON domain_finder_domain;
+DROP FUNCTION IF EXISTS domain_finder_domain_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0039_domaincard'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='domain',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted full-text vector of name, description and features (maintained by a database trigger)', null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+        migrations.AddIndex(
+            model_name='domain',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='domain_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='domain',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='domain_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0040_domain_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='domain',
+            name='import_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the last imported source row (used by import_domains to skip unchanged rows)', max_length=64),
+        ),
+    ]
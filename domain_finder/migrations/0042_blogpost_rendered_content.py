@@ -0,0 +1,96 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:21
+
+import hashlib
+import math
+
+import markdown
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+
+# blog_rendering as of this migration; posts rendered here keep version 1
+# and are re-rendered by render_blog_posts once the renderer moves on
+RENDERER_VERSION = 1
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'toc']
+EXTENSION_CONFIGS = {
+    'toc': {'toc_depth': '2-3'},
+}
+WORDS_PER_MINUTE = 200
+RENDERED_FIELDS = ['content_html', 'toc_html', 'word_count', 'reading_minutes', 'content_hash', 'renderer_version']
+BATCH_SIZE = 100
+
+
+def render_markdown(md, content):
+    html = md.reset().convert(content)
+    word_count = len(strip_tags(html).split())
+    return {
+        'content_html': html,
+        'toc_html': md.toc if md.toc_tokens else '',
+        'word_count': word_count,
+        'reading_minutes': max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+        'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest(),
+        'renderer_version': RENDERER_VERSION,
+    }
+
+
+def render_blog_posts(apps, schema_editor):
+    """Store the rendered Markdown of every existing post, a batch at a time."""
+    BlogPost = apps.get_model('domain_finder', 'BlogPost')
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, extension_configs=EXTENSION_CONFIGS)
+
+    batch = []
+    for post in BlogPost.objects.only('id', 'content').iterator(chunk_size=BATCH_SIZE):
+        for field, value in render_markdown(md, post.content).items():
+            setattr(post, field, value)
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            BlogPost.objects.bulk_update(batch, RENDERED_FIELDS)
+            batch = []
+    if batch:
+        BlogPost.objects.bulk_update(batch, RENDERED_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0041_domain_import_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='renderer_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='toc_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='read_time',
+            field=models.CharField(blank=True, help_text='Leave blank to use the reading time computed from the word count', max_length=20),
+        ),
+        migrations.RunPython(render_blog_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:23
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Keeps BlogPost.search_vector in step with the searchable columns
+SEARCH_VECTOR_TRIGGER = """
+CREATE OR REPLACE FUNCTION domain_finder_blogpost_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.excerpt, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER domain_finder_blogpost_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, excerpt, content, search_vector
+    ON domain_finder_blogpost
+    FOR EACH ROW EXECUTE FUNCTION domain_finder_blogpost_search_vector_update();
+
+-- Populate existing rows (the trigger recomputes the vector)
+UPDATE domain_finder_blogpost SET search_vector = NULL;
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS domain_finder_blogpost_search_vector_trigger ON domain_finder_blogpost;
+DROP FUNCTION IF EXISTS domain_finder_blogpost_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0043_blogpost_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted full-text vector of title, excerpt and content (maintained by a database trigger)', null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blogpost_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0048_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='captcha_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='captcha_status',
+            field=models.CharField(choices=[('verified', 'Verified'), ('unverified', 'Accepted unverified'), ('review', 'Held for review'), ('approved', 'Approved after review')], default='verified', help_text='Set when the reCAPTCHA verifier was unavailable (see RECAPTCHA_FALLBACK_POLICY)', max_length=10),
+        ),
+    ]
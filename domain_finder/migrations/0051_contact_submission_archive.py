@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    # Index the live submissions table without blocking inserts
+    atomic = False
+
+    dependencies = [
+        ('domain_finder', '0050_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedContactSubmission',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('message', models.TextField()),
+                ('submitted_at', models.DateTimeField()),
+                ('is_responded', models.BooleanField(default=False)),
+                ('captcha_status', models.CharField(choices=[('verified', 'Verified'), ('unverified', 'Accepted unverified'), ('review', 'Held for review'), ('approved', 'Approved after review')], default='verified', max_length=10)),
+                ('captcha_score', models.FloatField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Archived Contact Submission',
+                'verbose_name_plural': 'Archived Contact Submissions',
+                'ordering': ['-submitted_at'],
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='contactsubmission',
+            index=models.Index(fields=['-submitted_at'], name='contact_submitted_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='contactsubmission',
+            index=models.Index(fields=['is_responded', '-submitted_at'], name='contact_responded_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='contactsubmission',
+            index=models.Index(fields=['captcha_status', '-submitted_at'], name='contact_captcha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcontactsubmission',
+            index=models.Index(fields=['-submitted_at'], name='archived_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcontactsubmission',
+            index=models.Index(fields=['email'], name='archived_email_idx'),
+        ),
+    ]
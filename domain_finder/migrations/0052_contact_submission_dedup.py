@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:43
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Index the live submissions table without blocking inserts
+    atomic = False
+
+    dependencies = [
+        ('domain_finder', '0051_contact_submission_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedcontactsubmission',
+            name='duplicate_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='duplicate_count',
+            field=models.PositiveIntegerField(default=0, help_text='Repeats and near-duplicates answered from this submission'),
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='contactsubmission',
+            index=models.Index(fields=['content_hash', 'submitted_at'], name='contact_content_idx'),
+        ),
+    ]
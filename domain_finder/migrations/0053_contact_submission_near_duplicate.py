@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0052_contact_submission_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedcontactsubmission',
+            name='near_duplicate_of',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='near_duplicate_of',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='ID of a recent submission this message closely resembles', null=True),
+        ),
+        migrations.AlterField(
+            model_name='contactsubmission',
+            name='duplicate_count',
+            field=models.PositiveIntegerField(default=0, help_text='Exact repeats answered from this submission'),
+        ),
+    ]
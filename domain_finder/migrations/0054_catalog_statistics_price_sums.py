@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain_finder', '0053_contact_submission_near_duplicate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='catalogstatistics',
+            name='currency_stats',
+            field=models.JSONField(default=dict, help_text='Per-currency price stats for available domains: {code: {symbol, count, sum, min, max, median}}'),
+        ),
+    ]
@@ -1,12 +1,18 @@
 """
 Django models for the Domain Finder application.
 """
+from decimal import Decimal
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Length
 from django.urls import reverse
 from django.utils import timezone
-import markdown
 from django.utils.safestring import mark_safe
 
+from . import blog_rendering
+
 class HomePage(models.Model):
     """Homepage hero section content."""
     title = models.CharField(
@@ -28,7 +34,7 @@ class HomePage(models.Model):
     domains_analyzed = models.CharField(
         max_length=20,
         default="500+",
-        help_text="Number of domains analyzed (e.g., '500+', '1000+')"
+        help_text="Fallback shown while the catalog is empty; otherwise the live domain count is used (e.g., '500+', '1000+')"
     )
     domains_analyzed_label = models.CharField(
         max_length=50,
@@ -232,18 +238,64 @@ class BlogPost(models.Model):
     content = models.TextField()
     category = models.ForeignKey(BlogCategory, on_delete=models.CASCADE, related_name='posts')
     image_url = models.URLField(max_length=500, blank=True)
-    read_time = models.CharField(max_length=20, default="5 min read")
+    read_time = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Leave blank to use the reading time computed from the word count"
+    )
     is_featured = models.BooleanField(default=False)
     is_published = models.BooleanField(default=True)
+    
+    # Rendered on save by blog_rendering.render_post
+    content_html = models.TextField(blank=True, editable=False)
+    toc_html = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_minutes = models.PositiveIntegerField(default=0, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    renderer_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted full-text vector of title, excerpt and content (maintained by a database trigger)"
+    )
+    related_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="Hash of the text the stored related posts were computed from (see compute_related_posts)"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        # Keyset indexes for the blog listing (see blog_listing.paginate_posts)
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='blogpost_published_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=['category', '-created_at', '-id'],
+                name='blogpost_category_idx',
+                condition=models.Q(is_published=True),
+            ),
+            GinIndex(fields=['search_vector'], name='blogpost_search_vector_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        # Store the rendered Markdown so views never render on request
+        update_fields = kwargs.get('update_fields')
+        if blog_rendering.render_post(self) and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *blog_rendering.RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('domain_finder:blog_detail', kwargs={'post_id': self.pk})
     
@@ -251,25 +303,176 @@ class BlogPost(models.Model):
     def formatted_date(self):
         return self.created_at.strftime("%B %d, %Y")
 
+    @property
+    def display_read_time(self):
+        """Get the reading time, falling back to the one computed from the word count."""
+        if self.read_time.strip():
+            return self.read_time
+        return f"{max(self.reading_minutes, 1)} min read"
+
     @property
     def content_as_markdown(self):
-        """Convert markdown content to HTML."""
-        return mark_safe(markdown.markdown(self.content, extensions=['extra', 'codehilite']))
+        """Rendered HTML of the markdown content (stored on save)."""
+        if not blog_rendering.is_current(self):
+            # Not rendered yet with the current renderer; see render_blog_posts
+            return mark_safe(blog_rendering.render_markdown(self.content)['content_html'])
+        return mark_safe(self.content_html)
+
+class RelatedPost(models.Model):
+    """Precomputed nearest neighbours of a blog post by TF-IDF cosine similarity."""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_from')
+    rank = models.PositiveSmallIntegerField(help_text="1 for the most similar post")
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='relatedpost_post_rank_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.3f})"
 
 class ContactSubmission(models.Model):
     """Contact form submissions."""
+    CAPTCHA_VERIFIED = 'verified'
+    CAPTCHA_UNVERIFIED = 'unverified'
+    CAPTCHA_REVIEW = 'review'
+    CAPTCHA_APPROVED = 'approved'
+    CAPTCHA_STATUS_CHOICES = [
+        (CAPTCHA_VERIFIED, 'Verified'),
+        (CAPTCHA_UNVERIFIED, 'Accepted unverified'),
+        (CAPTCHA_REVIEW, 'Held for review'),
+        (CAPTCHA_APPROVED, 'Approved after review'),
+    ]
+
     name = models.CharField(max_length=100)
     email = models.EmailField()
     message = models.TextField()
     submitted_at = models.DateTimeField(auto_now_add=True)
     is_responded = models.BooleanField(default=False)
+    captcha_status = models.CharField(
+        max_length=10,
+        choices=CAPTCHA_STATUS_CHOICES,
+        default=CAPTCHA_VERIFIED,
+        help_text="Set when the reCAPTCHA verifier was unavailable (see RECAPTCHA_FALLBACK_POLICY)"
+    )
+    captcha_score = models.FloatField(null=True, blank=True)
+    
+    # Duplicate detection (see dedup.py)
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    simhash = models.BigIntegerField(null=True, blank=True, editable=False)
+    duplicate_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Exact repeats answered from this submission"
+    )
+    near_duplicate_of = models.BigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="ID of a recent submission this message closely resembles"
+    )
     
     class Meta:
         ordering = ['-submitted_at']
+        # The admin changelist sorts by submitted_at, optionally filtered
+        indexes = [
+            models.Index(fields=['-submitted_at'], name='contact_submitted_idx'),
+            models.Index(fields=['is_responded', '-submitted_at'], name='contact_responded_idx'),
+            models.Index(fields=['captcha_status', '-submitted_at'], name='contact_captcha_idx'),
+            models.Index(fields=['content_hash', 'submitted_at'], name='contact_content_idx'),
+        ]
     
     def __str__(self):
         return f"Contact from {self.name} - {self.email}"
 
+
+class ArchivedContactSubmission(models.Model):
+    """
+    Contact submission moved out of the hot table by the
+    ``archive_submissions`` command (see retention.py). Keeps the original id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    message = models.TextField()
+    submitted_at = models.DateTimeField()
+    is_responded = models.BooleanField(default=False)
+    captcha_status = models.CharField(
+        max_length=10,
+        choices=ContactSubmission.CAPTCHA_STATUS_CHOICES,
+        default=ContactSubmission.CAPTCHA_VERIFIED
+    )
+    captcha_score = models.FloatField(null=True, blank=True)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    near_duplicate_of = models.BigIntegerField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Archived Contact Submission"
+        verbose_name_plural = "Archived Contact Submissions"
+        ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['-submitted_at'], name='archived_submitted_idx'),
+            models.Index(fields=['email'], name='archived_email_idx'),
+        ]
+
+    def __str__(self):
+        return f"Contact from {self.name} - {self.email} (archived)"
+
+
+class OutboxEmail(models.Model):
+    """
+    Email waiting to be sent by the ``send_outbox`` worker (see outbox.py).
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers can drain the queue without sending a message twice.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    to = models.JSONField(default=list, help_text="Recipient addresses; empty sends to the site inbox from ContactInfo")
+    reply_to = models.JSONField(default=list, blank=True)
+    submission = models.ForeignKey(
+        ContactSubmission,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='emails'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+        ordering = ['-created_at']
+        # The worker's claim query only ever looks at due pending rows
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='outbox_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
 class ContactInfo(models.Model):
     """Contact page content management."""
     
@@ -483,6 +686,17 @@ class Domain(models.Model):
         default=False,
         help_text="If checked, the button will direct to contact page instead of external listing"
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted full-text vector of name, description and features (maintained by a database trigger)"
+    )
+    import_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="Hash of the last imported source row (used by import_domains to skip unchanged rows)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -490,6 +704,32 @@ class Domain(models.Model):
         ordering = ['-is_featured_on_homepage', '-created_at']
         verbose_name = "Domain for Sale"
         verbose_name_plural = "Domains for Sale"
+        # One partial index per sort order offered by pagination.DOMAIN_SORTS
+        indexes = [
+            models.Index(
+                fields=['-is_featured_on_homepage', '-created_at', '-id'],
+                name='domain_featured_idx',
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='domain_newest_idx',
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                fields=['price', 'id'],
+                name='domain_price_idx',
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                Length('name'), 'id',
+                name='domain_name_length_idx',
+                condition=models.Q(is_available=True),
+            ),
+            # Full-text and trigram search (see search.py)
+            GinIndex(fields=['search_vector'], name='domain_search_vector_idx'),
+            GinIndex(fields=['name'], name='domain_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
     
     def __str__(self):
         currency_symbol = self.currency.symbol if self.currency else '$'
@@ -549,6 +789,75 @@ class Domain(models.Model):
             return self.listing_url
         
 
+class DomainCard(models.Model):
+    """
+    Denormalized read model of a domain's listing card.
+
+    Holds the fully resolved display fields so listing pages need a single
+    query and no per-row Python work. Rebuilt by domain_cards.py whenever a
+    Domain, Currency or DomainStatus is written.
+    """
+    domain = models.OneToOneField(
+        Domain,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='card'
+    )
+    formatted_price = models.CharField(max_length=50)
+    currency_symbol = models.CharField(max_length=5)
+    display_status = models.CharField(max_length=20)
+    status_badge_class = models.CharField(max_length=100)
+    features_list = models.JSONField(default=list)
+    view_button_text = models.CharField(max_length=100)
+    button_url = models.CharField(max_length=500)
+    has_external_listing = models.BooleanField(default=False)
+    should_show_contact_button = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Domain Card"
+        verbose_name_plural = "Domain Cards"
+    
+    def __str__(self):
+        return f"Card for domain #{self.domain_id}"
+
+
+class CatalogStatistics(models.Model):
+    """
+    Materialized catalog aggregates, kept as a single row.
+
+    Maintained incrementally from Domain signals (see catalog_stats.py) so the
+    domains page and homepage read their numbers with one primary-key lookup.
+    """
+    total_count = models.PositiveIntegerField(default=0, help_text="All domains in the catalog")
+    available_count = models.PositiveIntegerField(default=0, help_text="Domains currently available for sale")
+    currency_stats = models.JSONField(
+        default=dict,
+        help_text="Per-currency price stats for available domains: {code: {symbol, count, sum, min, max, median}}"
+    )
+    status_counts = models.JSONField(default=dict, help_text="Available domains per status slug")
+    tld_counts = models.JSONField(default=dict, help_text="Available domains per TLD")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Catalog Statistics"
+        verbose_name_plural = "Catalog Statistics"
+    
+    def __str__(self):
+        return f"Catalog Statistics ({self.available_count} available)"
+    
+    @property
+    def price_range(self):
+        """Return the overall (min, max) price of available domains, or None."""
+        if not self.currency_stats:
+            return None
+        prices = self.currency_stats.values()
+        return (
+            min(Decimal(entry['min']) for entry in prices),
+            max(Decimal(entry['max']) for entry in prices),
+        )
+
+
 class ExpectationItem(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -564,4 +873,77 @@ class ExpectationItem(models.Model):
         verbose_name_plural = 'Expectation Items'
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+class ImageAsset(models.Model):
+    """
+    Resized variants of an image shown on the site.
+
+    ``source`` is a remote URL or the media storage name of an upload.
+    Variants are written by image_derivatives.py under a path derived from
+    the digest of the original, so identical images share their files.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    source = models.CharField(max_length=500, unique=True, help_text="Remote URL or media storage name of the original")
+    digest = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the original bytes")
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    variants = models.JSONField(default=dict, help_text="Storage names per format and width: {format: {width: name}}")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Image Asset"
+        verbose_name_plural = "Image Assets"
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+
+
+class ContentVersion(models.Model):
+    """
+    Version counter per content scope, bumped whenever content in the scope
+    changes. Part of every full-page cache key (see page_cache.py), so one
+    bump invalidates the cached pages of the scope in every process.
+    """
+    scope = models.CharField(max_length=30, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Content Version"
+        verbose_name_plural = "Content Versions"
+
+    def __str__(self):
+        return f"{self.scope} v{self.version}"
+
+
+class RateLimitBucket(models.Model):
+    """
+    Token bucket of one rate-limited client (see rate_limit.py). Kept in the
+    database so every worker process draws from the same bucket.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Rate Limit Bucket"
+        verbose_name_plural = "Rate Limit Buckets"
+        indexes = [
+            models.Index(fields=['updated_at'], name='ratelimit_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.tokens:.2f})"
@@ -0,0 +1,188 @@
+"""
+Database-backed email outbox.
+
+Requests never talk to an SMTP server: they add an OutboxEmail row in the
+same transaction as whatever caused it, and the ``send_outbox`` worker sends
+it. The worker claims a batch of due messages with SELECT ... FOR UPDATE
+SKIP LOCKED and holds the row locks while sending, so concurrent workers
+never pick the same message and the batch of a worker that dies is simply
+claimed again. One authenticated SMTP connection, built from the ContactInfo
+smtp_* settings, is reused for the whole batch. Failed messages are retried
+with exponential backoff until MAX_ATTEMPTS.
+
+Host, port, TLS and timeout come from the EMAIL_* settings, so the worker
+can be pointed at a local SMTP stand-in (e.g. ``python -m aiosmtpd -n``).
+"""
+import random
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .contact_content import get_contact_content
+from .models import OutboxEmail
+
+
+OUTBOX_BATCH_SIZE = 50
+MAX_ATTEMPTS = 8
+
+# Retry delays double from BACKOFF_BASE up to BACKOFF_MAX seconds
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60 * 6
+
+FALLBACK_RECIPIENT = 'admin@domainfinder.com'
+
+BatchResult = namedtuple('BatchResult', ['claimed', 'sent', 'retried', 'failed'])
+QueueDepth = namedtuple('QueueDepth', ['pending', 'due', 'failed', 'oldest_pending'])
+
+
+def enqueue(subject, body, to=(), reply_to=(), submission=None):
+    """Queue an email; an empty ``to`` sends it to the site inbox."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=list(to),
+        reply_to=list(reply_to),
+        submission=submission,
+    )
+
+
+def enqueue_contact_notification(submission):
+    """Queue the site-inbox notification for a contact form submission."""
+    # Submissions accepted while reCAPTCHA was unavailable are flagged
+    flag = '[Unverified] ' if submission.captcha_status == submission.CAPTCHA_UNVERIFIED else ''
+    # A line break in a header is rejected when sending
+    name = ' '.join(submission.name.split())
+    return enqueue(
+        subject=f'{flag}New Contact Form Submission from {name}',
+        body=(
+            "New contact form submission:\n"
+            "\n"
+            f"Name: {submission.name}\n"
+            f"Email: {submission.email}\n"
+            f"Message: {submission.message}\n"
+            "\n"
+            f"Submitted at: {submission.submitted_at}\n"
+        ),
+        reply_to=[submission.email],
+        submission=submission,
+    )
+
+
+def mail_settings():
+    """``(connection, from address, site inbox)`` from the active ContactInfo."""
+    contact_info = get_contact_content().contact_info
+    if contact_info and contact_info.smtp_email and contact_info.smtp_password:
+        # The smtp_email serves as both sender and recipient
+        connection = get_connection(
+            backend='django.core.mail.backends.smtp.EmailBackend',
+            host=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=contact_info.smtp_email,
+            password=contact_info.smtp_password,
+            use_tls=settings.EMAIL_USE_TLS,
+            timeout=settings.EMAIL_TIMEOUT,
+        )
+        return connection, f'Domain Finder <{contact_info.smtp_email}>', contact_info.smtp_email
+    # Default backend (console in development)
+    return get_connection(), settings.DEFAULT_FROM_EMAIL, FALLBACK_RECIPIENT
+
+
+def backoff(attempts):
+    """Delay before retrying a message that has failed ``attempts`` times."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+    # Jitter spreads out retries of messages that failed together
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutboxEmail.STATUS_FAILED
+        return False
+    email.next_attempt_at = now + backoff(email.attempts)
+    return True
+
+
+def send_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """Claim and send up to ``batch_size`` due messages; returns a BatchResult."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not emails:
+            return BatchResult(0, 0, 0, 0)
+
+        sent = retried = failed = 0
+        connection, from_email, site_inbox = mail_settings()
+        try:
+            connection.open()
+        except OSError as e:
+            # smtplib errors and timeouts are OSErrors
+            for email in emails:
+                if _record_failure(email, e, now):
+                    retried += 1
+                else:
+                    failed += 1
+        else:
+            try:
+                for email in emails:
+                    try:
+                        EmailMessage(
+                            subject=email.subject,
+                            body=email.body,
+                            from_email=from_email,
+                            to=email.to or [site_inbox],
+                            reply_to=email.reply_to or None,
+                            connection=connection,
+                        ).send()
+                    except Exception as e:
+                        # Anything else (e.g. BadHeaderError) is a problem with this
+                        # message alone; it must not roll back the whole batch
+                        if isinstance(e, OSError):
+                            # Drop a possibly broken connection; the next send reopens it
+                            connection.close()
+                        if _record_failure(email, e, now):
+                            retried += 1
+                        else:
+                            failed += 1
+                    else:
+                        email.attempts += 1
+                        email.status = OutboxEmail.STATUS_SENT
+                        email.sent_at = timezone.now()
+                        email.last_error = ''
+                        sent += 1
+            finally:
+                connection.close()
+
+        OutboxEmail.objects.bulk_update(
+            emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+    return BatchResult(len(emails), sent, retried, failed)
+
+
+def queue_depth():
+    """Pending (and due) message counts, dead letters and the oldest pending message."""
+    now = timezone.now()
+    return QueueDepth(**OutboxEmail.objects.exclude(status=OutboxEmail.STATUS_SENT).aggregate(
+        pending=Count('id', filter=Q(status=OutboxEmail.STATUS_PENDING)),
+        due=Count('id', filter=Q(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)),
+        failed=Count('id', filter=Q(status=OutboxEmail.STATUS_FAILED)),
+        oldest_pending=Min('created_at', filter=Q(status=OutboxEmail.STATUS_PENDING)),
+    ))
+
+
+def purge_sent(days):
+    """Delete messages sent more than ``days`` days ago."""
+    deleted, _ = OutboxEmail.objects.filter(
+        status=OutboxEmail.STATUS_SENT, sent_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
@@ -0,0 +1,230 @@
+"""
+Full-page cache for anonymous visitors.
+
+Views marked with ``@page_cached(*scopes)`` have their anonymous GET
+responses stored whole by PageCacheMiddleware. The cache key combines the
+normalized URL (host, path and the query string with tracking parameters
+dropped and the rest sorted) with the current ContentVersion of every scope
+the page depends on. Saving a model in a scope bumps its version (see
+signals.py), which moves every page of the scope to new keys; superseded
+entries simply expire.
+
+Versions live in the database so that a bump reaches every process; each
+process re-reads them at most every VERSION_CHECK_INTERVAL seconds, and the
+process that made the change sees it immediately.
+
+Requests carrying a session, messages or read-your-writes cookie
+(logged-in users, staff, anyone with a pending flash message and clients
+that just wrote) bypass the cache, as do responses that set cookies or are
+not plain 200s. A page rendered from a read replica (see db_router.py) is
+not stored while a scope it depends on changed recently enough for the
+replica to miss the change. ``X-Page-Cache`` reports HIT, MISS or BYPASS.
+"""
+import hashlib
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from django.utils.cache import cc_delim_re
+
+from .db_router import is_pinned, max_staleness
+from .models import ContentVersion
+
+
+# Every page renders the header and footer (site), plus:
+SITE = 'site'          # HomePage, ContactInfo, ContactService, ExpectationItem
+BLOG = 'blog'          # BlogPost, BlogCategory, Author, related posts
+CATALOG = 'catalog'    # Domain, DomainStatus, Currency
+IMAGES = 'images'      # ImageAsset (responsive image markup)
+
+# Versioned keys never go stale; this only bounds how long superseded pages
+# linger in the cache
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+VERSION_CHECK_INTERVAL = 2
+
+# Query parameters that never change a page
+IGNORED_PARAMS = frozenset(['fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref'])
+
+HEADER = 'X-Page-Cache'
+
+_versions = {'checked_at': 0.0, 'values': {}, 'updated': {}}
+
+
+def page_cached(*scopes):
+    """Mark a view as cacheable for anonymous visitors, depending on ``scopes``."""
+    def decorator(view):
+        view.page_cache_scopes = (SITE, *scopes)
+        return view
+    return decorator
+
+
+# -- versions ----------------------------------------------------------------
+
+def current_versions():
+    """``{scope: version}``, re-read from the database every few seconds."""
+    now = time.monotonic()
+    if now - _versions['checked_at'] >= VERSION_CHECK_INTERVAL:
+        rows = list(ContentVersion.objects.values_list('scope', 'version', 'updated_at'))
+        _versions['values'] = {scope: version for scope, version, _ in rows}
+        _versions['updated'] = {scope: updated_at for scope, _, updated_at in rows}
+        _versions['checked_at'] = now
+    return _versions['values']
+
+
+def changed_since(scopes, moment):
+    """Whether any of ``scopes`` was bumped after ``moment``, as of the last version check."""
+    updated = _versions['updated']
+    return any(scope in updated and updated[scope] > moment for scope in scopes)
+
+
+def _bump(scopes):
+    ContentVersion.objects.bulk_create([ContentVersion(scope=scope) for scope in scopes], ignore_conflicts=True)
+    ContentVersion.objects.filter(scope__in=scopes).update(version=F('version') + 1, updated_at=timezone.now())
+    # Make this process see its own change at once
+    _versions['checked_at'] = 0.0
+
+
+def bump_versions(*scopes):
+    """Invalidate the cached pages of ``scopes`` once the transaction commits."""
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+# -- keys --------------------------------------------------------------------
+
+def normalized_query(query_dict):
+    """The query string with tracking parameters dropped and the rest sorted."""
+    params = sorted(
+        (key, value)
+        for key, values in query_dict.lists()
+        if key not in IGNORED_PARAMS and not key.startswith('utm_')
+        for value in values
+    )
+    return urlencode(params)
+
+
+def page_cache_key(request, scopes):
+    versions = current_versions()
+    version = ','.join(f"{scope}:{versions.get(scope, 0)}" for scope in scopes)
+    source = f"{request.get_host()}\n{request.path}\n{normalized_query(request.GET)}\n{version}"
+    return 'page:' + hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+# -- middleware --------------------------------------------------------------
+
+def _view_scopes(request):
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    return getattr(match.func, 'page_cache_scopes', None)
+
+
+def _is_anonymous(request):
+    return (
+        settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+        and not is_pinned(request)
+    )
+
+
+def _is_cacheable(response):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    cache_control = {
+        directive.split('=', 1)[0].strip().lower()
+        for directive in cc_delim_re.split(response.get('Cache-Control', ''))
+    }
+    return not cache_control & {'private', 'no-store', 'no-cache'}
+
+
+def _cache_scopes(request):
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return _view_scopes(request)
+
+
+def _bypass(response):
+    response[HEADER] = 'BYPASS'
+    return response
+
+
+def _lookup(request, scopes):
+    """``(key, cached response or None)``"""
+    key = page_cache_key(request, scopes)
+    cached = cache.get(key)
+    if cached is None:
+        return key, None
+    content, headers = cached
+    response = HttpResponse(content, headers=headers)
+    response[HEADER] = 'HIT'
+    return key, response
+
+
+def _replica_may_be_stale(request, scopes):
+    if not getattr(request, 'read_replica', None):
+        return False
+    return changed_since(scopes, timezone.now() - timedelta(seconds=max_staleness()))
+
+
+def _store(request, scopes, key, response):
+    if request.method == 'GET' and _is_cacheable(response) and not _replica_may_be_stale(request, scopes):
+        cache.set(key, (response.content, dict(response.headers)), PAGE_CACHE_TIMEOUT)
+        response[HEADER] = 'MISS'
+        return response
+    return _bypass(response)
+
+
+class PageCacheMiddleware:
+    """
+    Serve and store the full responses of ``@page_cached`` views.
+
+    Place it right after SecurityMiddleware so stored responses include the
+    headers of every middleware below it, session and CSRF cookies included.
+
+    Under ASGI it runs natively async, so requests to views that are not
+    cached (such as the async views) pass through without a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        scopes = _cache_scopes(request)
+        if scopes is None:
+            return self.get_response(request)
+        if not _is_anonymous(request):
+            return _bypass(self.get_response(request))
+
+        key, response = _lookup(request, scopes)
+        if response is not None:
+            return response
+        return _store(request, scopes, key, self.get_response(request))
+
+    async def __acall__(self, request):
+        scopes = _cache_scopes(request)
+        if scopes is None:
+            return await self.get_response(request)
+        if not _is_anonymous(request):
+            return _bypass(await self.get_response(request))
+
+        # Reading the content versions may query the database
+        key, response = await sync_to_async(_lookup)(request, scopes)
+        if response is not None:
+            return response
+        return _store(request, scopes, key, await self.get_response(request))
+
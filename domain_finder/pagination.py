@@ -0,0 +1,209 @@
+"""
+Keyset (cursor) pagination for the domains catalog.
+
+Each sort order is a tuple of fields that ends with ``id`` so the ordering is
+total. A cursor is an opaque, URL-safe token holding the sort key of the last
+row a client has seen; the next page is everything strictly after it. This
+avoids OFFSET scans and the per-page COUNT that offset pagination needs.
+"""
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from django.db.models.functions import Length
+from django.utils.dateparse import parse_datetime
+
+from .domain_cards import card_values
+from .models import Domain
+
+
+# Sort orders offered on the domains page. Every entry is backed by a matching
+# partial index on Domain (see Domain.Meta.indexes).
+DOMAIN_SORTS = {
+    'featured': ('-is_featured_on_homepage', '-created_at', '-id'),
+    'newest': ('-created_at', '-id'),
+    'price_asc': ('price', 'id'),
+    'price_desc': ('-price', '-id'),
+    'name_length': ('name_length', 'id'),
+}
+
+DOMAIN_SORT_LABELS = {
+    'featured': 'Featured',
+    'newest': 'Newest',
+    'price_asc': 'Price: Low to High',
+    'price_desc': 'Price: High to Low',
+    'name_length': 'Shortest Name',
+}
+
+DEFAULT_DOMAIN_SORT = 'featured'
+MAX_PAGE_SIZE = 48
+
+# Domain columns read alongside the card read model for each listing row
+LISTING_FIELDS = ('id', 'name', 'description', 'price', 'listing_url', 'direct_to_contact')
+
+
+def _parse_bool(value):
+    if not isinstance(value, bool):
+        raise ValueError("Expected a boolean")
+    return value
+
+
+def parse_cursor_int(value):
+    """Read an integer back out of a decoded cursor; raises ValueError for anything else."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("Expected an integer")
+    return value
+
+
+def parse_cursor_datetime(value):
+    """Read an ISO 8601 datetime back out of a decoded cursor; raises ValueError for anything else."""
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError("Expected an ISO 8601 datetime")
+    return parsed
+
+
+def _parse_decimal(value):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError("Expected a decimal")
+
+
+# How each sort field is read back out of a cursor.
+_FIELD_PARSERS = {
+    'is_featured_on_homepage': _parse_bool,
+    'created_at': parse_cursor_datetime,
+    'id': parse_cursor_int,
+    'price': _parse_decimal,
+    'name_length': parse_cursor_int,
+}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded for the requested sort."""
+
+
+def resolve_sort(sort):
+    """Return a known sort key, falling back to the default ordering."""
+    return sort if sort in DOMAIN_SORTS else DEFAULT_DOMAIN_SORT
+
+
+def available_domains(sort=DEFAULT_DOMAIN_SORT):
+    """Available domains in the given sort order, annotated for keyset use."""
+    queryset = Domain.objects.filter(is_available=True)
+    if sort == 'name_length':
+        queryset = queryset.annotate(name_length=Length('name'))
+    return queryset.order_by(*DOMAIN_SORTS[sort])
+
+
+def _value_to_json(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def listing_rows(sort=DEFAULT_DOMAIN_SORT):
+    """
+    Available domains as card dicts in the given sort order.
+
+    One indexed query joining DomainCard; each row carries the sort key
+    fields as well so a cursor can be built from it.
+    """
+    sort_fields = [field.lstrip('-') for field in DOMAIN_SORTS[sort]]
+    fields = list(LISTING_FIELDS) + [field for field in sort_fields if field not in LISTING_FIELDS]
+    return available_domains(sort).values(*fields, **card_values())
+
+
+def encode_token(payload):
+    """Serialize a JSON-compatible payload into an opaque URL-safe token."""
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token):
+    """Inverse of encode_token; raises InvalidCursor for garbage input."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        return json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+
+
+def encode_cursor(sort, row):
+    """Build the opaque cursor pointing just after listing ``row``."""
+    fields = [field.lstrip('-') for field in DOMAIN_SORTS[sort]]
+    return encode_token([sort] + [_value_to_json(row[field]) for field in fields])
+
+
+def decode_cursor(sort, token):
+    """Decode a cursor into the list of sort key values it points after."""
+    payload = decode_token(token)
+    fields = [field.lstrip('-') for field in DOMAIN_SORTS[sort]]
+    if not isinstance(payload, list) or len(payload) != len(fields) + 1 or payload[0] != sort:
+        raise InvalidCursor("Cursor does not match the requested sort")
+
+    try:
+        return [_FIELD_PARSERS[field](value) for field, value in zip(fields, payload[1:])]
+    except ValueError as e:
+        raise InvalidCursor(str(e))
+
+
+def _after(sort, values):
+    """
+    Q object selecting rows strictly after ``values`` in the given ordering.
+
+    Expands the row comparison (a, b, c) > (x, y, z) into
+    a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z), honouring the
+    direction of each field.
+    """
+    condition = Q()
+    equal_prefix = Q()
+    for field, value in zip(DOMAIN_SORTS[sort], values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+        equal_prefix &= Q(**{name: value})
+    return condition
+
+
+def _page_query(sort, cursor, limit, filters):
+    """``(sort, limit, queryset)`` for one page, with one extra row to detect the next page."""
+    sort = resolve_sort(sort)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    queryset = listing_rows(sort)
+    if filters:
+        queryset = queryset.filter(filters)
+    if cursor:
+        queryset = queryset.filter(_after(sort, decode_cursor(sort, cursor)))
+    return sort, limit, queryset[:limit + 1]
+
+
+def _page(sort, limit, domains):
+    next_cursor = None
+    if len(domains) > limit:
+        domains = domains[:limit]
+        next_cursor = encode_cursor(sort, domains[-1])
+    return domains, next_cursor
+
+
+def paginate_domains(sort=DEFAULT_DOMAIN_SORT, cursor=None, limit=6, filters=None):
+    """
+    Return ``(rows, next_cursor)`` for one page of available domain cards.
+
+    ``filters`` is an optional Q object (see facets.filters_q).
+    ``next_cursor`` is ``None`` on the last page. One extra row is fetched to
+    detect whether another page exists, so no COUNT query is needed.
+    """
+    sort, limit, queryset = _page_query(sort, cursor, limit, filters)
+    return _page(sort, limit, list(queryset))
+
+
+async def apaginate_domains(sort=DEFAULT_DOMAIN_SORT, cursor=None, limit=6, filters=None):
+    """Async version of paginate_domains, for async views."""
+    sort, limit, queryset = _page_query(sort, cursor, limit, filters)
+    return _page(sort, limit, [row async for row in queryset])
@@ -0,0 +1,171 @@
+"""
+Shared token-bucket rate limiting.
+
+Buckets live in the RateLimitBucket table, so every worker process draws
+from the same ones. Taking a token is a single INSERT ... ON CONFLICT DO
+UPDATE that refills the bucket for the time elapsed since its last use and
+consumes a token only when one is available, so concurrent requests cannot
+race past the limit. A ``capacity/seconds`` bucket lets a client burst
+``capacity`` requests and then sustain ``capacity`` per ``seconds``: a
+sliding window without per-request bookkeeping.
+
+Limits are configured per endpoint in settings.RATE_LIMITS as
+``{endpoint: {key kind: 'capacity/seconds'}}``. Key kinds are ``ip`` (the
+client address, see CLIENT_IP_HEADER) and ``email`` (the ``email`` field of
+a JSON body). ``@rate_limited(endpoint)`` answers 429 with Retry-After
+before the view parses its form or verifies a captcha.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+from collections import namedtuple
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+
+from .models import RateLimitBucket
+
+
+Limit = namedtuple('Limit', ['capacity', 'period'])
+
+# Share of checks that also delete idle buckets; a bucket idle for longer
+# than its period is full, which is the same as having no row
+PRUNE_PROBABILITY = 0.001
+
+_TABLE = RateLimitBucket._meta.db_table
+
+# Refill, then take a token only if a whole one is available. A denied take
+# updates nothing and returns no row.
+_TAKE_SQL = f"""
+    INSERT INTO {_TABLE} AS bucket (key, tokens, updated_at)
+    VALUES (%(key)s, %(capacity)s - 1, clock_timestamp())
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = LEAST(
+            %(capacity)s,
+            bucket.tokens + EXTRACT(EPOCH FROM clock_timestamp() - bucket.updated_at) * %(rate)s
+        ) - 1,
+        updated_at = clock_timestamp()
+    WHERE LEAST(
+        %(capacity)s,
+        bucket.tokens + EXTRACT(EPOCH FROM clock_timestamp() - bucket.updated_at) * %(rate)s
+    ) >= 1
+    RETURNING tokens
+"""
+
+_TOKENS_SQL = f"""
+    SELECT LEAST(%(capacity)s, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * %(rate)s)
+    FROM {_TABLE} WHERE key = %(key)s
+"""
+
+
+def parse_limit(value):
+    """``'5/600'`` -> Limit(capacity=5, period=600.0)."""
+    capacity, period = value.split('/')
+    return Limit(int(capacity), float(period))
+
+
+def client_ip(request):
+    """The client address, from CLIENT_IP_HEADER when behind a proxy."""
+    if settings.CLIENT_IP_HEADER:
+        address = request.META.get(settings.CLIENT_IP_HEADER, '').strip()
+        if address:
+            return address
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def request_email(request):
+    """The normalized ``email`` field of a JSON request body, or ''."""
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return ''
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) else ''
+
+
+KEY_FUNCTIONS = {
+    'ip': client_ip,
+    'email': request_email,
+}
+
+
+def take(key, limit):
+    """Take a token from bucket ``key``; returns 0, or the seconds until one is available."""
+    params = {'key': key, 'capacity': limit.capacity, 'rate': limit.capacity / limit.period}
+    with connection.cursor() as cursor:
+        cursor.execute(_TAKE_SQL, params)
+        if cursor.fetchone() is not None:
+            return 0
+        cursor.execute(_TOKENS_SQL, params)
+        tokens = cursor.fetchone()[0]
+    return (1 - tokens) / params['rate']
+
+
+def prune_buckets(limits):
+    """Delete buckets idle for longer than the longest period in ``limits``."""
+    longest = max(limit.period for limit in limits)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {_TABLE} WHERE updated_at < clock_timestamp() - make_interval(secs => %s)",
+            [longest],
+        )
+        return cursor.rowcount
+
+
+def check(endpoint, request):
+    """Take a token from every bucket of ``endpoint``; returns 0 or the longest wait."""
+    limits = {kind: parse_limit(value) for kind, value in settings.RATE_LIMITS.get(endpoint, {}).items()}
+    if not limits:
+        return 0
+    if random.random() < PRUNE_PROBABILITY:
+        prune_buckets(limits.values())
+
+    for kind, limit in limits.items():
+        value = KEY_FUNCTIONS[kind](request)
+        if not value:
+            # Nothing to key on (e.g. no email); the view rejects such requests anyway
+            continue
+        key = hashlib.sha256(f"{endpoint}:{kind}:{value}".encode('utf-8')).hexdigest()
+        retry_after = take(key, limit)
+        if retry_after:
+            return retry_after
+    return 0
+
+
+def _too_many_requests(retry_after):
+    response = JsonResponse({
+        'success': False,
+        'message': 'Too many requests. Please try again later.'
+    }, status=429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def rate_limited(endpoint):
+    """
+    Answer 429 once a client exhausts any of the RATE_LIMITS buckets of
+    ``endpoint``. Works on sync and async views.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                retry_after = await sync_to_async(check)(endpoint, request)
+                if retry_after:
+                    return _too_many_requests(retry_after)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            retry_after = check(endpoint, request)
+            if retry_after:
+                return _too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
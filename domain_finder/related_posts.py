@@ -0,0 +1,179 @@
+"""
+Precomputed related blog posts.
+
+Every published post is turned into a sparse TF-IDF vector over its title,
+excerpt and content (title and excerpt terms count extra), truncated to its
+strongest terms and L2-normalized. Cosine similarity is then a dot product
+of sparse vectors, accumulated through an inverted index so only posts that
+share terms are ever compared. The top RELATED_POSTS_STORED neighbours of
+each post are stored in RelatedPost, and blog_detail reads them in one
+indexed query.
+
+Runs are incremental: a post is recomputed when its text changed (tracked by
+BlogPost.related_hash), when one of its stored neighbours changed or was
+unpublished, or when a changed post now scores above its weakest stored
+neighbour. Document frequencies drift as posts are added; a periodic full
+run (``compute_related_posts --full``) absorbs that.
+"""
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Min
+
+from . import page_cache
+from .blog_listing import DEFERRED_FIELDS
+from .models import BlogPost, RelatedPost
+
+
+RELATED_POSTS_STORED = 6
+RELATED_POSTS_SHOWN = 2
+
+# Strongest terms kept per post; bounds the cost of every comparison
+MAX_TERMS_PER_POST = 64
+
+# Term frequency multipliers per field
+FIELD_WEIGHTS = (('title', 3), ('excerpt', 2), ('content', 1))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOP_WORDS = frozenset("""
+a about after all also an and any are as at be because been but by can could
+do does for from had has have how i if in into is it its just may more most
+my no not of on one only or other our out over so some such than that the
+their them then there these they this to up us use was we were what when
+which while who will with would you your
+""".split())
+
+RefreshResult = namedtuple('RefreshResult', ['posts', 'recomputed', 'removed'])
+
+
+def related_source_hash(title, excerpt, content):
+    return hashlib.sha256(f"{title}\n{excerpt}\n{content}".encode('utf-8')).hexdigest()
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+
+def _term_counts(post):
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for token in tokenize(post[field]):
+            counts[token] += weight
+    return counts
+
+
+def build_vectors(posts):
+    """
+    Return ``{post id: {term: weight}}`` for ``posts`` (dicts with id, title,
+    excerpt and content).
+    """
+    counts = {post['id']: _term_counts(post) for post in posts}
+    document_frequency = Counter()
+    for terms in counts.values():
+        document_frequency.update(terms.keys())
+
+    total = len(counts)
+    vectors = {}
+    for post_id, terms in counts.items():
+        weights = {
+            term: (1 + math.log(count)) * (math.log((1 + total) / (1 + document_frequency[term])) + 1)
+            for term, count in terms.items()
+        }
+        strongest = heapq.nlargest(MAX_TERMS_PER_POST, weights.items(), key=lambda item: item[1])
+        norm = math.sqrt(sum(weight * weight for term, weight in strongest)) or 1.0
+        vectors[post_id] = {term: weight / norm for term, weight in strongest}
+    return vectors
+
+
+def _inverted_index(vectors):
+    postings = defaultdict(list)
+    for post_id, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((post_id, weight))
+    return postings
+
+
+def similarities(post_id, vectors, postings):
+    """Cosine similarity of ``post_id`` to every post sharing a term with it."""
+    scores = defaultdict(float)
+    for term, weight in vectors[post_id].items():
+        for other_id, other_weight in postings[term]:
+            if other_id != post_id:
+                scores[other_id] += weight * other_weight
+    return scores
+
+
+def _top_neighbours(scores):
+    # Ties go to the newer (higher id) post
+    return heapq.nlargest(RELATED_POSTS_STORED, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+def refresh_related_posts(full=False):
+    """
+    Bring RelatedPost up to date with the published posts.
+
+    Returns a RefreshResult with the number of published posts, of posts
+    whose neighbours were recomputed and of unpublished posts dropped.
+    """
+    posts = list(
+        BlogPost.objects.filter(is_published=True).values('id', 'title', 'excerpt', 'content', 'related_hash')
+    )
+    hashes = {post['id']: related_source_hash(post['title'], post['excerpt'], post['content']) for post in posts}
+    changed = {post['id'] for post in posts if full or post['related_hash'] != hashes[post['id']]}
+
+    stored = defaultdict(list)
+    for post_id, related_id in RelatedPost.objects.values_list('post_id', 'related_id'):
+        stored[post_id].append(related_id)
+    removed = set(stored) - set(hashes)
+    removed.update(related_id for related in stored.values() for related_id in related if related_id not in hashes)
+
+    vectors = build_vectors(posts)
+    postings = _inverted_index(vectors)
+
+    # Posts whose stored lists may no longer be right
+    affected = set(changed)
+    stale_neighbours = changed | removed
+    affected.update(
+        post_id for post_id, related in stored.items()
+        if post_id in hashes and stale_neighbours.intersection(related)
+    )
+    if changed and not full:
+        weakest = dict(
+            RelatedPost.objects.values('post_id').annotate(weakest=Min('score')).values_list('post_id', 'weakest')
+        )
+        for post_id in changed:
+            for other_id, score in similarities(post_id, vectors, postings).items():
+                if len(stored.get(other_id, ())) < RELATED_POSTS_STORED or score > weakest.get(other_id, 0):
+                    affected.add(other_id)
+
+    links = []
+    for post_id in affected:
+        for rank, (related_id, score) in enumerate(_top_neighbours(similarities(post_id, vectors, postings)), start=1):
+            links.append(RelatedPost(post_id=post_id, related_id=related_id, rank=rank, score=score))
+
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=affected | removed).delete()
+        RelatedPost.objects.bulk_create(links, batch_size=1000)
+        BlogPost.objects.bulk_update(
+            [BlogPost(pk=post_id, related_hash=hashes[post_id]) for post_id in changed],
+            ['related_hash'],
+            batch_size=500,
+        )
+    if affected or removed:
+        page_cache.bump_versions(page_cache.BLOG)
+    return RefreshResult(len(posts), len(affected), len(removed))
+
+
+def related_posts_for(post):
+    """Published related posts of ``post`` in similarity order, one query."""
+    return list(
+        BlogPost.objects.filter(related_from__post=post, is_published=True)
+        .select_related('author', 'category')
+        .defer(*DEFERRED_FIELDS)
+        .order_by('related_from__rank')[:RELATED_POSTS_SHOWN]
+    )
@@ -0,0 +1,97 @@
+"""
+Retention for contact submissions.
+
+Responded submissions older than RESPONDED_RETENTION_DAYS, and all
+submissions older than RETENTION_DAYS, are moved from the hot
+ContactSubmission table to ArchivedContactSubmission. Each batch is one
+statement: it locks up to ``batch_size`` of the oldest matching rows (SKIP
+LOCKED, so it never waits on a request or another archiver), detaches their
+outbox emails, deletes them and inserts them into the archive, all in a
+transaction that lasts only as long as that statement. Archived rows can be
+purged for good in batches as well.
+"""
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedContactSubmission, ContactSubmission, OutboxEmail
+
+
+RETENTION_DAYS = 365
+RESPONDED_RETENTION_DAYS = 30
+RETENTION_BATCH_SIZE = 500
+
+_COLUMNS = 'id, name, email, message, submitted_at, is_responded, captcha_status, captcha_score, duplicate_count, near_duplicate_of'
+
+_ARCHIVE_SQL = f"""
+    WITH batch AS (
+        SELECT id FROM {ContactSubmission._meta.db_table}
+        WHERE submitted_at < %(before)s OR (is_responded AND submitted_at < %(responded_before)s)
+        ORDER BY submitted_at
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    ), detached AS (
+        UPDATE {OutboxEmail._meta.db_table} SET submission_id = NULL
+        WHERE submission_id IN (SELECT id FROM batch)
+    ), moved AS (
+        DELETE FROM {ContactSubmission._meta.db_table}
+        WHERE id IN (SELECT id FROM batch)
+        RETURNING {_COLUMNS}
+    )
+    INSERT INTO {ArchivedContactSubmission._meta.db_table} ({_COLUMNS}, archived_at)
+    SELECT {_COLUMNS}, now() FROM moved
+"""
+
+_PURGE_SQL = f"""
+    DELETE FROM {ArchivedContactSubmission._meta.db_table}
+    WHERE id IN (
+        SELECT id FROM {ArchivedContactSubmission._meta.db_table}
+        WHERE submitted_at < %(before)s
+        LIMIT %(limit)s
+    )
+"""
+
+
+def _in_batches(sql, params, pause):
+    """Run ``sql`` until it affects no rows; returns the total row count."""
+    total = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            count = cursor.rowcount
+        total += count
+        if count < params['limit']:
+            return total
+        # Leave room for other writers between batches
+        if pause:
+            time.sleep(pause)
+
+
+def archive_submissions(days=RETENTION_DAYS, responded_days=RESPONDED_RETENTION_DAYS,
+                        batch_size=RETENTION_BATCH_SIZE, pause=0):
+    """Move expired submissions to the archive; returns how many moved."""
+    now = timezone.now()
+    params = {
+        'before': now - timedelta(days=days),
+        'responded_before': now - timedelta(days=responded_days),
+        'limit': batch_size,
+    }
+    return _in_batches(_ARCHIVE_SQL, params, pause)
+
+
+def purge_archive(days, batch_size=RETENTION_BATCH_SIZE, pause=0):
+    """Delete archived submissions made more than ``days`` days ago; returns how many."""
+    params = {'before': timezone.now() - timedelta(days=days), 'limit': batch_size}
+    return _in_batches(_PURGE_SQL, params, pause)
+
+
+def expired_count(days=RETENTION_DAYS, responded_days=RESPONDED_RETENTION_DAYS):
+    """How many submissions ``archive_submissions`` would move now."""
+    now = timezone.now()
+    return ContactSubmission.objects.filter(
+        Q(submitted_at__lt=now - timedelta(days=days))
+        | Q(is_responded=True, submitted_at__lt=now - timedelta(days=responded_days))
+    ).count()
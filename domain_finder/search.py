@@ -0,0 +1,86 @@
+"""
+Full-text and trigram search over the domain catalog.
+
+Words are matched against ``Domain.search_vector``, a weighted tsvector over
+name, description and features kept up to date by a database trigger and
+backed by a GIN index. Partial and misspelled names are matched with pg_trgm
+word similarity on ``Domain.name`` through a trigram GIN index. Results are
+ranked by the sum of both scores and paginated with a keyset cursor on
+(score, id).
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+from .domain_cards import card_values
+from .models import Domain
+from .pagination import LISTING_FIELDS, MAX_PAGE_SIZE, InvalidCursor, decode_token, encode_token
+
+
+SEARCH_CONFIG = 'english'
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 100
+
+
+def normalize_query(query):
+    """Collapse whitespace and bound the length of a user-supplied query."""
+    return ' '.join((query or '').split())[:MAX_QUERY_LENGTH]
+
+
+def search_rows(query):
+    """Ranked card rows for available domains matching ``query``."""
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    return (
+        Domain.objects.filter(is_available=True)
+        .filter(Q(search_vector=search_query) | Q(name__trigram_word_similar=query))
+        # Cast the real-valued rank to double precision so it survives the
+        # round trip through a cursor exactly
+        .annotate(score=Cast(
+            SearchRank(F('search_vector'), search_query) + TrigramWordSimilarity(query, 'name'),
+            FloatField(),
+        ))
+        .order_by('-score', '-id')
+        .values(*LISTING_FIELDS, 'score', **card_values())
+    )
+
+
+def _decode_search_cursor(query, token):
+    payload = decode_token(token)
+    if (
+        not isinstance(payload, list)
+        or len(payload) != 4
+        or payload[0] != 'search'
+        or payload[1] != query
+        or not isinstance(payload[2], (int, float))
+        or isinstance(payload[3], bool)
+        or not isinstance(payload[3], int)
+    ):
+        raise InvalidCursor("Cursor does not match the search query")
+    return float(payload[2]), payload[3]
+
+
+def search_domains(query, cursor=None, limit=6, filters=None):
+    """
+    Return ``(rows, next_cursor)`` for one page of search results.
+
+    ``filters`` is an optional Q object (see facets.filters_q). Queries
+    shorter than MIN_QUERY_LENGTH return no results.
+    """
+    query = normalize_query(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return [], None
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    queryset = search_rows(query)
+    if filters:
+        queryset = queryset.filter(filters)
+    if cursor:
+        score, last_id = _decode_search_cursor(query, cursor)
+        queryset = queryset.filter(Q(score__lt=score) | Q(score=score, id__lt=last_id))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_token(['search', query, rows[-1]['score'], rows[-1]['id']])
+    return rows, next_cursor
@@ -0,0 +1,121 @@
+"""
+Signal handlers that keep derived data in step with the catalog.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import catalog_stats, domain_cards, facets, image_derivatives, page_cache, snapshot
+from .models import (
+    Author, BlogCategory, BlogPost, ContactInfo, ContactService, Currency, Domain, DomainStatus, ExpectationItem,
+    HomePage,
+)
+
+
+@receiver(pre_save, sender=Domain)
+def capture_domain_state(sender, instance, raw=False, **kwargs):
+    """Remember what the domain looked like before this save."""
+    if raw:
+        return
+    instance._catalog_snapshot = catalog_stats.snapshot_domain(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Domain)
+def domain_saved(sender, instance, raw=False, **kwargs):
+    """Apply the saved domain to the catalog statistics."""
+    if raw:
+        return
+    catalog_stats.apply_domain_change(
+        getattr(instance, '_catalog_snapshot', None),
+        catalog_stats.snapshot_domain(instance.pk),
+    )
+    domain_cards.rebuild_domain_card(instance)
+    domain_id = instance.pk
+    transaction.on_commit(lambda: facets.apply_domain_change(domain_id))
+    transaction.on_commit(snapshot.rebuild_on_commit)
+
+
+@receiver(pre_delete, sender=Domain)
+def capture_deleted_domain(sender, instance, **kwargs):
+    """Remember the domain's state while its row still exists."""
+    instance._catalog_snapshot = catalog_stats.snapshot_domain(instance.pk)
+
+
+@receiver(post_delete, sender=Domain)
+def domain_deleted(sender, instance, **kwargs):
+    """Remove the deleted domain from the catalog statistics."""
+    catalog_stats.apply_domain_change(getattr(instance, '_catalog_snapshot', None), None)
+    domain_id = instance.pk
+    transaction.on_commit(lambda: facets.apply_domain_change(domain_id))
+    transaction.on_commit(snapshot.rebuild_on_commit)
+
+
+@receiver([post_save, post_delete], sender=Currency)
+@receiver([post_save, post_delete], sender=DomainStatus)
+def catalog_lookup_changed(sender, raw=False, **kwargs):
+    """Statistics are keyed by currency code and status slug, so rebuild them."""
+    if raw:
+        return
+    catalog_stats.rebuild_catalog_statistics()
+    transaction.on_commit(snapshot.rebuild_on_commit)
+
+
+@receiver(post_save, sender=Currency)
+def currency_saved(sender, instance, raw=False, **kwargs):
+    """Re-render prices of the cards priced in this currency."""
+    if raw:
+        return
+    domain_cards.rebuild_domain_cards(Domain.objects.filter(currency=instance))
+
+
+@receiver(post_save, sender=DomainStatus)
+def domain_status_saved(sender, instance, raw=False, **kwargs):
+    """Push the status name and badge class into its cards."""
+    if raw:
+        return
+    domain_cards.refresh_status_cards(instance)
+
+
+@receiver(post_save, sender=HomePage)
+@receiver(post_save, sender=BlogPost)
+@receiver(post_save, sender=Author)
+def image_owner_saved(sender, instance, raw=False, **kwargs):
+    """Derive responsive variants of the saved row's image once it commits."""
+    if raw:
+        return
+    if sender is HomePage:
+        source = instance.hero_image.name if instance.hero_image else ''
+    elif sender is BlogPost:
+        source = instance.image_url
+    else:
+        source = instance.avatar
+    if source:
+        transaction.on_commit(lambda: image_derivatives.process_in_background([source]))
+
+
+PAGE_CACHE_SCOPES = {
+    HomePage: page_cache.SITE,
+    ContactInfo: page_cache.SITE,
+    ContactService: page_cache.SITE,
+    ExpectationItem: page_cache.SITE,
+    BlogPost: page_cache.BLOG,
+    BlogCategory: page_cache.BLOG,
+    Author: page_cache.BLOG,
+    Domain: page_cache.CATALOG,
+    DomainStatus: page_cache.CATALOG,
+    Currency: page_cache.CATALOG,
+}
+
+
+def content_changed(sender, raw=False, **kwargs):
+    """Move the cached pages showing this model to new keys."""
+    if raw:
+        return
+    # Connected after the handlers above, so this runs after the snapshot
+    # rebuild they schedule and no page is cached from the old snapshot
+    page_cache.bump_versions(PAGE_CACHE_SCOPES[sender])
+
+
+for model in PAGE_CACHE_SCOPES:
+    post_save.connect(content_changed, sender=model, dispatch_uid=f'page_cache_{model.__name__}_saved')
+    post_delete.connect(content_changed, sender=model, dispatch_uid=f'page_cache_{model.__name__}_deleted')
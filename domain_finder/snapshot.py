@@ -0,0 +1,406 @@
+"""
+Memory-mapped catalog snapshot shared by all workers.
+
+The available catalog (every DomainCard plus the Domain columns listing pages
+need) is compiled into one versioned binary file. Every worker maps it
+read-only, so unfiltered domain listings are served from shared page cache
+without touching the database or building model instances.
+
+File layout (little-endian)::
+
+    header      HEADER struct (magic, format, catalog version, counts, offsets)
+    sort names  sort_count x (string offset, length)
+    records     record_count x RECORD struct, fixed width
+    orders      sort_count x record_count uint32 record numbers, one run per
+                sort in the sort-name order
+    strings     UTF-8 string table, identical strings stored once
+
+The file is written to a temporary path and renamed over the old one, so a
+reader either sees the previous complete snapshot or the new one. Workers
+stat the path on each request and remap when the inode changes.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .catalog_stats import get_catalog_statistics
+from .domain_cards import card_values
+from .pagination import (
+    DOMAIN_SORTS, LISTING_FIELDS, MAX_PAGE_SIZE, available_domains, decode_cursor, encode_cursor, resolve_sort,
+)
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'DFCS'
+FORMAT_VERSION = 2
+
+# magic, format, catalog version (us since epoch), record count,
+# available count, sort count, price min/max (cents), records offset,
+# orders offset, strings offset, strings length
+HEADER = struct.Struct('<4sHqIIHqqQQQQ')
+
+# String reference: offset into the string table and byte length
+STRING_REF = struct.Struct('<II')
+
+# Text columns stored in the string table, in record order
+STRING_FIELDS = (
+    'name',
+    'description',
+    'listing_url',
+    'formatted_price',
+    'currency_symbol',
+    'display_status',
+    'status_badge_class',
+    'features_list',
+    'view_button_text',
+    'button_url',
+)
+
+# id, created_at (us since epoch), price (cents), name length, flags, card
+# updated_at (us since epoch), then a string reference per STRING_FIELDS entry
+RECORD = struct.Struct('<qqqHBq' + 'II' * len(STRING_FIELDS))
+
+FLAG_FEATURED = 1
+FLAG_EXTERNAL_LISTING = 2
+FLAG_CONTACT_BUTTON = 4
+FLAG_DIRECT_TO_CONTACT = 8
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Version information the facet index syncs against (see facets.FacetIndex.sync)
+SnapshotVersion = namedtuple('SnapshotVersion', ['updated_at', 'available_count'])
+
+
+def _to_micros(value):
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _to_cents(price):
+    return int(price * 100)
+
+
+def _from_cents(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def snapshot_path():
+    return settings.CATALOG_SNAPSHOT_PATH
+
+
+# -- building ----------------------------------------------------------------
+
+class _StringTable:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.refs = {}
+
+    def add(self, value):
+        ref = self.refs.get(value)
+        if ref is None:
+            encoded = value.encode('utf-8')
+            ref = (len(self.buffer), len(encoded))
+            self.buffer += encoded
+            self.refs[value] = ref
+        return ref
+
+
+def _sort_key(sort, values):
+    """Numeric key that increases along ``sort`` for a record's sort values."""
+    key = []
+    for field in DOMAIN_SORTS[sort]:
+        value = values[field.lstrip('-')]
+        key.append(-value if field.startswith('-') else value)
+    return tuple(key)
+
+
+def _record_sort_values(record):
+    return {
+        'id': record[0],
+        'created_at': record[1],
+        'price': record[2],
+        'name_length': record[3],
+        'is_featured_on_homepage': int(bool(record[4] & FLAG_FEATURED)),
+    }
+
+
+def _cursor_sort_values(sort, values):
+    """Convert decoded cursor values to the record's numeric representation."""
+    converted = {}
+    for field, value in zip(DOMAIN_SORTS[sort], values):
+        name = field.lstrip('-')
+        if name == 'created_at':
+            value = _to_micros(value)
+        elif name == 'price':
+            value = _to_cents(value)
+        elif name == 'is_featured_on_homepage':
+            value = int(value)
+        converted[name] = value
+    return converted
+
+
+def build_snapshot(path=None):
+    """
+    Compile the available catalog into a snapshot file and swap it in.
+
+    Reads inside one REPEATABLE READ transaction so the records, the header
+    statistics and the version all describe the same catalog state. Returns
+    the number of records written.
+    """
+    path = path or snapshot_path()
+    strings = _StringTable()
+    records = []
+
+    # The isolation level can only be set as the first statement of a new
+    # transaction; inside an existing one we read in its snapshot instead.
+    repeatable_read = connection.vendor == 'postgresql' and not connection.in_atomic_block
+    with transaction.atomic():
+        if repeatable_read:
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        stats = get_catalog_statistics()
+        rows = available_domains('name_length').order_by('id').values(
+            *LISTING_FIELDS, 'is_featured_on_homepage', 'created_at', 'name_length', **card_values()
+        )
+        for row in rows.iterator(chunk_size=2000):
+            flags = (
+                (FLAG_FEATURED if row['is_featured_on_homepage'] else 0)
+                | (FLAG_EXTERNAL_LISTING if row['has_external_listing'] else 0)
+                | (FLAG_CONTACT_BUTTON if row['should_show_contact_button'] else 0)
+                | (FLAG_DIRECT_TO_CONTACT if row['direct_to_contact'] else 0)
+            )
+            refs = []
+            for field in STRING_FIELDS:
+                value = row[field]
+                if field == 'features_list':
+                    value = json.dumps(value or [])
+                refs.extend(strings.add(value or ''))
+            records.append((
+                row['id'],
+                _to_micros(row['created_at']),
+                _to_cents(row['price']),
+                row['name_length'],
+                flags,
+                _to_micros(row['card_updated_at']),
+                *refs,
+            ))
+
+    orders = []
+    for sort in DOMAIN_SORTS:
+        orders.append(array('I', sorted(
+            range(len(records)),
+            key=lambda number: _sort_key(sort, _record_sort_values(records[number])),
+        )))
+
+    sort_refs = [strings.add(sort) for sort in DOMAIN_SORTS]
+    price_range = stats.price_range or (Decimal(0), Decimal(0))
+
+    records_offset = HEADER.size + STRING_REF.size * len(sort_refs)
+    orders_offset = records_offset + RECORD.size * len(records)
+    strings_offset = orders_offset + 4 * len(records) * len(orders)
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, _to_micros(stats.updated_at), len(records),
+                stats.available_count, len(sort_refs),
+                _to_cents(price_range[0]), _to_cents(price_range[1]),
+                records_offset, orders_offset, strings_offset, len(strings.buffer),
+            ))
+            for ref in sort_refs:
+                f.write(STRING_REF.pack(*ref))
+            for record in records:
+                f.write(RECORD.pack(*record))
+            for order in orders:
+                if sys.byteorder == 'big':
+                    order.byteswap()
+                f.write(order.tobytes())
+            f.write(strings.buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return len(records)
+
+
+def rebuild_if_stale():
+    """
+    Rebuild the snapshot unless it already matches the catalog version.
+
+    Several writes in one transaction each schedule a rebuild on commit; the
+    version check makes all but the first a single cheap query.
+    """
+    current = get_snapshot()
+    stats = get_catalog_statistics()
+    if current is not None and current.catalog_version == stats.updated_at:
+        return False
+    build_snapshot()
+    return True
+
+
+def rebuild_on_commit():
+    """on_commit hook: refresh the snapshot, never failing the admin's write."""
+    try:
+        rebuild_if_stale()
+    except Exception:
+        logger.exception("Catalog snapshot rebuild failed")
+
+
+# -- reading -----------------------------------------------------------------
+
+class SnapshotFormatError(ValueError):
+    """Raised when a file is not a readable catalog snapshot."""
+
+
+class CatalogSnapshot:
+    """Read-only view over a mapped snapshot file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_dev, stat.st_ino)
+            if stat.st_size < HEADER.size:
+                raise SnapshotFormatError("Snapshot file is truncated")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, format_version, version, self.record_count, self.available_count, sort_count,
+         price_min, price_max, self._records_offset, self._orders_offset,
+         self._strings_offset, strings_length) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise SnapshotFormatError("Unsupported snapshot format")
+        if self._strings_offset + strings_length > len(self._map):
+            raise SnapshotFormatError("Snapshot file is truncated")
+
+        self.catalog_version = _from_micros(version)
+        self.price_range = (_from_cents(price_min), _from_cents(price_max)) if self.record_count else None
+
+        self._orders = {}
+        for number in range(sort_count):
+            ref = STRING_REF.unpack_from(self._map, HEADER.size + number * STRING_REF.size)
+            start = self._orders_offset + number * self.record_count * 4
+            self._orders[self._string(*ref)] = (start, self.record_count)
+
+    def close(self):
+        self._map.close()
+
+    @property
+    def version(self):
+        return SnapshotVersion(self.catalog_version, self.available_count)
+
+    def _string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def _record(self, number):
+        return RECORD.unpack_from(self._map, self._records_offset + number * RECORD.size)
+
+    def _order_entry(self, sort, position):
+        start, count = self._orders[sort]
+        return struct.unpack_from('<I', self._map, start + position * 4)[0]
+
+    def _row(self, record):
+        row = {
+            'id': record[0],
+            'created_at': _from_micros(record[1]),
+            'price': _from_cents(record[2]),
+            'name_length': record[3],
+            'is_featured_on_homepage': bool(record[4] & FLAG_FEATURED),
+            'has_external_listing': bool(record[4] & FLAG_EXTERNAL_LISTING),
+            'should_show_contact_button': bool(record[4] & FLAG_CONTACT_BUTTON),
+            'direct_to_contact': bool(record[4] & FLAG_DIRECT_TO_CONTACT),
+            'card_updated_at': _from_micros(record[5]),
+        }
+        refs = record[6:]
+        for number, field in enumerate(STRING_FIELDS):
+            row[field] = self._string(refs[number * 2], refs[number * 2 + 1])
+        row['features_list'] = json.loads(row['features_list'])
+        return row
+
+    def _first_after(self, sort, key):
+        """Binary search the sort order for the first record after ``key``."""
+        low, high = 0, self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(self._order_entry(sort, middle))
+            if _sort_key(sort, _record_sort_values(record)) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def page(self, sort, cursor=None, limit=6):
+        """
+        Same contract as pagination.paginate_domains (without filters).
+
+        Cursors are interchangeable with the database-backed pagination.
+        """
+        sort = resolve_sort(sort)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        start = 0
+        if cursor:
+            values = _cursor_sort_values(sort, decode_cursor(sort, cursor))
+            start = self._first_after(sort, _sort_key(sort, values))
+
+        end = min(start + limit, self.record_count)
+        rows = [self._row(self._record(self._order_entry(sort, position))) for position in range(start, end)]
+        next_cursor = encode_cursor(sort, rows[-1]) if rows and end < self.record_count else None
+        return rows, next_cursor
+
+
+_lock = threading.Lock()
+_current = {'snapshot': None, 'identity': None}
+
+
+def get_snapshot():
+    """
+    Return the current snapshot, remapping if the file has been replaced.
+
+    Returns None when no readable snapshot exists; callers then fall back to
+    the database.
+    """
+    path = snapshot_path()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    identity = (stat.st_dev, stat.st_ino)
+    if _current['identity'] == identity:
+        return _current['snapshot']
+
+    with _lock:
+        if _current['identity'] != identity:
+            try:
+                snapshot = CatalogSnapshot(path)
+            except (OSError, SnapshotFormatError, struct.error) as e:
+                logger.warning("Ignoring unreadable catalog snapshot %s: %s", path, e)
+                return None
+            # The previous map is left for the garbage collector: a request
+            # in another thread may still be reading from it.
+            _current['snapshot'], _current['identity'] = snapshot, snapshot.identity
+    return _current['snapshot']
+
@@ -0,0 +1,195 @@
+"""
+RSS/Atom feeds and sitemaps for crawlers.
+
+Both are served through ``conditional_cached``: every request costs a
+small aggregate query or two that yield the content version (the newest
+``updated_at`` plus a row count), which becomes the ETag and Last-Modified
+of the response. Clients revalidating an unchanged document get a 304;
+otherwise the document is generated once per content version, path and
+page and served from the cache until the content changes again. Query
+parameters the view does not read are left out of the key, so made-up query
+strings cannot multiply the cached copies.
+
+The sitemap index shards each section at SITEMAP_LIMIT URLs per file
+(the limit of the sitemap protocol), with ``lastmod`` from ``updated_at``.
+"""
+import hashlib
+from functools import wraps
+
+from django.contrib.sitemaps import Sitemap
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, urlencode
+
+from .blog_listing import published_posts
+from .models import BlogPost, CatalogStatistics, HomePage
+
+
+FEED_ITEMS = 20
+
+SITEMAP_LIMIT = 50000
+
+# Generated documents are keyed by content version, so this only bounds how
+# long superseded versions linger in the cache
+CRAWLER_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Clients may reuse a document this long before revalidating
+CRAWLER_MAX_AGE = 60 * 10
+
+
+def blog_version():
+    """``(last modified, version)`` of the published blog posts."""
+    state = BlogPost.objects.aggregate(
+        last_modified=Max('updated_at'),
+        published=Count('id', filter=Q(is_published=True)),
+    )
+    last_modified = state['last_modified']
+    return last_modified, f"{last_modified.isoformat() if last_modified else ''}:{state['published']}"
+
+
+def site_version():
+    """``(last modified, version)`` of everything listed in the sitemaps."""
+    last_modified, version = blog_version()
+    for model in (CatalogStatistics, HomePage):
+        updated_at = model.objects.aggregate(updated_at=Max('updated_at'))['updated_at']
+        if updated_at:
+            version += f":{updated_at.isoformat()}"
+            last_modified = max(last_modified, updated_at) if last_modified else updated_at
+    return last_modified, version
+
+
+def conditional_cached(version_func, params=None):
+    """
+    Serve a GET view with ETag/Last-Modified from ``version_func`` and cache
+    its body per content version and path.
+
+    ``params`` maps the query parameters the view reads to functions that
+    normalize their values (e.g. ``{'p': int}``); other parameters are
+    ignored. A value they reject is left to the view, uncached.
+    """
+    params = params or {}
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                query = urlencode(sorted(
+                    (name, clean(request.GET[name])) for name, clean in params.items() if name in request.GET
+                ))
+            except ValueError:
+                return view(request, *args, **kwargs)
+            last_modified, version = version_func()
+            digest = hashlib.sha256(f"{version}\n{request.path}\n{query}".encode('utf-8')).hexdigest()[:32]
+            etag = f'"{digest}"'
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                cache_key = f"crawler:{digest}"
+                document = cache.get(cache_key)
+                if document is None:
+                    response = view(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                    if hasattr(response, 'render'):
+                        response.render()
+                    document = (response.content, dict(response.headers))
+                    cache.set(cache_key, document, CRAWLER_CACHE_TIMEOUT)
+                response = HttpResponse(document[0], headers=document[1])
+
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_cache_control(response, public=True, max_age=CRAWLER_MAX_AGE)
+            return response
+        return wrapper
+    return decorator
+
+
+class LatestPostsFeed(Feed):
+    """RSS feed of the newest published blog posts."""
+    title = "Domain Finder Blog"
+    description = "Domain market research, trends and insights from Domain Finder."
+
+    def link(self):
+        return reverse('domain_finder:blog_list')
+
+    def items(self):
+        return published_posts().order_by('-created_at', '-id')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_author_name(self, item):
+        return item.author.name
+
+    def item_categories(self, item):
+        return [item.category.name]
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    """The same posts as an Atom feed."""
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class StaticViewSitemap(Sitemap):
+    """Fixed pages of the site."""
+    limit = SITEMAP_LIMIT
+    changefreq = 'weekly'
+
+    def items(self):
+        return [
+            'domain_finder:home',
+            'domain_finder:domains',
+            'domain_finder:blog_list',
+            'domain_finder:contact',
+            'domain_finder:privacy',
+            'domain_finder:terms_uk',
+            'domain_finder:complaints_appeals',
+        ]
+
+    def location(self, item):
+        return reverse(item)
+
+    def lastmod(self, item):
+        if item == 'domain_finder:domains':
+            return CatalogStatistics.objects.values_list('updated_at', flat=True).first()
+        if item == 'domain_finder:blog_list':
+            return BlogPost.objects.filter(is_published=True).aggregate(updated_at=Max('updated_at'))['updated_at']
+        return None
+
+
+class BlogPostSitemap(Sitemap):
+    """Published blog posts, sharded at SITEMAP_LIMIT per file."""
+    limit = SITEMAP_LIMIT
+    changefreq = 'monthly'
+
+    def items(self):
+        return BlogPost.objects.filter(is_published=True).only('id', 'updated_at').order_by('id')
+
+    def lastmod(self, item):
+        return item.updated_at
+
+    def get_latest_lastmod(self):
+        return self.items().aggregate(updated_at=Max('updated_at'))['updated_at']
+
+
+SITEMAPS = {
+    'pages': StaticViewSitemap,
+    'blog': BlogPostSitemap,
+}
@@ -0,0 +1,23 @@
+"""
+Template tags for responsive images (see image_derivatives.py).
+"""
+from django import template
+
+from ..image_derivatives import picture_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(source, alt='', sizes='100vw', **attrs):
+    """
+    Render ``source`` as a <picture> with AVIF/WebP/JPEG srcsets.
+
+    Extra keyword arguments (class, loading, onerror, ...) become attributes
+    of the <img>; images are lazy-loaded unless ``loading`` says otherwise.
+
+        {% responsive_image post.image_url post.title sizes="50vw" class="w-full" %}
+    """
+    if not source:
+        return ''
+    return picture_html(source.strip(), alt, sizes, attrs)
@@ -0,0 +1,205 @@
+"""
+Tests for reCAPTCHA verification against a local stub verifier.
+
+The stub answers according to the token it is sent, like the benchmark's
+serve_verifier: ``pass`` verifies, ``slow`` verifies only after the verify
+timeout has passed and any other token is rejected. No database is
+needed: ``python manage.py test domain_finder``.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, override_settings
+
+from domain_finder import captcha
+from domain_finder.forms import ContactForm
+
+
+VERIFY_TIMEOUT = 0.2
+
+ANSWERS = {
+    'pass': {'success': True, 'action': 'submit', 'score': 0.9},
+    'slow': {'success': True, 'action': 'submit', 'score': 0.9},
+}
+REJECTED = {'success': False, 'error-codes': ['invalid-input-response']}
+
+
+class StubVerifier(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        token = parse_qs(body.decode('utf-8'))['response'][0]
+        self.server.tokens.append(token)
+        if token == 'slow':
+            time.sleep(VERIFY_TIMEOUT * 3)
+        answer = json.dumps(ANSWERS.get(token, REJECTED)).encode('utf-8')
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(answer)))
+            self.end_headers()
+            self.wfile.write(answer)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting for a slow answer
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CaptchaTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubVerifier)
+        cls.server.daemon_threads = True
+        cls.server.tokens = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.verify_url = f'http://127.0.0.1:{cls.server.server_address[1]}/siteverify'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.tokens.clear()
+        settings_override = override_settings(
+            RECAPTCHA_VERIFY_URL=self.verify_url,
+            RECAPTCHA_VERIFY_TIMEOUT=VERIFY_TIMEOUT,
+            RECAPTCHA_SLOW_SECONDS=VERIFY_TIMEOUT,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        breaker = mock.patch.object(captcha, 'breaker', captcha.CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        breaker.start()
+        self.addCleanup(breaker.stop)
+        # Connections are kept per thread and carry the timeout they were made with
+        captcha._drop_connection()
+        self.addCleanup(captcha._drop_connection)
+        captcha.metrics.reset()
+        logging_off = mock.patch.object(captcha.logger, 'disabled', True)
+        logging_off.start()
+        self.addCleanup(logging_off.stop)
+
+    def field(self):
+        return ContactForm().fields['captcha']
+
+
+class VerifyTests(CaptchaTestCase):
+    def test_success(self):
+        verification = captcha.verify('pass', expected_action='submit', required_score=0.5)
+        self.assertEqual(verification.status, captcha.VERIFIED)
+        self.assertEqual(verification.score, 0.9)
+        self.assertEqual(captcha.breaker.state, 'closed')
+        self.assertEqual(captcha.metrics.snapshot()['outcomes'], {'success': 1})
+
+    def test_keep_alive_connection_is_reused(self):
+        captcha.verify('pass')
+        connection = captcha._local.connection
+        captcha.verify('pass')
+        self.assertIs(captcha._local.connection, connection)
+        self.assertEqual(self.server.tokens, ['pass', 'pass'])
+
+    def test_reject(self):
+        verification = captcha.verify('fail')
+        self.assertEqual(verification.status, captcha.REJECTED)
+        self.assertEqual(verification.outcome, 'invalid')
+        # The verifier answered, so the breaker stays closed
+        self.assertEqual(captcha.breaker.state, 'closed')
+
+    def test_action_mismatch_and_low_score_are_rejected(self):
+        self.assertEqual(captcha.verify('pass', expected_action='login').outcome, 'action_mismatch')
+        self.assertEqual(captcha.verify('pass', required_score=0.95).outcome, 'low_score')
+
+    def test_timeouts_open_the_breaker(self):
+        first = captcha.verify('slow')
+        self.assertEqual((first.status, first.outcome), (captcha.UNAVAILABLE, 'timeout'))
+        self.assertEqual(captcha.breaker.state, 'closed')
+        captcha.verify('slow')
+        self.assertEqual(captcha.breaker.state, 'open')
+
+        skipped = captcha.verify('pass')
+        self.assertEqual((skipped.status, skipped.outcome), (captcha.UNAVAILABLE, 'breaker_open'))
+        self.assertEqual(self.server.tokens, ['slow', 'slow'])
+        self.assertEqual(captcha.metrics.snapshot()['outcomes'], {'timeout': 2, 'breaker_open': 1})
+
+    def test_half_open_breaker_closes_after_a_successful_trial(self):
+        captcha.verify('slow')
+        captcha.verify('slow')
+        captcha.breaker.reset_timeout = 0
+        self.assertEqual(captcha.breaker.state, 'half-open')
+        self.assertEqual(captcha.verify('pass').status, captcha.VERIFIED)
+        self.assertEqual(captcha.breaker.state, 'closed')
+
+    def test_averify(self):
+        verification = asyncio.run(captcha.averify('pass', expected_action='submit'))
+        self.assertEqual(verification.status, captcha.VERIFIED)
+        self.assertEqual(asyncio.run(captcha.averify('fail')).status, captcha.REJECTED)
+        self.assertEqual(asyncio.run(captcha.averify('slow')).outcome, 'timeout')
+
+
+class FallbackPolicyTests(CaptchaTestCase):
+    def open_breaker(self):
+        captcha.verify('slow')
+        captcha.verify('slow')
+        self.assertEqual(captcha.breaker.state, 'open')
+
+    def test_verified_token_is_accepted(self):
+        field = self.field()
+        self.assertEqual(field.clean('pass'), 'pass')
+        self.assertFalse(field.needs_review)
+        self.assertFalse(field.unverified)
+
+    def test_rejected_token_fails_under_every_policy(self):
+        for policy in captcha.FALLBACK_POLICIES:
+            with self.subTest(policy=policy), override_settings(RECAPTCHA_FALLBACK_POLICY=policy):
+                with self.assertRaises(ValidationError) as raised:
+                    self.field().clean('fail')
+                self.assertEqual(raised.exception.code, 'captcha_invalid')
+
+    @override_settings(RECAPTCHA_FALLBACK_POLICY=captcha.POLICY_REVIEW)
+    def test_review_policy_holds_unverified_submissions(self):
+        self.open_breaker()
+        field = self.field()
+        self.assertEqual(field.clean('pass'), 'pass')
+        self.assertTrue(field.needs_review)
+        self.assertTrue(field.unverified)
+
+    @override_settings(RECAPTCHA_FALLBACK_POLICY=captcha.POLICY_ACCEPT)
+    def test_accept_policy_flags_unverified_submissions(self):
+        self.open_breaker()
+        field = self.field()
+        self.assertEqual(field.clean('pass'), 'pass')
+        self.assertFalse(field.needs_review)
+        self.assertTrue(field.unverified)
+
+    @override_settings(RECAPTCHA_FALLBACK_POLICY=captcha.POLICY_REJECT)
+    def test_reject_policy_refuses_unverified_submissions(self):
+        self.open_breaker()
+        with self.assertRaises(ValidationError) as raised:
+            self.field().clean('pass')
+        self.assertEqual(raised.exception.code, 'captcha_error')
+
+    def test_validation_uses_the_apreverify_result(self):
+        field = self.field()
+        asyncio.run(field.apreverify('pass', None))
+        with mock.patch.object(captcha, 'verify', side_effect=AssertionError('verified twice')):
+            self.assertEqual(field.clean('pass'), 'pass')
+        self.assertEqual(self.server.tokens, ['pass'])
+
+    def test_apreverify_cleans_non_string_tokens(self):
+        field = self.field()
+        asyncio.run(field.apreverify(123, None))
+        self.assertEqual(self.server.tokens, ['123'])
+        with mock.patch.object(captcha, 'verify', side_effect=AssertionError('verified twice')):
+            with self.assertRaises(ValidationError):
+                field.clean(123)
@@ -1,22 +1,40 @@
 """
 URL configuration for the domain_finder app.
 """
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'domain_finder'
 
+# Native async versions of the I/O-bound endpoints when served over ASGI
+if settings.ASYNC_VIEWS:
+    load_more_domains = views.load_more_domains_async
+    contact_ajax = views.contact_ajax_async
+else:
+    load_more_domains = views.load_more_domains
+    contact_ajax = views.contact_ajax
+
 urlpatterns = [
     path('', views.home, name='home'),
     path('domains/', views.domains_view, name='domains'),
-    path('domains/load-more/', views.load_more_domains, name='load_more_domains'),
+    path('domains/load-more/', load_more_domains, name='load_more_domains'),
+    path('domains/search/', views.search_domains_view, name='search_domains'),
+    path('domains/facets/', views.domain_facets, name='domain_facets'),
     path('blog/', views.blog_list, name='blog_list'),
+    path('blog/load-more/', views.blog_load_more, name='blog_load_more'),
+    path('blog/search/', views.blog_search, name='blog_search'),
     path('blog/<int:post_id>/', views.blog_detail, name='blog_detail'),
     path('contact/', views.contact, name='contact'),
-    path('ajax/contact/', views.contact_ajax, name='contact_ajax'),
+    path('ajax/contact/', contact_ajax, name='contact_ajax'),
     # Test 404 page (works in development)
     path('test-404/', views.custom_404_view, name='test_404'),
     path('privacy/', views.privacy, name='privacy'),
     path('terms-uk/', views.terms_uk, name='terms_uk'),
     path('complaints-appeals/', views.complaints_appeals, name='complaints_appeals'),
+    path('feed/', views.blog_feed, name='blog_feed'),
+    path('feed/atom/', views.blog_atom_feed, name='blog_atom_feed'),
+    path('sitemap.xml', views.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>.xml', views.sitemap_section, name='sitemap_section'),
+    path('ops/db-pool/', views.db_pool_stats, name='db_pool_stats'),
 ]
\ No newline at end of file
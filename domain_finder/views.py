@@ -2,17 +2,44 @@
 Django views for the Domain Finder application.
 """
 import json
+import os
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.http import HttpResponseNotAllowed, JsonResponse, QueryDict
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt
+from django.views.static import serve
+from django.utils.cache import patch_cache_control
 from django.views.decorators.http import require_http_methods
-from django.core.mail import send_mail, get_connection
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.sitemaps import views as sitemap_views
 from django.conf import settings
-from django.db import models
-from .models import BlogPost, BlogCategory, ContactInfo, ContactService, Domain, DomainStatus, Currency, ExpectationItem
+from django.db import connections, transaction
+from .models import BlogPost, BlogCategory, ContactService, ContactSubmission, DomainStatus, Currency
 from .forms import ContactForm
+from .card_fragments import render_domain_cards
+from .contact_content import get_contact_content
+from .db_pool.base import pool_stats
+from .db_router import replica_reads, replica_status
+from . import dedup
+from .blog_listing import BLOG_PAGE_SIZE, featured_post, paginate_posts, published_posts
+from .blog_search import search_posts
+from .catalog_stats import get_catalog_statistics
+from .outbox import enqueue_contact_notification
+from .image_derivatives import DEFAULT_HERO_IMAGE, DERIVATIVES_DIR
+from .facets import FACET_PARAMS, filters_q, get_facet_index, parse_facet_filters
+from .related_posts import RELATED_POSTS_SHOWN, related_posts_for
+from .page_cache import BLOG, CATALOG, IMAGES, page_cached
+from .rate_limit import client_ip, rate_limited
+from .pagination import DOMAIN_SORT_LABELS, InvalidCursor, apaginate_domains, paginate_domains, resolve_sort
+from .search import normalize_query, search_domains
+from .snapshot import get_snapshot
+from .syndication import SITEMAPS, LatestPostsAtomFeed, LatestPostsFeed, blog_version, conditional_cached, site_version
 
+@page_cached(BLOG, CATALOG, IMAGES)
+@replica_reads
 def home(request):
     """Home page view."""
     from .models import HomePage
@@ -27,7 +54,7 @@ def home(request):
     hero_content = {
         'title': "Find the Perfect <span class='text-primary'>Domain</span> for Your Business",
         'subtitle': "Our expert market research helps you discover high-value domains that align with your brand and business goals. Make informed decisions with data-driven insights.",
-        'image': None
+        'image': DEFAULT_HERO_IMAGE
     }
     
     # Fallback statistics if no active homepage content exists
@@ -70,7 +97,8 @@ def home(request):
         hero_content = {
             'title': homepage_content.title,
             'subtitle': homepage_content.subtitle,
-            'image': homepage_content.hero_image.url if homepage_content.hero_image else None,
+            # Storage name, resolved to responsive variants by the template
+            'image': homepage_content.hero_image.name if homepage_content.hero_image else DEFAULT_HERO_IMAGE,
         }
         statistics = {
             'domains_analyzed': homepage_content.domains_analyzed,
@@ -104,6 +132,11 @@ def home(request):
             }
         }
     
+    # Use the live catalog size once there are domains to count
+    catalog = get_catalog_statistics()
+    if catalog.total_count:
+        statistics['domains_analyzed'] = f"{catalog.total_count:,}"
+    
     # Advanced Analytics section toggle (default False)
     show_advanced_analytics = False
     if homepage_content:
@@ -119,53 +152,117 @@ def home(request):
     }
     return render(request, 'domain_finder/home.html', context)
 
+@page_cached(BLOG, IMAGES)
+@replica_reads
 def blog_list(request):
     """Blog listing page view."""
     category_slug = request.GET.get('category')
+    query = normalize_query(request.GET.get('q'))
     
-    # Get all published posts
-    posts = BlogPost.objects.filter(is_published=True)
-    
-    # Filter by category if specified
-    if category_slug:
-        posts = posts.filter(category__slug=category_slug)
-    
-    # Get total count of posts (including featured)
-    total_posts_count = posts.count()
-    
-    # Get featured post (separate from main list)
-    featured_post = posts.filter(is_featured=True).first()
-    
-    # Get remaining posts (excluding featured if it exists)
-    if featured_post:
-        posts = posts.exclude(pk=featured_post.pk)
+    featured, posts, search_results = None, [], []
+    if query:
+        # Ranked search results replace the listing
+        search_results, next_cursor = search_posts(query)
+    else:
+        # Get featured post (separate from main list)
+        featured = featured_post(category_slug)
+        
+        # First page of the remaining posts; Load More follows the returned cursor
+        posts, next_cursor = paginate_posts(category_slug, exclude_pk=featured.pk if featured else None)
     
     # Get all categories for filter
     categories = BlogCategory.objects.all()
     
-    # Check if we should show "Load More" button (more than 7 total articles)
-    show_load_more = total_posts_count > 7
-    
     context = {
         'page_title': 'Domain Research Blog - Expert Insights & Trends',
-        'featured_post': featured_post,
+        'featured_post': featured,
         'posts': posts,
         'categories': categories,
         'current_category': category_slug,
-        'total_posts_count': total_posts_count,
-        'show_load_more': show_load_more,
+        'query': query,
+        'search_results': search_results,
+        'show_load_more': next_cursor is not None,
+        'next_cursor': next_cursor,
     }
     return render(request, 'domain_finder/blog_list.html', context)
 
+
+@require_http_methods(["GET"])
+def blog_load_more(request):
+    """AJAX endpoint for the next page of blog posts (JSON, or cards with format=html)"""
+    try:
+        category_slug = request.GET.get('category') or None
+        cursor = request.GET.get('cursor') or None
+        limit = int(request.GET.get('limit', BLOG_PAGE_SIZE))
+        
+        posts, next_cursor = paginate_posts(category_slug, cursor=cursor, limit=limit)
+        
+        data = {'success': True}
+        if request.GET.get('format') == 'html':
+            data['html'] = ''.join(
+                render_to_string('includes/blog_post_card.html', {'post': post}) for post in posts
+            )
+        else:
+            data['posts'] = [{
+                'id': post.pk,
+                'title': post.title,
+                'excerpt': post.excerpt,
+                'url': post.get_absolute_url(),
+                'image_url': post.image_url,
+                'category': post.category.name,
+                'author': post.author.name,
+                'read_time': post.display_read_time,
+                'date': post.formatted_date,
+            } for post in posts]
+        data['has_more'] = next_cursor is not None
+        data['next_cursor'] = next_cursor
+        return JsonResponse(data)
+        
+    except (InvalidCursor, ValueError, TypeError) as e:
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid parameters'
+        }, status=400)
+
+@require_http_methods(["GET"])
+def blog_search(request):
+    """AJAX endpoint for ranked blog search with highlighted snippets (JSON, or cards with format=html)"""
+    try:
+        query = request.GET.get('q', '')
+        cursor = request.GET.get('cursor') or None
+        limit = int(request.GET.get('limit', BLOG_PAGE_SIZE))
+        
+        results, next_cursor = search_posts(query, cursor=cursor, limit=limit)
+        
+        data = {'success': True, 'query': normalize_query(query)}
+        if request.GET.get('format') == 'html':
+            data['html'] = ''.join(
+                render_to_string('includes/blog_search_result.html', {'result': result}) for result in results
+            )
+        else:
+            data['results'] = results
+        data['has_more'] = next_cursor is not None
+        data['next_cursor'] = next_cursor
+        return JsonResponse(data)
+        
+    except (InvalidCursor, ValueError, TypeError) as e:
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid parameters'
+        }, status=400)
+
+@page_cached(BLOG, IMAGES)
 def blog_detail(request, post_id):
     """Blog post detail view."""
-    post = get_object_or_404(BlogPost, pk=post_id, is_published=True)
+    post = get_object_or_404(BlogPost.objects.defer('search_vector'), pk=post_id, is_published=True)
     
-    # Get related posts (same category, excluding current post)
-    related_posts = BlogPost.objects.filter(
-        category=post.category,
-        is_published=True
-    ).exclude(pk=post.pk)[:2]
+    # Precomputed TF-IDF neighbours (see related_posts); until the job has
+    # covered this post, fall back to the same category
+    related_posts = related_posts_for(post)
+    if not related_posts:
+        related_posts = published_posts().filter(
+            category=post.category
+        ).exclude(pk=post.pk).order_by('-created_at', '-id')[:RELATED_POSTS_SHOWN]
     
     context = {
         'page_title': f'{post.title} - Domain Finder Blog',
@@ -175,8 +272,7 @@ def blog_detail(request, post_id):
     return render(request, 'domain_finder/blog_detail.html', context)
 
 def contact(request):
-    contact_info = ContactInfo.objects.first()
-    expectation_items = ExpectationItem.objects.filter(is_active=True).order_by('order', 'title')
+    contact_content = get_contact_content()
     
     if request.method == 'POST':
         form = ContactForm(request.POST)
@@ -208,12 +304,14 @@ def contact(request):
         form = ContactForm()
     
     context = {
-        'contact_info': contact_info,
-        'expectation_items': expectation_items,
+        'contact_info': contact_content.contact_info,
+        'services': contact_content.services,
+        'expectation_items': contact_content.expectation_items,
         'form': form,
     }
     return render(request, 'domain_finder/contact.html', context)
 
+@page_cached()
 def privacy(request):
     """Privacy Policy page view."""
     context = {
@@ -221,86 +319,121 @@ def privacy(request):
     }
     return render(request, 'domain_finder/privacy.html', context)
 
+def _contact_success(replayed=False):
+    response = JsonResponse({
+        'success': True,
+        'message': 'Thank you for your message! We\'ll get back to you soon.'
+    })
+    if replayed:
+        response['Idempotent-Replayed'] = 'true'
+    return response
+
+def _save_contact_submission(form, fingerprint):
+    """
+    Save a validated contact form and queue its notification together; the
+    send_outbox worker delivers it outside the request. Returns False when
+    the submission turned out to repeat one saved meanwhile.
+    """
+    with transaction.atomic():
+        # Check again now that identical requests are serialized
+        dedup.lock(fingerprint)
+        if dedup.answer_duplicate(fingerprint):
+            return False
+        contact_submission = form.save(commit=False)
+        contact_submission.idempotency_key = fingerprint.idempotency_key
+        contact_submission.content_hash = fingerprint.content_hash
+        contact_submission.simhash = fingerprint.simhash
+        original = dedup.near_duplicate(fingerprint)
+        contact_submission.near_duplicate_of = original.pk if original else None
+        contact_submission.save()
+        # Submissions held for review are only notified once approved, and a
+        # reworded resend from the same address adds nothing to the inbox
+        resent = original is not None and original.email.lower() == contact_submission.email.lower()
+        if contact_submission.captcha_status != ContactSubmission.CAPTCHA_REVIEW and not resent:
+            enqueue_contact_notification(contact_submission)
+    return True
+
+def _contact_form_errors(form):
+    return JsonResponse({
+        'success': False,
+        'errors': form.errors
+    })
+
+def _contact_invalid_data():
+    return JsonResponse({
+        'success': False,
+        'message': 'Invalid data format.'
+    })
+
+def _contact_error():
+    return JsonResponse({
+        'success': False,
+        'message': 'An error occurred. Please try again.'
+    })
+
 @require_http_methods(["POST"])
+@rate_limited('contact')
 def contact_ajax(request):
     """AJAX contact form submission."""
     try:
         # Parse JSON data
         data = json.loads(request.body)
         
+        # Retries and repeats are answered from the first submission,
+        # before any form or captcha work
+        fingerprint = dedup.fingerprint(request.headers.get('Idempotency-Key'), data)
+        if dedup.answer_duplicate(fingerprint):
+            return _contact_success(replayed=True)
+        
         # Create form instance with data
         form = ContactForm(data)
         
         if form.is_valid():
-            # Save the contact submission
-            contact_submission = form.save()
-            
-            # Get SMTP settings from ContactInfo
-            contact_info = ContactInfo.get_active_contact_info()
-            
-            # Send email using dynamic SMTP settings if available
-            try:
-                # Check if SMTP settings are configured in ContactInfo
-                if contact_info and contact_info.smtp_email and contact_info.smtp_password:
-                    # Use Gmail SMTP with dynamic settings
-                    # The smtp_email serves as both sender and recipient
-                    connection = get_connection(
-                        backend='django.core.mail.backends.smtp.EmailBackend',
-                        host='smtp.gmail.com',
-                        port=587,
-                        username=contact_info.smtp_email,
-                        password=contact_info.smtp_password,
-                        use_tls=True,
-                    )
-                    from_email = f'Domain Finder <{contact_info.smtp_email}>'
-                    recipient_email = contact_info.smtp_email  # Send to the same email that's configured for SMTP
-                else:
-                    # Fall back to default Django email backend (console for development)
-                    connection = None
-                    from_email = settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@domainfinder.com'
-                    recipient_email = 'admin@domainfinder.com'  # Default fallback email
-                
-                send_mail(
-                    subject=f'New Contact Form Submission from {contact_submission.name}',
-                    message=f"""
-                    New contact form submission:
-                    
-                    Name: {contact_submission.name}
-                    Email: {contact_submission.email}
-                    Message: {contact_submission.message}
-                    
-                    Submitted at: {contact_submission.submitted_at}
-                    """,
-                    from_email=from_email,
-                    recipient_list=[recipient_email],
-                    fail_silently=False,
-                    connection=connection,
-                )
-            except Exception as e:
-                # Log the error but don't fail the form submission
-                print(f"Email sending failed: {e}")
-            
-            return JsonResponse({
-                'success': True,
-                'message': 'Thank you for your message! We\'ll get back to you soon.'
-            })
+            return _contact_success(replayed=not _save_contact_submission(form, fingerprint))
         else:
             # Return form errors
-            return JsonResponse({
-                'success': False,
-                'errors': form.errors
-            })
+            return _contact_form_errors(form)
             
     except json.JSONDecodeError:
-        return JsonResponse({
-            'success': False,
-            'message': 'Invalid data format.'
-        })
+        return _contact_invalid_data()
     except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'message': 'An error occurred. Please try again.'
-        })
+        return _contact_error()
+
+@rate_limited('contact')
+async def contact_ajax_async(request):
+    """
+    contact_ajax for ASGI deployments (settings.ASYNC_VIEWS): waits on the
+    database and the reCAPTCHA verifier without holding a thread.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        data = json.loads(request.body)
+        
+        fingerprint = dedup.fingerprint(request.headers.get('Idempotency-Key'), data)
+        if await dedup.aanswer_duplicate(fingerprint):
+            return _contact_success(replayed=True)
+        
+        form = ContactForm(data)
+        # Validation then uses this result instead of a blocking verification.
+        # Release the request's database connection while the verifier is
+        # awaited, or hundreds of waiting posts would exhaust the server's.
+        captcha = form.fields['captcha']
+        token = captcha.to_python(data.get('captcha')) if isinstance(data, dict) else None
+        if token:
+            await sync_to_async(connections.close_all)()
+            await captcha.apreverify(token, client_ip(request))
+        
+        if form.is_valid():
+            saved = await sync_to_async(_save_contact_submission)(form, fingerprint)
+            return _contact_success(replayed=not saved)
+        else:
+            return _contact_form_errors(form)
+            
+    except json.JSONDecodeError:
+        return _contact_invalid_data()
+    except Exception as e:
+        return _contact_error()
 
 
 def handler404(request, exception):
@@ -311,83 +444,202 @@ def handler404(request, exception):
     return render(request, '404.html', context, status=404)
 
 
+@page_cached(CATALOG)
+@replica_reads
 def domains_view(request):
     """Display the domains for sale page"""
-    # Get all available domains, ordered by featured status and creation date
-    all_domains = Domain.objects.filter(is_available=True).order_by('-is_featured_on_homepage', '-created_at')
+    sort = resolve_sort(request.GET.get('sort'))
+    query = normalize_query(request.GET.get('q'))
+    try:
+        selected, price_min, price_max = parse_facet_filters(request.GET)
+    except ValueError:
+        selected, price_min, price_max = {}, None, None
+    filters = filters_q(selected, price_min, price_max)
+    
+    # The shared catalog snapshot serves unfiltered listings and the header
+    # stats without a database round trip; fall back to the database without it
+    snapshot = get_snapshot()
+    catalog = snapshot.version if snapshot else get_catalog_statistics()
     
-    # Pagination - show first 6 domains
+    # Pagination - show first 6 domains, Load More follows the returned cursor
     domains_per_page = 6
-    initial_domains = all_domains[:domains_per_page]
-    has_more = all_domains.count() > domains_per_page
+    if query:
+        initial_domains, next_cursor = search_domains(query, limit=domains_per_page, filters=filters)
+    elif snapshot and not filters:
+        initial_domains, next_cursor = snapshot.page(sort, limit=domains_per_page)
+    else:
+        initial_domains, next_cursor = paginate_domains(sort, limit=domains_per_page, filters=filters)
+    has_more = next_cursor is not None
     
-    # Calculate some stats for the header section
-    domain_count = all_domains.count()
+    # Facet counts come from this worker's in-memory facet index
+    matching_count, facet_groups = get_facet_index(catalog).facet_counts(selected, price_min, price_max)
+    domain_count = catalog.available_count
     price_range = ""
-    if all_domains.exists():
-        min_price = all_domains.aggregate(models.Min('price'))['price__min']
-        max_price = all_domains.aggregate(models.Max('price'))['price__max'] 
+    catalog_price_range = snapshot.price_range if snapshot else catalog.price_range
+    if catalog_price_range:
+        min_price, max_price = catalog_price_range
         price_range = f"${min_price:,.0f} - ${max_price:,.0f}"
     
     context = {
         'page_title': 'Domains for Sale',
         'domains': initial_domains,
+        'domain_cards_html': render_domain_cards(initial_domains),
         'domain_count': domain_count,
         'price_range': price_range,
         'has_more': has_more,
+        'next_cursor': next_cursor,
+        'query': query,
+        'facets': facet_groups,
+        'matching_count': matching_count,
+        'is_filtered': bool(selected) or price_min is not None or price_max is not None,
+        'price_min': price_min,
+        'price_max': price_max,
+        'filter_query': _facet_query_string(request.GET),
+        'sort': sort,
+        'sort_options': DOMAIN_SORT_LABELS.items(),
         'domains_per_page': domains_per_page,
     }
     return render(request, 'domain_finder/domains.html', context)
 
 
+def _facet_query_string(params):
+    """Facet filter parameters of a request, re-encoded for Load More URLs."""
+    filter_params = QueryDict(mutable=True)
+    for key in FACET_PARAMS:
+        values = [value for value in params.getlist(key) if value]
+        if values:
+            filter_params.setlist(key, values)
+    return filter_params.urlencode()
+
+
+def _domain_card_json(domain):
+    """JSON payload for one domain card row (rows already hold the resolved card fields)."""
+    return {
+        'name': domain['name'],
+        'description': domain['description'],
+        'price': domain['price'],
+        'formatted_price': domain['formatted_price'],
+        'currency_symbol': domain['currency_symbol'],
+        'display_status': domain['display_status'],
+        'status_badge_class': domain['status_badge_class'],
+        'features_list': domain['features_list'],
+        'listing_url': domain['listing_url'],
+        'view_button_text': domain['view_button_text'],
+        'has_external_listing': domain['has_external_listing'],
+        'should_show_contact_button': domain['should_show_contact_button'],
+        'direct_to_contact': domain['direct_to_contact'],
+    }
+
+
+def _domain_page_response(request, domains, next_cursor, **extra):
+    """
+    JSON response for a page of domains.
+
+    ``format=html`` returns the pre-rendered, fragment-cached cards as one
+    HTML string instead of the card data.
+    """
+    data = {'success': True, **extra}
+    if request.GET.get('format') == 'html':
+        data['html'] = render_domain_cards(domains)
+    else:
+        data['domains'] = [_domain_card_json(domain) for domain in domains]
+    data['has_more'] = next_cursor is not None
+    data['next_cursor'] = next_cursor
+    return JsonResponse(data)
+
+
 @require_http_methods(["GET"])
+@replica_reads
 def load_more_domains(request):
-    """AJAX endpoint to load more domains"""
+    """AJAX endpoint to load more domains using an opaque keyset cursor"""
     try:
-        offset = int(request.GET.get('offset', 0))
+        sort = resolve_sort(request.GET.get('sort'))
+        cursor = request.GET.get('cursor') or None
         limit = int(request.GET.get('limit', 6))
+        filters = filters_q(*parse_facet_filters(request.GET))
+        
+        # Rows strictly after the cursor, no OFFSET scan and no COUNT
+        snapshot = get_snapshot() if not filters else None
+        if snapshot:
+            domains, next_cursor = snapshot.page(sort, cursor=cursor, limit=limit)
+        else:
+            domains, next_cursor = paginate_domains(sort, cursor=cursor, limit=limit, filters=filters)
         
-        # Get all available domains, ordered by featured status and creation date
-        all_domains = Domain.objects.filter(is_available=True).order_by('-is_featured_on_homepage', '-created_at')
+        return _domain_page_response(request, domains, next_cursor)
         
-        # Get the requested slice of domains
-        domains = all_domains[offset:offset + limit]
+    except (InvalidCursor, ValueError, TypeError) as e:
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid parameters'
+        }, status=400)
+
+
+@replica_reads
+async def load_more_domains_async(request):
+    """load_more_domains for ASGI deployments (settings.ASYNC_VIEWS)"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        sort = resolve_sort(request.GET.get('sort'))
+        cursor = request.GET.get('cursor') or None
+        limit = int(request.GET.get('limit', 6))
+        filters = filters_q(*parse_facet_filters(request.GET))
         
-        # Check if there are more domains after this batch
-        has_more = all_domains.count() > (offset + limit)
+        # The snapshot is a memory map; only the database fallback awaits
+        snapshot = get_snapshot() if not filters else None
+        if snapshot:
+            domains, next_cursor = snapshot.page(sort, cursor=cursor, limit=limit)
+        else:
+            domains, next_cursor = await apaginate_domains(sort, cursor=cursor, limit=limit, filters=filters)
         
-        # Convert domains to JSON-serializable format
-        domains_data = []
-        for domain in domains:
-            domains_data.append({
-                'name': domain.name,
-                'description': domain.description,
-                'price': domain.price,
-                'formatted_price': domain.formatted_price,
-                'currency_symbol': domain.currency.symbol if domain.currency else '$',
-                'display_status': domain.display_status,
-                'status_badge_class': domain.status_badge_class,
-                'features_list': domain.features_list,
-                'listing_url': domain.listing_url,
-                'view_button_text': domain.view_button_text,
-                'has_external_listing': domain.has_external_listing,
-                'should_show_contact_button': domain.should_show_contact_button,
-                'direct_to_contact': domain.direct_to_contact,
-            })
+        return _domain_page_response(request, domains, next_cursor)
         
+    except (InvalidCursor, ValueError, TypeError) as e:
         return JsonResponse({
-            'success': True,
-            'domains': domains_data,
-            'has_more': has_more,
-        })
+            'success': False,
+            'error': 'Invalid parameters'
+        }, status=400)
+
+
+@require_http_methods(["GET"])
+def search_domains_view(request):
+    """AJAX endpoint for ranked full-text and fuzzy name search over domains"""
+    try:
+        query = request.GET.get('q', '')
+        cursor = request.GET.get('cursor') or None
+        limit = int(request.GET.get('limit', 6))
+        filters = filters_q(*parse_facet_filters(request.GET))
         
-    except (ValueError, TypeError) as e:
+        domains, next_cursor = search_domains(query, cursor=cursor, limit=limit, filters=filters)
+        
+        return _domain_page_response(request, domains, next_cursor, query=normalize_query(query))
+        
+    except (InvalidCursor, ValueError, TypeError) as e:
         return JsonResponse({
             'success': False,
             'error': 'Invalid parameters'
         }, status=400)
 
 
+@require_http_methods(["GET"])
+def domain_facets(request):
+    """JSON facet API: live counts per facet value for the given filters"""
+    try:
+        selected, price_min, price_max = parse_facet_filters(request.GET)
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid parameters'
+        }, status=400)
+    
+    total, facet_groups = get_facet_index(get_catalog_statistics()).facet_counts(selected, price_min, price_max)
+    return JsonResponse({
+        'success': True,
+        'total': total,
+        'facets': facet_groups,
+    })
+
+
 def custom_404_view(request, exception=None):
     """Custom 404 page view that works even with DEBUG=True."""
     return render(request, '404.html', status=404)
@@ -397,9 +649,45 @@ def handler404(request, exception):
     """Custom 404 handler for production."""
     return render(request, '404.html', status=404)
 
+@page_cached()
 def terms_uk(request):
     return render(request, 'domain_finder/terms-uk.html')
 
+@page_cached()
 def complaints_appeals(request):
     return render(request, 'domain_finder/complaints-appeals.html')
 
+
+blog_feed = conditional_cached(blog_version)(LatestPostsFeed())
+blog_atom_feed = conditional_cached(blog_version)(LatestPostsAtomFeed())
+
+
+@require_http_methods(["GET", "HEAD"])
+@conditional_cached(site_version)
+def sitemap_index(request):
+    """Sitemap index listing every shard of every section."""
+    return sitemap_views.index(request, SITEMAPS, sitemap_url_name='domain_finder:sitemap_section')
+
+
+@require_http_methods(["GET", "HEAD"])
+@conditional_cached(site_version, params={'p': int})
+def sitemap_section(request, section):
+    """One shard of a sitemap section (``?p=`` selects the shard)."""
+    return sitemap_views.sitemap(request, SITEMAPS, section=section)
+
+
+def serve_image_derivative(request, path):
+    """
+    Development server for image derivatives with immutable cache headers
+    (in production the web server serves them; see the deployment guide).
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT / DERIVATIVES_DIR)
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    return response
+
+
+@never_cache
+@staff_member_required
+def db_pool_stats(request):
+    """Connection pool and read replica statistics of the worker process serving the request (staff only)."""
+    return JsonResponse({'pid': os.getpid(), 'pools': pool_stats(), 'replicas': replica_status()})
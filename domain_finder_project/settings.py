@@ -3,7 +3,7 @@ Django settings for Domain Finder project.
 """
 import os
 from pathlib import Path
-from decouple import config, Csv
+from decouple import config, Choices, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,12 +27,16 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text and trigram search
+    'django.contrib.sitemaps',  # Sitemap index and shards
     'django_recaptcha',  # django-recaptcha
     'domain_finder',  # Main app
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'domain_finder.db_router.PrimaryPinMiddleware',  # Read-your-writes with replicas
+    'domain_finder.page_cache.PageCacheMiddleware',  # Anonymous full-page cache
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -62,18 +66,63 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'domain_finder_project.wsgi.application'
 
+# Route load_more_domains and contact_ajax to their async versions; enable
+# when serving asgi.py with an ASGI server (see VPS guide)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
 # Database
+# Connections come from a per-process pool (domain_finder/db_pool): each
+# request borrows one and returns it when Django closes it at the end
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'domain_finder.db_pool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': config('DB_NAME', default='domain_finder_db'),
         'USER': config('DB_USER', default='domain_finder_user'),
         'PASSWORD': config('DB_PASSWORD', default='domain_password123'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'POOL': {
+            # Per process: keep workers x DB_POOL_MAX_SIZE below max_connections
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            # Seconds to wait for a free connection before failing the request
+            'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+            'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800.0, cast=float),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300.0, cast=float),
+            # Ping connections idle for longer than this before reusing them
+            'check_interval': config('DB_POOL_CHECK_INTERVAL', default=30.0, cast=float),
+        },
     }
 }
 
+# Read replicas (streaming standbys of the primary), as host[:port] entries.
+# Views marked @replica_reads read from them; see domain_finder/db_router.py
+DATABASE_REPLICAS = []
+for number, address in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    host, _, port = address.partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        # Fail fast so an unreachable replica is skipped quickly
+        'OPTIONS': {'connect_timeout': 2},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['domain_finder.db_router.ReplicaRouter']
+
+# Seconds of replication lag after which a replica is skipped
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=5.0, cast=float)
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', default=2.0, cast=float)
+
+# Clients read from the primary for this long after a write (keep it above
+# REPLICA_MAX_LAG + REPLICA_LAG_CHECK_INTERVAL)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=15, cast=int)
+REPLICA_PIN_COOKIE = 'read_primary'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -107,6 +156,9 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Compiled catalog snapshot shared read-only by all workers (see domain_finder/snapshot.py)
+CATALOG_SNAPSHOT_PATH = config('CATALOG_SNAPSHOT_PATH', default=str(BASE_DIR / 'var' / 'catalog.snapshot'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -128,9 +180,11 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # Email Configuration
 # Note: All email settings (HOST_USER, PASSWORD, FROM_EMAIL) are managed via ContactInfo model in database
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'  # Fixed to Gmail
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# Host and port can point the outbox worker at a local SMTP stand-in
+EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
+EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)  # Seconds per SMTP operation
 # EMAIL_HOST_USER, EMAIL_HOST_PASSWORD, and DEFAULT_FROM_EMAIL are set dynamically from database in views
 
 # Messages
@@ -150,4 +204,30 @@ RECAPTCHA_PRIVATE_KEY = config('RECAPTCHA_PRIVATE_KEY', default='6LdBOdgrAAAAAHS
 
 # reCAPTCHA v3 settings
 RECAPTCHA_DEFAULT_ACTION = config('RECAPTCHA_DEFAULT_ACTION', default='contact_form')
-RECAPTCHA_SCORE_THRESHOLD = config('RECAPTCHA_SCORE_THRESHOLD', default=0.5, cast=float)
\ No newline at end of file
+RECAPTCHA_SCORE_THRESHOLD = config('RECAPTCHA_SCORE_THRESHOLD', default=0.5, cast=float)
+
+# Verification transport (see domain_finder/captcha.py); point the URL at a
+# local stub verifier for testing
+RECAPTCHA_VERIFY_URL = config('RECAPTCHA_VERIFY_URL', default='https://www.google.com/recaptcha/api/siteverify')
+RECAPTCHA_VERIFY_TIMEOUT = config('RECAPTCHA_VERIFY_TIMEOUT', default=2.0, cast=float)  # Seconds per socket operation
+RECAPTCHA_SLOW_SECONDS = config('RECAPTCHA_SLOW_SECONDS', default=1.0, cast=float)  # Slower answers count as breaker failures
+RECAPTCHA_BREAKER_THRESHOLD = config('RECAPTCHA_BREAKER_THRESHOLD', default=5, cast=int)
+RECAPTCHA_BREAKER_RESET = config('RECAPTCHA_BREAKER_RESET', default=30, cast=float)  # Seconds before a trial call
+# What happens to submissions while the verifier is unavailable: review, accept or reject
+RECAPTCHA_FALLBACK_POLICY = config(
+    'RECAPTCHA_FALLBACK_POLICY', default='review', cast=Choices(['review', 'accept', 'reject'])
+)
+
+# Token-bucket rate limits per endpoint (see domain_finder/rate_limit.py). A
+# 'capacity/seconds' bucket allows a burst of capacity requests and refills
+# completely over the given number of seconds.
+RATE_LIMITS = {
+    'contact': {
+        'ip': config('RATE_LIMIT_CONTACT_IP', default='5/600'),
+        'email': config('RATE_LIMIT_CONTACT_EMAIL', default='3/3600'),
+    },
+}
+
+# Request header carrying the client address set by the reverse proxy, e.g.
+# HTTP_X_REAL_IP behind nginx's proxy_params. Empty uses REMOTE_ADDR.
+CLIENT_IP_HEADER = config('CLIENT_IP_HEADER', default='')
\ No newline at end of file
@@ -2,9 +2,10 @@
 Main URL configuration for Domain Finder project.
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
+from domain_finder.views import serve_image_derivative
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -13,6 +14,10 @@ urlpatterns = [
 
 # Serve media files during development
 if settings.DEBUG:
+    # Content-addressed image variants, served with immutable cache headers
+    urlpatterns += [
+        re_path(r'^media/derivatives/(?P<path>.*)$', serve_image_derivative),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
@@ -48,6 +48,22 @@ document.addEventListener('DOMContentLoaded', function() {
   console.log('🟢 JavaScript file fully loaded and executed!');
 });
 
+// One idempotency key per distinct submission: sending the same content again
+// (double click, retry after a network error) reuses it, so the server
+// answers from the first request instead of storing and mailing it twice
+let pendingSubmission = null;
+
+function idempotencyKeyFor(data) {
+  const content = JSON.stringify([data.name, data.email, data.message]);
+  if (!pendingSubmission || pendingSubmission.content !== content) {
+    const key = (window.crypto && crypto.randomUUID)
+      ? crypto.randomUUID()
+      : Date.now().toString(36) + Math.random().toString(36).slice(2);
+    pendingSubmission = { content: content, key: key };
+  }
+  return pendingSubmission.key;
+}
+
 async function handleContactSubmit(e) {
   console.log('🚀 === FORM SUBMISSION STARTED ===');
   e.preventDefault();
@@ -148,7 +164,8 @@ async function handleContactSubmit(e) {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
-        'X-CSRFToken': data.csrfmiddlewaretoken
+        'X-CSRFToken': data.csrfmiddlewaretoken,
+        'Idempotency-Key': idempotencyKeyFor(data)
       },
       body: JSON.stringify({
         name: data.name,
@@ -164,6 +181,7 @@ async function handleContactSubmit(e) {
     console.log('📦 RESPONSE DATA:', result);
     
     if (result.success) {
+      pendingSubmission = null;
       showToast(result.message || 'Message sent successfully! We\'ll get back to you soon.', 'success');
       form.reset();
       clearFormErrors();